@@ -1,8 +1,8 @@
 import numpy as np
 from InferAnts import ActiveNestmate, ActiveColony
 from configs import config, metaconfig
-from typing import List, Dict, Any, Union, Callable
-import random
+from typing import List, Dict, Any, Optional, Union, Callable
+from RandomStreams import RandomStreams
 
 ThreatLevel = config.THREAT_LEVELS
 
@@ -13,13 +13,18 @@ class CognitiveSecurity:
     processes to safeguard the colony's integrity and operational security.
     """
     
-    def __init__(self, colony: List[ActiveColony]):
+    def __init__(self, colony: List[ActiveColony], rng: Optional[np.random.Generator] = None, colony_id: int = 0, random_streams: Optional[RandomStreams] = None):
         """
         Initializes the Cognitive Security system with a reference to the ant colony.
         
         :param colony: A list of ActiveColony instances representing the entire ant colony.
+        :param rng: Generator for the simulated intelligence reports, defaulting to the colony's own
+            'cognitive_security' stream of ``random_streams`` (or of the configured SEED).
+        :param colony_id: Index of the colony, which keys its stream so that colonies draw independent reports.
+        :param random_streams: Stream hierarchy of the run.
         """
         self.colony = colony
+        self.rng = rng or (random_streams or RandomStreams.from_config()).generator('cognitive_security', colony_id)
         self.threat_levels = config.COLONY['THREAT_LEVELS']
         self.current_threat_level = ThreatLevel['LOW']
         self.threat_assessment_model = self._initialize_threat_assessment_model()
@@ -46,12 +51,15 @@ class CognitiveSecurity:
         including predator proximity, rival colony activity, resource levels, colony health, and internal conflicts.
         Updates the current threat level based on the assessment.
         """
+        # One batched draw of the inclusive ranges, in place of three random.randint calls
+        ranges = np.array([metaconfig.PREDATOR_PROXIMITY_RANGE, metaconfig.RIVAL_ACTIVITY_RANGE, metaconfig.INTERNAL_CONFLICT_RANGE])
+        predator_proximity, rival_colony_activity, internal_conflicts = self.rng.integers(ranges[:, 0], ranges[:, 1], endpoint=True)
         metrics = {
-            "predator_proximity": random.randint(*metaconfig.PREDATOR_PROXIMITY_RANGE),
-            "rival_colony_activity": random.randint(*metaconfig.RIVAL_ACTIVITY_RANGE),
+            "predator_proximity": predator_proximity,
+            "rival_colony_activity": rival_colony_activity,
             "resource_levels": len(self.colony[0].resources),
             "colony_health": np.mean([nestmate.health for nestmate in self.colony[0].nestmates]),
-            "internal_conflicts": random.randint(*metaconfig.INTERNAL_CONFLICT_RANGE),
+            "internal_conflicts": internal_conflicts,
         }
         
         threat_levels = [self.threat_assessment_model[metric](value) for metric, value in metrics.items()]
@@ -0,0 +1,135 @@
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from scipy import ndimage
+from typing import Any, Dict, List, Mapping, Optional
+import config
+
+def environment_digest(environment_config: Dict[str, Any]) -> str:
+    """
+    Content hash of the parts of an environment configuration the rasters depend on, stable across processes.
+    """
+    relevant = {key: environment_config.get(key) for key in ('GRID', 'OBSTACLES', 'RESOURCE_ZONES')}
+    # Read-only mappings, e.g. from a SimulationPlan, hash like the dictionaries they wrap
+    encoded = json.dumps(relevant, sort_keys=True, default=lambda value: dict(value) if isinstance(value, Mapping) else repr(value)).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def _rectangle(grid_shape, left: int, top: int, width: int, height: int):
+    """
+    Slices of a [height, width] raster covered by a rectangle, clipped to the grid.
+    """
+    rows, columns = grid_shape
+    return slice(max(top, 0), min(top + height, rows)), slice(max(left, 0), min(left + width, columns))
+
+class EnvironmentRasters:
+    """
+    Obstacles and resource zones of an environment compiled once into rasters indexed ``[y, x]``.
+
+    - ``blocked``: boolean obstacle occupancy.
+    - ``obstacle_labels``: 1 + index of the obstacle covering a cell, 0 for free cells.
+    - ``resource_labels``: 1 + index of the resource zone covering a cell (later zones win overlaps), 0 elsewhere;
+      ``resource_types[label]`` is the zone's TYPE, with ``resource_types[0] = None``.
+    - ``signed_distance``: Euclidean distance from each cell centre to the nearest obstacle cell, negative inside
+      obstacles (distance to the nearest free cell). Without obstacles it is infinite everywhere.
+
+    Every per-agent query is one gather from these rasters, so its cost does not depend on how many obstacles or
+    zones the configuration lists. Compiled rasters are read-only and shared through ``compile_rasters``.
+    """
+    def __init__(self, width: int, height: int, obstacles: List[Dict[str, Any]], resource_zones: List[Dict[str, Any]]):
+        """
+        :param width: Grid width (x extent).
+        :param height: Grid height (y extent).
+        :param obstacles: Obstacles with POSITION LEFT/TOP and SIZE WIDTH/HEIGHT.
+        :param resource_zones: Resource zones with TYPE, POSITION X/Y (left-top corner) and SIZE WIDTH/HEIGHT.
+        """
+        self.width, self.height = int(width), int(height)
+        shape = (self.height, self.width)
+        self.obstacle_labels = np.zeros(shape, dtype=np.int16)
+        for label, obstacle in enumerate(obstacles, start=1):
+            position, size = obstacle['POSITION'], obstacle['SIZE']
+            self.obstacle_labels[_rectangle(shape, position['LEFT'], position['TOP'], size['WIDTH'], size['HEIGHT'])] = label
+        self.resource_labels = np.zeros(shape, dtype=np.int16)
+        self.resource_types: List[Optional[str]] = [None]
+        for label, zone in enumerate(resource_zones, start=1):
+            position, size = zone['POSITION'], zone['SIZE']
+            self.resource_labels[_rectangle(shape, position['X'], position['Y'], size['WIDTH'], size['HEIGHT'])] = label
+            self.resource_types.append(zone.get('TYPE'))
+        self.blocked = self.obstacle_labels > 0
+        self.signed_distance = self._signed_distance(self.blocked)
+        for raster in (self.obstacle_labels, self.resource_labels, self.blocked, self.signed_distance):
+            raster.setflags(write=False)
+
+    @staticmethod
+    def _signed_distance(blocked: np.ndarray) -> np.ndarray:
+        if not blocked.any():
+            return np.full(blocked.shape, np.inf, dtype=np.float32)
+        outside = ndimage.distance_transform_edt(~blocked)
+        inside = ndimage.distance_transform_edt(blocked)
+        return (outside - inside).astype(np.float32)
+
+    @classmethod
+    def from_config(cls, environment_config: Dict[str, Any]) -> 'EnvironmentRasters':
+        grid = environment_config['GRID']
+        width, height = grid.get('WIDTH', grid['DIMENSIONS'][0]), grid.get('HEIGHT', grid['DIMENSIONS'][1])
+        return cls(width, height, environment_config.get('OBSTACLES', []), environment_config.get('RESOURCE_ZONES', []))
+
+    def _flat_cells(self, locations: np.ndarray):
+        """
+        Flat raster indices of locations (clipped into the grid) and a mask of those actually inside it.
+        """
+        cells = np.floor(np.asarray(locations)).astype(np.intp)
+        x, y = cells[..., 0], cells[..., 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        flat = np.clip(y, 0, self.height - 1) * self.width + np.clip(x, 0, self.width - 1)
+        return flat, inside
+
+    def valid_moves(self, locations: np.ndarray, movements: np.ndarray) -> np.ndarray:
+        """
+        Whether each movement candidate of each agent lands on a free cell inside the grid.
+
+        :param locations: Agent locations of shape [n_agents, 2] as (x, y).
+        :param movements: Candidate displacements of shape [n_moves, 2], e.g. the configured MOVEMENT tuples.
+        :return: Boolean mask of shape [n_agents, n_moves].
+        """
+        targets = np.asarray(locations)[:, np.newaxis, :] + np.asarray(movements)[np.newaxis, :, :]
+        flat, inside = self._flat_cells(targets)
+        return inside & ~self.blocked.ravel()[flat]
+
+    def resource_at(self, locations: np.ndarray) -> np.ndarray:
+        """
+        Resource zone label under each location (0 outside every zone or the grid).
+        """
+        flat, inside = self._flat_cells(locations)
+        return np.where(inside, self.resource_labels.ravel()[flat], 0)
+
+    def clearance(self, locations: np.ndarray) -> np.ndarray:
+        """
+        Signed distance to the nearest obstacle at each location; cells outside the grid count as blocked (-1).
+        """
+        flat, inside = self._flat_cells(locations)
+        return np.where(inside, self.signed_distance.ravel()[flat], -1.0)
+
+_RASTER_CACHE: Dict[str, EnvironmentRasters] = {}
+_RASTER_CACHE_LOCK = threading.Lock()
+
+def compile_rasters(environment_config: Optional[Dict[str, Any]] = None) -> EnvironmentRasters:
+    """
+    Returns the rasters of an environment configuration, compiling them on first use and sharing them with every
+    later caller whose GRID, OBSTACLES and RESOURCE_ZONES hash to the same digest.
+
+    :param environment_config: Environment configuration, defaulting to ``config.ENVIRONMENT_CONFIG``.
+    """
+    environment_config = environment_config or config.ENVIRONMENT_CONFIG
+    digest = environment_digest(environment_config)
+    with _RASTER_CACHE_LOCK:
+        rasters = _RASTER_CACHE.get(digest)
+        if rasters is None:
+            logging.info(f"Compiling environment rasters {digest[:8]}.")
+            rasters = _RASTER_CACHE[digest] = EnvironmentRasters.from_config(environment_config)
+    return rasters
+
+def clear_raster_cache() -> None:
+    with _RASTER_CACHE_LOCK:
+        _RASTER_CACHE.clear()
@@ -0,0 +1,203 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import config
+
+def decay_and_diffuse(storage: np.ndarray, halo: int, centre_weight: np.ndarray, neighbour_weight: np.ndarray, neighbours: Optional[np.ndarray] = None) -> None:
+    """
+    One in-place decay-and-diffusion pass over the interior of haloed layers of shape [..., rows + 2 * halo, columns + 2 * halo].
+
+    :param storage: Layers with their halo; only the interior is updated, the halo is read as the boundary.
+    :param halo: Halo width, at least 1.
+    :param centre_weight: ``(1 - decay) * (1 - 4 * diffusion)``, broadcastable to the interior.
+    :param neighbour_weight: ``(1 - decay) * diffusion``, broadcastable to the interior.
+    :param neighbours: Optional scratch array of the interior's shape, reused between passes.
+    """
+    rows, columns = storage.shape[-2] - 2 * halo, storage.shape[-1] - 2 * halo
+    interior = storage[..., halo:halo + rows, halo:halo + columns]
+    if neighbours is None:
+        neighbours = np.empty_like(interior)
+    np.add(storage[..., halo - 1:halo - 1 + rows, halo:halo + columns], storage[..., halo + 1:halo + 1 + rows, halo:halo + columns], out=neighbours)
+    neighbours += storage[..., halo:halo + rows, halo - 1:halo - 1 + columns]
+    neighbours += storage[..., halo:halo + rows, halo + 1:halo + 1 + columns]
+    neighbours *= neighbour_weight
+    interior *= centre_weight
+    interior += neighbours
+
+def stencil_weights(decay_rate: float, diffusion_rate: Union[float, Sequence[float]], n_layers: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-layer centre and neighbour weights of ``decay_and_diffuse``, shaped [n_layers, 1, 1].
+    """
+    diffusion = np.broadcast_to(np.asarray(diffusion_rate, dtype=np.float32), (n_layers,))
+    if np.any(diffusion < 0) or np.any(diffusion > 0.25):
+        raise ValueError("Pheromone diffusion rates must lie in [0, 0.25] for the stencil to be stable.")
+    # Decay is folded into both weights so a pass is two fused multiply-adds
+    keep = np.float32(1.0 - decay_rate)
+    return (keep * (1 - 4 * diffusion)).reshape(-1, 1, 1), (keep * diffusion).reshape(-1, 1, 1)
+
+class PheromoneField:
+    """
+    Pheromone concentrations of every type on the environment grid, one float32 layer per type.
+
+    Layers are stored as one array of shape [n_types, height + 2 * halo, width + 2 * halo]. The zero halo is the
+    absorbing boundary of the diffusion stencil and lets every perceptual window, including those at the grid
+    border, be a strided view of the storage. ``layers`` is the interior view, indexed ``[type, y, x]``.
+
+    Each ``step`` decays and diffuses all layers in one stencil pass:
+    ``c <- (1 - decay) * (c + diffusion * (sum of the 4 neighbours - 4 c))``.
+    """
+    def __init__(self, width: int, height: int, type_names: Sequence[str], max_rates: Optional[Sequence[float]] = None,
+                 decay_rate: float = 0.01, diffusion_rate: Union[float, Sequence[float]] = 0.1, window: Tuple[int, int] = (3, 3)):
+        """
+        :param width: Grid width (x extent).
+        :param height: Grid height (y extent).
+        :param type_names: Pheromone type names, in layer order.
+        :param max_rates: Largest amount each type can be released at per deposit; unbounded by default.
+        :param decay_rate: Fraction of every concentration lost per step.
+        :param diffusion_rate: Fraction exchanged with each of the four neighbours per step, per type or shared;
+            the explicit scheme is stable up to 0.25.
+        :param window: (width, height) of the perceptual window sampled by ``gather_windows``.
+        """
+        self._centre_weight, self._neighbour_weight = stencil_weights(decay_rate, diffusion_rate, len(type_names))
+        self.width, self.height = int(width), int(height)
+        self.type_names = list(type_names)
+        self.type_index = {name: index for index, name in enumerate(self.type_names)}
+        self.max_rates = np.full(len(type_names), np.inf, dtype=np.float32) if max_rates is None else np.asarray(max_rates, dtype=np.float32)
+        self.window = (int(window[0]), int(window[1]))
+        self.halo = max(1, self.window[0] // 2, self.window[1] // 2)
+        halo = self.halo
+        self._storage = np.zeros((len(type_names), self.height + 2 * halo, self.width + 2 * halo), dtype=np.float32)
+        self.layers = self._storage[:, halo:halo + self.height, halo:halo + self.width]
+        self._neighbours = np.empty_like(self.layers)
+        self._pending: List[Tuple[float, float, int, float]] = []
+
+    @classmethod
+    def from_config(cls, environment_config: Optional[Dict[str, Any]] = None, nestmate_config: Optional[Dict[str, Any]] = None) -> 'PheromoneField':
+        """
+        Builds the field from ``ENVIRONMENT_CONFIG`` and the nestmate ``PHEROMONE_RELEASE`` and ``SENSE`` settings.
+
+        :param environment_config: Environment configuration, defaulting to ``config.ENVIRONMENT_CONFIG``.
+        :param nestmate_config: Nestmate configuration, defaulting to ``config.ANT_AND_COLONY_CONFIG['NESTMATE']``.
+        """
+        environment_config = environment_config or config.ENVIRONMENT_CONFIG
+        nestmate_config = nestmate_config or config.ANT_AND_COLONY_CONFIG['NESTMATE']
+        grid_width, grid_height = environment_config['GRID']['DIMENSIONS']
+        pheromone_config = environment_config['PHEROMONE_CONFIG']
+        blanket = nestmate_config['ACTIVE_INFERENCE']['BLANKET_STATES']
+        types = sorted(blanket['ACTION']['PHEROMONE_RELEASE']['TYPES'].items(), key=lambda item: item[1]['id'])
+        observations = blanket['SENSE']['OBSERVATIONS']
+        return cls(grid_width, grid_height,
+                   [name for name, _ in types], [spec['max_rate'] for _, spec in types],
+                   decay_rate=pheromone_config['DECAY_RATE'],
+                   diffusion_rate=pheromone_config.get('DIFFUSION_RATE', 0.1),
+                   window=(observations['WIDTH'], observations['HEIGHT']))
+
+    def _type_indices(self, types: Union[np.ndarray, Sequence[Any]]) -> np.ndarray:
+        """
+        Layer indices of type names, or integer layer indices passed through.
+        """
+        types = np.asarray(types)
+        if types.dtype.kind in 'iu':
+            return types.astype(np.intp)
+        return np.array([self.type_index[name] for name in types.ravel()], dtype=np.intp).reshape(types.shape)
+
+    def deposit(self, locations: np.ndarray, types: Union[np.ndarray, Sequence[Any]], amounts: np.ndarray) -> None:
+        """
+        Adds the deposits of many agents at once. Amounts are clipped to [0, max_rate] of their type, deposits
+        outside the grid are dropped, and deposits on the same cell are summed.
+
+        :param locations: Grid coordinates of shape [n, 2] as (x, y).
+        :param types: Type names or layer indices, shape [n].
+        :param amounts: Released amounts, shape [n].
+        """
+        locations = np.asarray(locations)
+        if len(locations) == 0:
+            return
+        layers = self._type_indices(types)
+        amounts = np.clip(np.asarray(amounts, dtype=np.float32), 0, self.max_rates[layers])
+        x, y = np.floor(locations[:, 0]).astype(np.intp), np.floor(locations[:, 1]).astype(np.intp)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        flat = np.ravel_multi_index((layers[inside], y[inside], x[inside]), self.layers.shape)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        totals = np.bincount(inverse, weights=amounts[inside], minlength=len(cells)).astype(np.float32)
+        # Cells are unique, so a fancy-indexed += adds each total exactly once
+        self.layers[np.unravel_index(cells, self.layers.shape)] += totals
+
+    def queue(self, location: Sequence[float], type_name: str, amount: float) -> None:
+        """
+        Buffers one deposit, e.g. from ``ActiveInferenceAgent.release_pheromone``, until the next ``flush``.
+        """
+        self._pending.append((location[0], location[1], self.type_index[type_name], amount))
+
+    def flush(self) -> None:
+        """
+        Applies all queued deposits in one bulk ``deposit``.
+        """
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.float64)
+            self._pending.clear()
+            self.deposit(pending[:, :2], pending[:, 2].astype(np.intp), pending[:, 3])
+
+    def step(self) -> None:
+        """
+        Applies queued deposits, then decays and diffuses every layer in one stencil pass.
+        """
+        self.flush()
+        decay_and_diffuse(self._storage, self.halo, self._centre_weight, self._neighbour_weight, self._neighbours)
+
+    def window_index(self, locations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row and column of each location's window in ``sliding_windows``, with the locations clipped to the grid.
+
+        :param locations: Grid coordinates of shape [n, 2] as (x, y).
+        :return: Index arrays (y, x), each of shape [n].
+        """
+        locations = np.asarray(locations).reshape(-1, 2)
+        x = np.clip(np.floor(locations[:, 0]).astype(np.intp), 0, self.width - 1) + self.halo - self.window[0] // 2
+        y = np.clip(np.floor(locations[:, 1]).astype(np.intp), 0, self.height - 1) + self.halo - self.window[1] // 2
+        return y, x
+
+    def sliding_windows(self) -> np.ndarray:
+        """
+        Every perceptual window of the storage as one read-only strided view, shape
+        [n_types, rows, columns, window height, window width]. ``sliding_windows()[:, y, x]`` with the indices of
+        ``window_index`` selects the windows of given locations; a single location can be read without a copy.
+        """
+        window_w, window_h = self.window
+        return sliding_window_view(self._storage, (window_h, window_w), axis=(1, 2))
+
+    def window_view(self, location: Sequence[int]) -> np.ndarray:
+        """
+        The perceptual window around one location, clipped to the grid, as a read-only view of shape
+        [n_types, window height, window width].
+        """
+        y, x = self.window_index(np.asarray(location)[np.newaxis, :2])
+        return self.sliding_windows()[:, y[0], x[0]]
+
+    def gather_windows(self, locations: np.ndarray) -> np.ndarray:
+        """
+        Copies the perceptual windows of many agents out of ``sliding_windows`` in one gather.
+
+        :param locations: Grid coordinates of shape [n, 2] as (x, y), clipped to the grid.
+        :return: Concentrations of shape [n, n_types, window height, window width].
+        """
+        y, x = self.window_index(locations)
+        return self.sliding_windows()[:, y, x].transpose(1, 0, 2, 3)
+
+    def concentrations(self, locations: np.ndarray) -> np.ndarray:
+        """
+        Concentration of every type at many locations, shape [n, n_types].
+        """
+        locations = np.asarray(locations)
+        x = np.clip(np.floor(locations[:, 0]).astype(np.intp), 0, self.width - 1)
+        y = np.clip(np.floor(locations[:, 1]).astype(np.intp), 0, self.height - 1)
+        return self.layers[:, y, x].T
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """
+        Arrays to checkpoint the field with.
+        """
+        return {'pheromone_layers': self.layers}
+
+    def restore(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.layers[...] = arrays['pheromone_layers']
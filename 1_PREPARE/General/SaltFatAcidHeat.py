@@ -1,40 +1,42 @@
 import numpy as np
-from pymdp import inference, control
+from scipy.special import softmax
+from pymdp import control, utils
+from SparseModels import IndexTransition, SparseLikelihood, joint_posterior, sparse_expected_free_energy
+from PolicyCache import policies_for_controls
+from RandomStreams import RandomStreams
 
 class CulinaryMDP(object):
     
-    def __init__(self, n_ingredients, n_techniques, n_flavors=4):
+    def __init__(self, n_ingredients, n_techniques, n_flavors=4, sparse=False, rng=None):
         self.ingredients = np.arange(n_ingredients) 
         self.techniques = np.arange(n_techniques)
         self.flavors = np.array(['Salt', 'Fat', 'Acid', 'Heat']) # Added flavors
         self.n_states = n_ingredients * n_techniques * len(self.flavors)
         self.n_observations = self.n_states
         self.n_actions = n_techniques
+        self.sparse = sparse # Keep A as CSR identities and B as a successor index array; pymdp only ever sees the dense mode
+        self.rng = rng or RandomStreams.from_config().generator('culinary_mdp')
         
         self.A = self._build_A_matrix()
         self.B = self._build_B_matrix() 
         self.C = self._build_C_matrix()
         self.D = self._build_D_matrix()
+        self.policies = policies_for_controls([self.n_actions], 1) # One-step policies, one per technique
+        self.qs = self.D
         
     def _build_A_matrix(self):
         # Observations now depend on flavor states as well
-        A = np.zeros((len(self.flavors), self.n_observations, self.n_states))
-        for flavor_idx, flavor in enumerate(self.flavors):
-            A[flavor_idx] = np.eye(self.n_observations, self.n_states) # Simple identity for demonstration
-        return A
+        if self.sparse:
+            return [SparseLikelihood.identity(self.n_observations, self.n_states) for flavor in self.flavors]
+        return np.broadcast_to(np.eye(self.n_observations, self.n_states), (len(self.flavors), self.n_observations, self.n_states)).copy() # Simple identity for demonstration
     
     def _build_B_matrix(self):
-        B = np.zeros((self.n_states, self.n_states, self.n_actions))
-        
-        for ingredient in self.ingredients:
-            for technique in self.techniques:
-                for flavor_idx, flavor in enumerate(self.flavors):
-                    s1 = (ingredient * len(self.techniques) + technique) * len(self.flavors) + flavor_idx
-                    
-                    for next_technique in self.techniques:
-                        s2 = (ingredient * len(self.techniques) + next_technique) * len(self.flavors) + flavor_idx
-                        B[s1, s2, next_technique] = 1.0
-        return B
+        # Each action switches the technique and keeps the ingredient and flavor, so every (state, action) has exactly one successor
+        ingredient, technique, flavor_idx = np.unravel_index(np.arange(self.n_states), (len(self.ingredients), len(self.techniques), len(self.flavors)))
+        next_state = np.ravel_multi_index((ingredient[np.newaxis, :], self.techniques[:, np.newaxis], flavor_idx[np.newaxis, :]), (len(self.ingredients), len(self.techniques), len(self.flavors)))
+        transitions = IndexTransition(next_state)
+        # Both modes use the pymdp layout B[next_state, state, next_technique]
+        return transitions if self.sparse else transitions.to_dense()
     
     def _build_C_matrix(self):
         # Preferences for each flavor
@@ -51,21 +53,42 @@ class CulinaryMDP(object):
         return D
         
     def infer_states(self, observation):
-        qs = inference.update_posterior_states(observation, self.A, self.B, self.C, self.D)
+        # A single hidden factor seen through every flavor modality, so the posterior is exact in closed form;
+        # the sparse mode reads the same likelihood rows from the CSR matrices
+        qs = joint_posterior(self.A, observation, self.D)
+        self.qs = qs
         return qs
     
-    def infer_policies(self):
-        q_pi, _, _ = control.update_posterior_policies(self.A, self.B, self.C, self.D)
-        return q_pi
+    def infer_policies(self, gamma=16.0):
+        if not self.sparse:
+            q_pi, _ = control.update_posterior_policies(utils.to_obj_array(self.qs), utils.obj_array_from_list(list(self.A)), utils.to_obj_array(self.B),
+                                                        utils.obj_array_from_list(list(self.C)), list(self.policies), gamma=gamma)
+            return q_pi
+        # Sparse mode scores each technique's one-step risk plus ambiguity per flavor modality without densifying A or B,
+        # against the same softmax-normalized preferences pymdp uses
+        predicted = self.B.predict_batch(np.repeat(self.qs[np.newaxis], len(self.policies), axis=0), self.policies[:, 0, 0])
+        G = sum(sparse_expected_free_energy(likelihood, np.log(softmax(preferences)), predicted) for likelihood, preferences in zip(self.A, self.C))
+        return softmax(-gamma * G)
         
     def sample_action(self, q_pi):
-        action = control.sample_action(q_pi, self.B)
-        return action
+        if not self.sparse:
+            return control.sample_action(q_pi, list(self.policies), [self.n_actions])
+        # One-step policies make q_pi the action marginal; pick its mode, as pymdp's deterministic selection does
+        return self.policies[np.argmax(q_pi), 0].astype(np.float64)
 
     def _simulate_noisy_observations(self):
         # Example implementation
         noise_level = 0.1
-        self.A += np.random.normal(0, noise_level, self.A.shape)
+        if not self.sparse:
+            self.A += self.rng.normal(0, noise_level, self.A.shape)
+            return
+        # Sparse likelihoods only perturb their stored entries, so they stay sparse
+        noisy = []
+        for likelihood in self.A:
+            matrix = likelihood.matrix.copy()
+            matrix.data += self.rng.normal(0, noise_level, matrix.data.shape)
+            noisy.append(SparseLikelihood(matrix))
+        self.A = noisy
 
     def update_preferences(self, new_preferences):
         # Example implementation
@@ -80,12 +103,13 @@ class CulinaryMDP(object):
         # Adjust model based on the outcome of the chosen action
         pass
 
-# Example usage
-mdp = CulinaryMDP(n_ingredients=10, n_techniques=4)
+if __name__ == '__main__':
+    # Example usage
+    mdp = CulinaryMDP(n_ingredients=10, n_techniques=4)
 
-obs = np.array([0, 1, 2, 3]) # observe initial ingredient state with all flavors
-qs = mdp.infer_states(obs)
+    obs = np.array([0, 1, 2, 3]) # observe initial ingredient state with all flavors
+    qs = mdp.infer_states(obs)
 
-q_pi = mdp.infer_policies()
-action = mdp.sample_action(q_pi)
+    q_pi = mdp.infer_policies()
+    action = mdp.sample_action(q_pi)
 
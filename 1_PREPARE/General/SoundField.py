@@ -0,0 +1,211 @@
+import numpy as np
+from scipy.signal import fftconvolve
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from SpatialIndex import SpatialHash
+import config
+
+MAX_OCCLUSION_SAMPLES = 64  # Upper bound on the points sampled along an emitter-listener segment
+
+class SoundField:
+    """
+    The acoustic channel: sounds emitted during a step and the intensity every listener receives, per sound type.
+
+    A sound of intensity ``I`` is heard at distance ``d`` with intensity ``I * gain(d)``, where
+    ``gain(d) = 1 / (1 + (d / reference_distance) ** 2)`` is inverse-square attenuation with a finite value at the
+    source, cut off beyond the radius where the gain falls below ``cutoff_gain``. Obstacles (the ``blocked``
+    raster of EnvironmentRasters) additionally transmit only ``occlusion_transmission`` per cell crossed.
+
+    Two evaluation paths cover small and large colonies:
+
+    - 'pairwise': emitter-listener pairs within the cutoff radius come from a SpatialHash over the emitters, so
+      cost grows with the number of audible pairs. Occlusion is exact up to sampling along each segment.
+    - 'grid': emissions are scatter-added onto a per-type grid and convolved with the attenuation kernel by FFT,
+      and listeners gather from the result, so cost is ``O(cells log cells + n_agents)`` however dense the colony.
+      Convolution cannot see lines of sight, so here obstacles only absorb: cells inside an obstacle receive
+      ``occlusion_transmission`` times the free-field intensity.
+
+    ``received`` picks the grid path once the expected number of audible pairs exceeds ``pairwise_limit``.
+    Positions are taken at cell centres in both paths, so without obstacles they agree to float precision.
+
+    Emissions last one step: ``listen`` evaluates the step's listeners and then clears them.
+    """
+    def __init__(self, blocked: np.ndarray, type_names: Sequence[str], intensity_levels: int = 5, reference_distance: float = 1.0,
+                 cutoff_gain: float = 1e-3, occlusion_transmission: float = 0.5, pairwise_limit: int = 1_000_000):
+        """
+        :param blocked: Boolean obstacle raster of shape [height, width], indexed [y, x].
+        :param type_names: Sound type names, in output column order.
+        :param intensity_levels: Largest emitted intensity; emissions are clipped to [0, intensity_levels].
+        :param reference_distance: Distance at which the gain has halved.
+        :param cutoff_gain: Gain below which a sound is inaudible; sets the cutoff radius.
+        :param occlusion_transmission: Fraction of intensity passing through one obstacle cell.
+        :param pairwise_limit: Expected audible pairs above which the grid path is used.
+        """
+        if not 0 < cutoff_gain < 1:
+            raise ValueError("The sound cutoff gain must lie in (0, 1).")
+        self.blocked = np.asarray(blocked, dtype=bool)
+        self.height, self.width = self.blocked.shape
+        self.type_names = list(type_names)
+        self.type_index = {name: index for index, name in enumerate(self.type_names)}
+        self.intensity_levels = intensity_levels
+        self.reference_distance = float(reference_distance)
+        self.cutoff_radius = self.reference_distance * np.sqrt(1.0 / cutoff_gain - 1.0)
+        self.occlusion_transmission = float(occlusion_transmission)
+        self.pairwise_limit = pairwise_limit
+        self._kernel = None
+        self._pending: List[Tuple[float, float, int, float]] = []
+        self.clear()
+
+    @classmethod
+    def from_config(cls, blocked: np.ndarray, environment_config: Optional[Dict[str, Any]] = None, nestmate_config: Optional[Dict[str, Any]] = None) -> 'SoundField':
+        """
+        Builds the field from ``ENVIRONMENT_CONFIG['SOUND_CONFIG']`` and the nestmate ``SOUND_PRODUCTION`` settings.
+
+        :param blocked: Obstacle raster, e.g. ``EnvironmentRasters.blocked``.
+        """
+        environment_config = environment_config or config.ENVIRONMENT_CONFIG
+        nestmate_config = nestmate_config or config.ANT_AND_COLONY_CONFIG['NESTMATE']
+        sound_production = nestmate_config['ACTIVE_INFERENCE']['BLANKET_STATES']['ACTION']['SOUND_PRODUCTION']
+        sound_config = environment_config.get('SOUND_CONFIG', {})
+        return cls(blocked, sound_production['TYPES'], sound_production['INTENSITY_LEVELS'],
+                   reference_distance=sound_config.get('REFERENCE_DISTANCE', 1.0),
+                   cutoff_gain=sound_config.get('CUTOFF_GAIN', 1e-3),
+                   occlusion_transmission=sound_config.get('OCCLUSION_TRANSMISSION', 0.5),
+                   pairwise_limit=sound_config.get('PAIRWISE_LIMIT', 1_000_000))
+
+    def gain(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Free-field attenuation at the given distances, zero beyond the cutoff radius.
+        """
+        distances = np.asarray(distances)
+        return np.where(distances <= self.cutoff_radius, 1.0 / (1.0 + (distances / self.reference_distance) ** 2), 0.0)
+
+    def clear(self) -> None:
+        """
+        Forgets the emissions of the previous step.
+        """
+        self.locations = np.empty((0, 2))
+        self.types = np.empty(0, dtype=np.intp)
+        self.intensities = np.empty(0, dtype=np.float32)
+
+    def emit(self, locations: np.ndarray, types: Union[np.ndarray, Sequence[Any]], intensities: np.ndarray) -> None:
+        """
+        Adds the emissions of many agents for the current step.
+
+        :param locations: Grid coordinates of shape [n, 2] as (x, y).
+        :param types: Sound type names or column indices, shape [n].
+        :param intensities: Emitted intensities, shape [n].
+        """
+        types = np.asarray(types)
+        if types.dtype.kind not in 'iu':
+            types = np.array([self.type_index[name] for name in types.ravel()], dtype=np.intp)
+        intensities = np.clip(np.asarray(intensities, dtype=np.float32), 0, self.intensity_levels)
+        self.locations = np.concatenate([self.locations, np.floor(np.asarray(locations, dtype=np.float64).reshape(-1, 2)) + 0.5])
+        self.types = np.concatenate([self.types, types.astype(np.intp)])
+        self.intensities = np.concatenate([self.intensities, intensities])
+
+    def queue(self, location: Sequence[float], type_name: str, intensity: float) -> None:
+        """
+        Buffers one emission, e.g. from ``ActiveInferenceAgent.produce_sound``, until the next ``flush``.
+        """
+        self._pending.append((location[0], location[1], self.type_index[type_name], intensity))
+
+    def flush(self) -> None:
+        """
+        Adds all queued emissions in one ``emit``.
+        """
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.float64)
+            self._pending.clear()
+            self.emit(pending[:, :2], pending[:, 2].astype(np.intp), pending[:, 3])
+
+    def expected_pairs(self, n_listeners: int) -> float:
+        """
+        Expected number of audible emitter-listener pairs if both are spread uniformly over the grid.
+        """
+        audible_area = min(np.pi * self.cutoff_radius ** 2, self.width * self.height)
+        return len(self.intensities) * n_listeners * audible_area / (self.width * self.height)
+
+    def received(self, listener_locations: np.ndarray, method: Optional[str] = None) -> np.ndarray:
+        """
+        Intensity of every sound type received at every listener, including the listener's own emissions.
+
+        :param listener_locations: Grid coordinates of shape [n_listeners, 2] as (x, y).
+        :param method: 'pairwise' or 'grid'; chosen from ``pairwise_limit`` by default.
+        :return: Received intensities of shape [n_listeners, n_types].
+        """
+        self.flush()
+        listeners = np.floor(np.asarray(listener_locations, dtype=np.float64).reshape(-1, 2)) + 0.5
+        if len(self.intensities) == 0 or len(listeners) == 0:
+            return np.zeros((len(listeners), len(self.type_names)), dtype=np.float32)
+        method = method or ('grid' if self.expected_pairs(len(listeners)) > self.pairwise_limit else 'pairwise')
+        if method == 'pairwise':
+            return self._received_pairwise(listeners)
+        if method == 'grid':
+            return self._received_grid(listeners)
+        raise ValueError(f"Unknown sound propagation method '{method}'.")
+
+    def listen(self, listener_locations: np.ndarray, method: Optional[str] = None) -> np.ndarray:
+        """
+        Evaluates the listeners of the current step, then forgets the step's emissions so they are heard only once.
+
+        :param listener_locations: Grid coordinates of shape [n_listeners, 2] as (x, y).
+        :param method: 'pairwise' or 'grid', as in ``received``.
+        :return: Received intensities of shape [n_listeners, n_types].
+        """
+        received = self.received(listener_locations, method)
+        self.clear()
+        return received
+
+    def _occlusion(self, sources: np.ndarray, targets: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """
+        Transmission along each source-target segment, from the obstacle cells hit by evenly spaced samples.
+        """
+        samples = int(min(MAX_OCCLUSION_SAMPLES, max(1, np.ceil(distances.max()))))
+        fractions = (np.arange(samples) + 0.5) / samples
+        points = sources[:, np.newaxis] + fractions[np.newaxis, :, np.newaxis] * (targets - sources)[:, np.newaxis]
+        x = np.clip(np.floor(points[..., 0]).astype(np.intp), 0, self.width - 1)
+        y = np.clip(np.floor(points[..., 1]).astype(np.intp), 0, self.height - 1)
+        blocked_length = self.blocked[y, x].mean(axis=1) * distances
+        return self.occlusion_transmission ** blocked_length
+
+    def _received_pairwise(self, listeners: np.ndarray) -> np.ndarray:
+        index = SpatialHash.build(self.locations, max(self.cutoff_radius / 2, 1.0))
+        indptr, emitters, distances = index.neighbours_within(self.cutoff_radius, listeners)
+        pair_listeners = np.repeat(np.arange(len(listeners)), np.diff(indptr))
+        heard = self.intensities[emitters] * self.gain(distances)
+        if self.blocked.any() and len(emitters):
+            heard = heard * self._occlusion(self.locations[emitters], listeners[pair_listeners], distances)
+        received = np.zeros((len(listeners), len(self.type_names)))
+        np.add.at(received, (pair_listeners, self.types[emitters]), heard)
+        return received.astype(np.float32)
+
+    def attenuation_kernel(self) -> np.ndarray:
+        """
+        The gain on a square grid of offsets within the cutoff radius, built once.
+        """
+        if self._kernel is None:
+            radius = int(np.floor(self.cutoff_radius))
+            offsets = np.arange(-radius, radius + 1)
+            self._kernel = self.gain(np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :]))
+        return self._kernel
+
+    def intensity_grid(self) -> np.ndarray:
+        """
+        Free-field intensity of every sound type on every cell, shape [n_types, height, width].
+        """
+        self.flush()
+        x = np.clip(self.locations[:, 0].astype(np.intp), 0, self.width - 1)
+        y = np.clip(self.locations[:, 1].astype(np.intp), 0, self.height - 1)
+        flat = np.ravel_multi_index((self.types, y, x), (len(self.type_names), self.height, self.width))
+        sources = np.bincount(flat, weights=self.intensities, minlength=len(self.type_names) * self.height * self.width)
+        sources = sources.reshape(len(self.type_names), self.height, self.width)
+        return fftconvolve(sources, self.attenuation_kernel()[np.newaxis], mode='same', axes=(1, 2))
+
+    def _received_grid(self, listeners: np.ndarray) -> np.ndarray:
+        field = self.intensity_grid()
+        x = np.clip(listeners[:, 0].astype(np.intp), 0, self.width - 1)
+        y = np.clip(listeners[:, 1].astype(np.intp), 0, self.height - 1)
+        # FFT round-off can leave tiny negative values where nothing is audible
+        received = np.maximum(field[:, y, x].T, 0.0)
+        received *= np.where(self.blocked[y, x], self.occlusion_transmission, 1.0)[:, np.newaxis]
+        return received.astype(np.float32)
@@ -0,0 +1,165 @@
+import numpy as np
+from typing import Optional, Tuple
+
+_KEY_STRIDE = np.int64(1) << 32  # Cell keys pack (cx, cy) as cx * 2**32 + (cy + 2**31)
+_KEY_OFFSET = np.int64(1) << 31
+
+def _cell_keys(cells: np.ndarray) -> np.ndarray:
+    return cells[:, 0] * _KEY_STRIDE + (cells[:, 1] + _KEY_OFFSET)
+
+class SpatialHash:
+    """
+    A uniform-grid spatial hash (cell list) over agent positions, for batched radius and k-nearest queries.
+
+    Agents are sorted by the key of the square cell of side ``cell_size`` they fall in, and the occupied cells are
+    kept as a sorted key array with the start and end of each cell in the sorted agent order. Only occupied cells
+    are stored, so the index costs O(n_agents) memory whatever the extent of the world. A query visits the
+    ``(2 * ceil(radius / cell_size) + 1) ** 2`` cells around each query point for all query points at once, so
+    its cost grows with the number of candidate pairs rather than with ``n_agents ** 2``.
+
+    ``update`` is incremental: positions change little between steps, so the previous sort order is nearly
+    sorted by the new keys and a stable (adaptive) sort of it runs in close to linear time; a step in which no
+    agent changed cell skips the re-sort entirely.
+
+    Query results are CSR-style: the neighbours of query ``i`` are ``indices[indptr[i]:indptr[i + 1]]``, with
+    matching ``distances``.
+    """
+    def __init__(self, cell_size: float):
+        """
+        :param cell_size: Side of a hash cell; queries are cheapest for radii close to it.
+        """
+        if cell_size <= 0:
+            raise ValueError("The spatial hash cell size must be positive.")
+        self.cell_size = float(cell_size)
+        self.positions = np.empty((0, 2))
+        self.order = np.empty(0, dtype=np.intp)
+        self._keys = np.empty(0, dtype=np.int64)
+        self.cell_keys = np.empty(0, dtype=np.int64)
+        self.cell_starts = np.empty(0, dtype=np.intp)
+        self.cell_ends = np.empty(0, dtype=np.intp)
+
+    @classmethod
+    def build(cls, positions: np.ndarray, cell_size: float) -> 'SpatialHash':
+        index = cls(cell_size)
+        index.update(positions)
+        return index
+
+    def _cells(self, positions: np.ndarray) -> np.ndarray:
+        return np.floor(positions / self.cell_size).astype(np.int64)
+
+    def update(self, positions: np.ndarray) -> None:
+        """
+        Re-indexes the agents at their new positions.
+
+        :param positions: Agent positions of shape [n_agents, 2].
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        keys = _cell_keys(self._cells(positions))
+        if len(keys) != len(self._keys):
+            self.order = np.argsort(keys, kind='stable')
+        elif not np.array_equal(keys, self._keys):
+            self.order = self.order[np.argsort(keys[self.order], kind='stable')]
+        else:
+            self.positions = positions
+            return
+        self.positions, self._keys = positions, keys
+        sorted_keys = keys[self.order]
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        self.cell_starts = np.concatenate([[0], boundaries]).astype(np.intp) if len(keys) else np.empty(0, dtype=np.intp)
+        self.cell_ends = np.concatenate([boundaries, [len(keys)]]).astype(np.intp) if len(keys) else np.empty(0, dtype=np.intp)
+        self.cell_keys = sorted_keys[self.cell_starts]
+
+    def _candidates(self, query_positions: np.ndarray, reach: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (query, agent) pairs whose cells are at most ``reach`` cells apart in x and y.
+        """
+        query_cells = self._cells(query_positions)
+        queries, agents = [], []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                keys = _cell_keys(query_cells + np.array([dx, dy], dtype=np.int64))
+                slots = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+                hits = np.flatnonzero(self.cell_keys[slots] == keys)
+                starts = self.cell_starts[slots[hits]]
+                counts = self.cell_ends[slots[hits]] - starts
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # Expand each [start, start + count) range into its members without a Python loop
+                run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                queries.append(np.repeat(hits, counts))
+                agents.append(self.order[np.repeat(starts, counts) + run_offsets])
+        if not queries:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(queries), np.concatenate(agents)
+
+    def _csr(self, n_queries: int, queries: np.ndarray, agents: np.ndarray, distances: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Groups pairs by query, ordered by distance and then agent index within each query.
+        """
+        order = np.lexsort((agents, distances, queries))
+        indptr = np.zeros(n_queries + 1, dtype=np.intp)
+        np.cumsum(np.bincount(queries, minlength=n_queries), out=indptr[1:])
+        return indptr, agents[order], distances[order]
+
+    def neighbours_within(self, radius: float, query_positions: Optional[np.ndarray] = None, include_self: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Agents within ``radius`` (inclusive) of each query point.
+
+        :param radius: Query radius.
+        :param query_positions: Query points of shape [n_queries, 2], defaulting to the indexed agents.
+        :param include_self: With the default queries, whether an agent is its own neighbour.
+        :return: CSR arrays ``(indptr, indices, distances)``, each row sorted by distance.
+        """
+        self_query = query_positions is None
+        query_positions = self.positions if self_query else np.asarray(query_positions, dtype=np.float64)
+        if len(self.cell_keys) == 0 or len(query_positions) == 0:
+            return np.zeros(len(query_positions) + 1, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+        queries, agents = self._candidates(query_positions, int(np.ceil(radius / self.cell_size)))
+        distances = np.hypot(*(self.positions[agents] - query_positions[queries]).T)
+        keep = distances <= radius
+        if self_query and not include_self:
+            keep &= queries != agents
+        return self._csr(len(query_positions), queries[keep], agents[keep], distances[keep])
+
+    def k_nearest(self, k: int, query_positions: Optional[np.ndarray] = None, include_self: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The ``k`` nearest agents of each query point (fewer when fewer exist).
+
+        The search radius starts at the one expected to hold ``k`` agents at the mean density and doubles for the
+        queries that found fewer than ``k``, so each query only ever examines a neighbourhood around its answer.
+
+        :param k: Number of neighbours per query.
+        :param query_positions: Query points of shape [n_queries, 2], defaulting to the indexed agents.
+        :param include_self: With the default queries, whether an agent counts as its own neighbour.
+        :return: CSR arrays ``(indptr, indices, distances)``, each row sorted by distance.
+        """
+        self_query = query_positions is None
+        query_positions = self.positions if self_query else np.asarray(query_positions, dtype=np.float64)
+        n_queries = len(query_positions)
+        available = len(self.positions) - (1 if self_query and not include_self else 0)
+        wanted = min(k, max(available, 0))
+        if wanted == 0 or n_queries == 0:
+            return np.zeros(n_queries + 1, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+        extent = np.ptp(self.positions, axis=0).prod() if len(self.positions) > 1 else 0.0
+        radius = max(self.cell_size, np.sqrt(max(extent, self.cell_size ** 2) * wanted / (np.pi * len(self.positions))))
+        pending = np.arange(n_queries)
+        rows, agents, distances = [], [], []
+        while len(pending):
+            indptr, found, found_distances = self.neighbours_within(radius, query_positions[pending], include_self=True)
+            counts = np.diff(indptr)
+            query_ids = np.repeat(pending, counts)
+            if self_query and not include_self:
+                keep = query_ids != found
+                query_ids, found, found_distances = query_ids[keep], found[keep], found_distances[keep]
+                counts = np.bincount(np.searchsorted(pending, query_ids), minlength=len(pending))
+            done = counts >= wanted
+            # Rows are sorted by distance, so the first ``wanted`` pairs of a finished query are its answer
+            rank = np.arange(len(query_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+            take = np.repeat(done, counts) & (rank < wanted)
+            rows.append(query_ids[take])
+            agents.append(found[take])
+            distances.append(found_distances[take])
+            pending = pending[~done]
+            radius *= 2
+        return self._csr(n_queries, np.concatenate(rows), np.concatenate(agents), np.concatenate(distances))
@@ -0,0 +1,239 @@
+import os
+import shutil
+import logging
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Set, Tuple, Union
+from PheromoneField import decay_and_diffuse, stencil_weights
+import config
+
+TileKey = Tuple[int, int]
+_NEIGHBOUR_EDGES = (  # (tile offset, halo slice of the active tile, edge slice of the neighbour), for a 1-cell halo
+    ((0, -1), (slice(0, 1), slice(1, -1)), (slice(-1, None), slice(None))),
+    ((0, 1), (slice(-1, None), slice(1, -1)), (slice(0, 1), slice(None))),
+    ((-1, 0), (slice(1, -1), slice(0, 1)), (slice(None), slice(-1, None))),
+    ((1, 0), (slice(1, -1), slice(-1, None)), (slice(None), slice(0, 1))),
+)
+
+class TiledField:
+    """
+    A dense multi-layer field over an unbounded world, stored as fixed-size square tiles.
+
+    A tile holds ``[n_layers, tile_size, tile_size]`` cells indexed ``[layer, y, x]`` and is only allocated once
+    something is written to it or an agent comes near it. ``activate`` marks the tiles around the agents (plus
+    ``active_margin`` tiles) as active; field kernels such as ``step`` run over the active tiles only, stacked into
+    one batch. When more than ``max_resident_tiles`` are in memory, the least recently used inactive tiles are
+    written to ``.npy`` files in the spill directory and reopened as memory maps when touched again; tiles that
+    are entirely empty are simply dropped.
+
+    Inactive tiles are frozen: they neither decay nor diffuse until they become active again, and active tiles read
+    their edges as a fixed boundary. With the default margin, everything an agent deposits stays at least one tile
+    away from that boundary.
+    """
+    def __init__(self, n_layers: int, tile_size: int = 64, dtype: Any = np.float32, max_resident_tiles: int = 256, active_margin: int = 1,
+                 spill_directory: Optional[str] = None):
+        """
+        :param n_layers: Number of layers, e.g. pheromone types.
+        :param tile_size: Side of a tile in cells.
+        :param dtype: Storage dtype of the tiles.
+        :param max_resident_tiles: Tiles kept in memory before inactive ones are spilled to disk.
+        :param active_margin: Tiles around each agent's tile that are active as well.
+        :param spill_directory: Directory of spilled tiles; a temporary directory, removed by ``close``, by default.
+        """
+        self.n_layers = int(n_layers)
+        self.tile_size = int(tile_size)
+        self.dtype = np.dtype(dtype)
+        self.max_resident_tiles = int(max_resident_tiles)
+        self.active_margin = int(active_margin)
+        self._spill_directory = spill_directory
+        self._owns_spill_directory = spill_directory is None
+        self.tiles: 'OrderedDict[TileKey, np.ndarray]' = OrderedDict()
+        self.spilled: Set[TileKey] = set()
+        self.active: Set[TileKey] = set()
+
+    @classmethod
+    def from_config(cls, n_layers: int, environment_config: Optional[Dict[str, Any]] = None) -> 'TiledField':
+        """
+        Builds a field with the ``ENVIRONMENT_CONFIG['GRID']['TILING']`` settings.
+        """
+        tiling = (environment_config or config.ENVIRONMENT_CONFIG)['GRID'].get('TILING', {})
+        return cls(n_layers, tile_size=tiling.get('TILE_SIZE', 64), max_resident_tiles=tiling.get('MAX_RESIDENT_TILES', 256),
+                   active_margin=tiling.get('ACTIVE_MARGIN', 1), spill_directory=tiling.get('SPILL_DIRECTORY'))
+
+    @property
+    def spill_directory(self) -> str:
+        if self._spill_directory is None:
+            self._spill_directory = tempfile.mkdtemp(prefix='metainformant_tiles_')
+        os.makedirs(self._spill_directory, exist_ok=True)
+        return self._spill_directory
+
+    def _spill_path(self, key: TileKey) -> str:
+        return os.path.join(self.spill_directory, f"tile_{key[0]}_{key[1]}.npy")
+
+    def tile_keys(self, locations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tile coordinates and in-tile (x, y) offsets of world locations, each of shape [n, 2].
+        """
+        cells = np.floor(np.asarray(locations, dtype=np.float64).reshape(-1, 2)).astype(np.int64)
+        return np.floor_divide(cells, self.tile_size), np.mod(cells, self.tile_size)
+
+    def tile(self, key: TileKey, allocate: bool = True) -> Optional[np.ndarray]:
+        """
+        The in-memory array of a tile, reloading it from disk or allocating it as needed.
+
+        :param key: Tile coordinates (tx, ty).
+        :param allocate: Whether to allocate a missing tile; otherwise None is returned for it.
+        """
+        key = (int(key[0]), int(key[1]))
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        if key in self.spilled:
+            tile = np.array(np.load(self._spill_path(key), mmap_mode='r'))
+            self.spilled.discard(key)
+        elif allocate:
+            tile = np.zeros((self.n_layers, self.tile_size, self.tile_size), dtype=self.dtype)
+        else:
+            return None
+        self.tiles[key] = tile
+        self._evict(keep=key)
+        return tile
+
+    def _peek(self, key: TileKey) -> Optional[np.ndarray]:
+        """
+        A tile's data without loading it into memory: the resident array, a read-only memory map, or None.
+        """
+        tile = self.tiles.get(key)
+        if tile is None and key in self.spilled:
+            tile = np.load(self._spill_path(key), mmap_mode='r')
+        return tile
+
+    def _evict(self, keep: Optional[TileKey] = None) -> None:
+        """
+        Spills least recently used inactive tiles until at most ``max_resident_tiles`` remain in memory.
+
+        :param keep: A tile that must stay resident, e.g. the one ``tile`` is about to return.
+        """
+        excess = len(self.tiles) - self.max_resident_tiles
+        if excess <= 0:
+            return
+        for key in [key for key in self.tiles if key not in self.active and key != keep][:excess]:
+            tile = self.tiles.pop(key)
+            if tile.any():
+                spilled = np.lib.format.open_memmap(self._spill_path(key), mode='w+', dtype=self.dtype, shape=tile.shape)
+                spilled[...] = tile
+                spilled.flush()
+                del spilled
+                self.spilled.add(key)
+        if len(self.tiles) > self.max_resident_tiles:
+            logging.debug(f"{len(self.active)} active tiles exceed the resident budget of {self.max_resident_tiles}.")
+
+    def activate(self, locations: np.ndarray) -> Set[TileKey]:
+        """
+        Makes the tiles around the given agent locations the active set, allocating them lazily.
+
+        :param locations: Agent locations of shape [n, 2] as (x, y).
+        :return: The active tile keys.
+        """
+        keys, _ = self.tile_keys(locations)
+        margin = np.arange(-self.active_margin, self.active_margin + 1)
+        offsets = np.stack(np.meshgrid(margin, margin, indexing='ij'), axis=-1).reshape(-1, 2)
+        around = np.unique((np.unique(keys, axis=0)[:, np.newaxis, :] + offsets[np.newaxis]).reshape(-1, 2), axis=0) if len(keys) else np.empty((0, 2), dtype=np.int64)
+        self.active = {(int(tx), int(ty)) for tx, ty in around}
+        for key in self.active:
+            self.tile(key)
+        self._evict()
+        return self.active
+
+    def _grouped(self, locations: np.ndarray):
+        """
+        Yields each touched tile key with the row indices and in-tile offsets of the locations inside it.
+        """
+        keys, offsets = self.tile_keys(locations)
+        if len(keys) == 0:
+            return
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(inverse.ravel(), minlength=len(unique_keys)))])
+        for index, key in enumerate(unique_keys):
+            rows = order[bounds[index]:bounds[index + 1]]
+            yield (int(key[0]), int(key[1])), rows, offsets[rows]
+
+    def add(self, locations: np.ndarray, layers: np.ndarray, amounts: np.ndarray) -> None:
+        """
+        Adds amounts to the given layers at many locations, allocating tiles where needed; repeated cells are summed.
+
+        :param locations: World coordinates of shape [n, 2] as (x, y).
+        :param layers: Layer indices, shape [n].
+        :param amounts: Amounts, shape [n].
+        """
+        layers, amounts = np.asarray(layers, dtype=np.intp), np.asarray(amounts, dtype=self.dtype)
+        for key, rows, offsets in self._grouped(locations):
+            np.add.at(self.tile(key), (layers[rows], offsets[:, 1], offsets[:, 0]), amounts[rows])
+
+    def values(self, locations: np.ndarray) -> np.ndarray:
+        """
+        All layers at many locations, shape [n, n_layers]; cells of tiles never written read as zero.
+        """
+        values = np.zeros((len(np.asarray(locations).reshape(-1, 2)), self.n_layers), dtype=self.dtype)
+        for key, rows, offsets in self._grouped(locations):
+            tile = self._peek(key)
+            if tile is not None:
+                values[rows] = tile[:, offsets[:, 1], offsets[:, 0]].T
+        return values
+
+    def step(self, decay_rate: float, diffusion_rate: Union[float, Sequence[float]]) -> None:
+        """
+        Decays and diffuses every active tile in one batched stencil pass; inactive tiles are left untouched.
+
+        :param decay_rate: Fraction lost per step.
+        :param diffusion_rate: Fraction exchanged with each of the four neighbours per step, per layer or shared.
+        """
+        if not self.active:
+            return
+        keys = sorted(self.active)
+        size = self.tile_size
+        stacked = np.zeros((len(keys), self.n_layers, size + 2, size + 2), dtype=self.dtype)
+        for index, key in enumerate(keys):
+            stacked[index, :, 1:-1, 1:-1] = self.tile(key)
+            for (dx, dy), halo, edge in _NEIGHBOUR_EDGES:
+                neighbour = self._peek((key[0] + dx, key[1] + dy))
+                if neighbour is not None:
+                    stacked[index][(slice(None),) + halo] = neighbour[(slice(None),) + edge]
+        centre_weight, neighbour_weight = stencil_weights(decay_rate, diffusion_rate, self.n_layers)
+        decay_and_diffuse(stacked, 1, centre_weight, neighbour_weight)
+        for index, key in enumerate(keys):
+            self.tiles[key][...] = stacked[index, :, 1:-1, 1:-1]
+
+    def region(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """
+        A dense copy of a rectangular region, shape [n_layers, height, width], e.g. for rendering.
+        """
+        region = np.zeros((self.n_layers, height, width), dtype=self.dtype)
+        size = self.tile_size
+        for ty in range(top // size, (top + height - 1) // size + 1):
+            for tx in range(left // size, (left + width - 1) // size + 1):
+                tile = self._peek((tx, ty))
+                if tile is None:
+                    continue
+                x0, y0 = max(left, tx * size), max(top, ty * size)
+                x1, y1 = min(left + width, (tx + 1) * size), min(top + height, (ty + 1) * size)
+                region[:, y0 - top:y1 - top, x0 - left:x1 - left] = tile[:, y0 - ty * size:y1 - ty * size, x0 - tx * size:x1 - tx * size]
+        return region
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(tile.nbytes for tile in self.tiles.values())
+
+    def close(self) -> None:
+        """
+        Drops all tiles and removes the spill directory if this field created it.
+        """
+        self.tiles.clear()
+        self.spilled.clear()
+        self.active.clear()
+        if self._owns_spill_directory and self._spill_directory is not None:
+            shutil.rmtree(self._spill_directory, ignore_errors=True)
+            self._spill_directory = None
@@ -0,0 +1,492 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Type
+from InferAnts import ActiveInferenceAgent, ActiveNestmate, MatrixInitializer
+from PolicyScoring import BatchedEFEEvaluator
+from LogKernels import LogLikelihoodCache
+from ModelLearning import OuterProductAccumulator, TransitionCountAccumulator
+from Precision import PrecisionPolicy
+import config
+
+class ColonyState:
+    """
+    A structure-of-arrays engine that stores every agent of a colony in stacked numpy arrays.
+
+    Each per-agent quantity (position, grid location, influence factor, A/B/C/D matrices) is held as one array of shape
+    ``[n_agents, ...]``, so perception and belief updates run as one batched operation per step instead of
+    once per ActiveInferenceAgent object. ActiveNestmate/ActiveColony instances obtained through ``view``
+    are thin views over a single row.
+    """
+    MODEL_KEYS = ('A_matrix', 'B_matrix', 'C_matrix', 'D_matrix')
+    ACCUMULATOR_KEYS = ('action_model_updates', 'observation_model_updates')
+    ROW_PARAM_DIMS = {'preferences': 2, 'uncertainty': 1}  # Dimensions at which these parameters hold one row per agent
+
+    def __init__(self, positions: np.ndarray, influence_factors: np.ndarray, A_matrix: np.ndarray, B_matrix: np.ndarray, C_matrix: np.ndarray, D_matrix: np.ndarray, nest_ids: Optional[np.ndarray] = None, locations: Optional[np.ndarray] = None, **agent_params: Dict[str, Any]):
+        """
+        Initializes the colony state from already stacked arrays.
+
+        :param positions: Agent positions/beliefs of shape [n_agents, state_dim].
+        :param influence_factors: Influence factors of shape [n_agents].
+        :param A_matrix: Stacked observation models of shape [n_agents, ...].
+        :param B_matrix: Stacked transition models of shape [n_agents, ...].
+        :param C_matrix: Stacked preferences of shape [n_agents, ...].
+        :param D_matrix: Stacked initial state priors of shape [n_agents, ...].
+        :param nest_ids: Optional nest membership of each agent, of shape [n_agents].
+        :param locations: Optional grid cell (x, y) of each agent, of shape [n_agents, 2]; defaults to the origin.
+        :param agent_params: Parameters shared by every agent of the colony.
+        """
+        self.precision_policy = PrecisionPolicy.from_params(agent_params)
+        self.positions = self.precision_policy.store(positions)
+        self.influence_factors = self.precision_policy.store(influence_factors)
+        self.A_matrix = self._store_stacked(A_matrix)
+        self.B_matrix = self._store_stacked(B_matrix)
+        self.C_matrix = self._store_stacked(C_matrix)
+        self.D_matrix = self._store_stacked(D_matrix)
+        self.nest_ids = np.zeros(len(self.positions), dtype=np.int32) if nest_ids is None else np.asarray(nest_ids, dtype=np.int32)
+        self.locations = np.zeros((len(self.positions), 2)) if locations is None else np.array(locations, dtype=np.float64)
+        self.model_registry = agent_params.pop('model_registry', None)
+        self.agent_params = agent_params
+        self._views: Dict[int, ActiveInferenceAgent] = {}
+        self.log_cache = LogLikelihoodCache(dtype=self.precision_policy.accumulation_dtype)
+        adaptive_learning = config.ACTIVE_INFERENCE_CONFIG['ADAPTIVE_LEARNING']
+        self.model_updating = agent_params.get('model_updating', adaptive_learning['MODEL_UPDATING'])
+        fold_interval = agent_params.get('model_update_interval', adaptive_learning['BATCH_UPDATE_INTERVAL']) if self.model_updating == 'batch' else 1
+        self.action_model_updates = TransitionCountAccumulator(fold_interval)
+        self.observation_model_updates = OuterProductAccumulator(fold_interval)
+        self._validate_shapes()
+
+    def _store_stacked(self, stacked: np.ndarray) -> np.ndarray:
+        """
+        Converts a stacked model tensor to the storage dtype, keeping a shared broadcast tensor shared.
+
+        A read-only zero-stride view is cast one row at a time and broadcast again, so a dtype change never expands
+        it into per-agent copies.
+
+        :param stacked: A stacked array of shape [n_agents, ...].
+        :return: The array in the storage dtype.
+        """
+        stacked = np.asarray(stacked)
+        if stacked.dtype == self.precision_policy.storage_dtype:
+            return stacked
+        if not stacked.flags.writeable and stacked.ndim and stacked.strides[0] == 0:
+            row = self.precision_policy.store(stacked[0])
+            row.setflags(write=False)
+            return np.broadcast_to(row, stacked.shape)
+        return self.precision_policy.store(stacked)
+
+    @classmethod
+    def allocate(cls, positions: np.ndarray, influence_factors: np.ndarray, nest_ids: Optional[np.ndarray] = None, locations: Optional[np.ndarray] = None, **agent_params: Dict[str, Any]) -> 'ColonyState':
+        """
+        Allocates a colony whose agents all start from the generative model described by ``agent_params``.
+
+        :param positions: Initial agent positions of shape [n_agents, state_dim].
+        :param influence_factors: Influence factors of shape [n_agents].
+        :param nest_ids: Optional nest membership of each agent.
+        :param locations: Optional grid cell of each agent, of shape [n_agents, 2].
+        :param agent_params: Shared agent parameters, as accepted by ActiveInferenceAgent.
+        :return: A new ColonyState.
+        """
+        positions = np.asarray(positions)
+        n_agents = len(positions)
+        MatrixInitializer.check_action_count(agent_params)
+        template = {
+            'A_matrix': MatrixInitializer.initialize('A_matrix_config', agent_params, *agent_params.get('SENSORY_MODALITIES', ()), agent_params.get('OBSERVATION_DIM')),
+            'B_matrix': MatrixInitializer.initialize('B_matrix_config', agent_params, *agent_params.get('ACTION_MODALITIES', ()), agent_params.get('STATE_DIM'), agent_params.get('STATE_DIM')),
+            'C_matrix': MatrixInitializer.initialize('C_matrix_config', agent_params, agent_params.get('OBSERVATION_DIM')),
+            'D_matrix': MatrixInitializer.initialize('D_matrix_config', agent_params, agent_params.get('STATE_DIM')),
+        }
+        stacked = {key: cls._stack_rows([matrix] * n_agents) for key, matrix in template.items()}
+        shared_params = {key: value for key, value in agent_params.items() if not key.endswith('_matrix_config')}
+        return cls(positions, influence_factors, nest_ids=nest_ids, locations=locations, **stacked, **shared_params)
+
+    @classmethod
+    def from_agents(cls, agents: Sequence[ActiveInferenceAgent], nest_ids: Optional[Sequence[int]] = None) -> 'ColonyState':
+        """
+        Stacks existing agents into a colony state and rebinds each agent to its row.
+
+        All agents must share the same matrix shapes. After the call, the agents remain usable on their own,
+        but their attributes are views into the returned ColonyState.
+
+        :param agents: Agents to stack.
+        :param nest_ids: Optional nest membership of each agent.
+        :return: A new ColonyState.
+        """
+        if not agents:
+            raise ValueError("Cannot build a ColonyState from an empty list of agents.")
+        state = cls(
+            positions=np.stack([np.asarray(agent.position) for agent in agents]),
+            influence_factors=np.array([agent.influence_factor for agent in agents]),
+            A_matrix=cls._stack_rows([agent.A_matrix for agent in agents]),
+            B_matrix=cls._stack_rows([agent.B_matrix for agent in agents]),
+            C_matrix=cls._stack_rows([agent.C_matrix for agent in agents]),
+            D_matrix=cls._stack_rows([agent.D_matrix for agent in agents]),
+            nest_ids=nest_ids,
+            locations=np.stack([agent.location for agent in agents]),
+            **{key: value for key, value in agents[0].agent_params.items() if not key.endswith('_matrix_config')}
+        )
+        for row_index, agent in enumerate(agents):
+            agent.bind_to_row(state, row_index)
+            state._views[row_index] = agent
+        return state
+
+    @staticmethod
+    def _stack_rows(matrices: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Stacks per-agent matrices, keeping a single shared tensor when every agent uses the same read-only one.
+
+        A shared tensor is exposed as a zero-stride broadcast view, so it costs no memory per agent until
+        ``materialize`` is called on the first write.
+
+        :param matrices: One matrix per agent.
+        :return: An array of shape [n_agents, ...].
+        """
+        first = matrices[0]
+        if isinstance(first, np.ndarray) and not first.flags.writeable and all(matrix is first for matrix in matrices):
+            return np.broadcast_to(first, (len(matrices),) + first.shape)
+        return np.stack([np.asarray(matrix) for matrix in matrices])
+
+    @staticmethod
+    def _slice_rows(stacked: np.ndarray, rows: slice) -> np.ndarray:
+        """
+        Takes a block of rows of a stacked matrix, keeping shared broadcast tensors shared and copying private ones.
+
+        :param stacked: A stacked array of shape [n_agents, ...].
+        :param rows: Rows to take.
+        :return: An array of shape [len(rows), ...].
+        """
+        if not stacked.flags.writeable and stacked.strides[0] == 0:
+            return stacked[rows]
+        return np.array(stacked[rows])
+
+    def partition(self, start: int, stop: int) -> 'ColonyState':
+        """
+        Returns an independent colony holding rows ``start:stop``, used to hand a block of agents to a worker.
+
+        Shared model tensors stay shared broadcast views; every other array is copied, so the partition can be
+        stepped without touching this colony. Buffered model updates of the rows are carried over unfolded.
+
+        :param start: First row of the partition.
+        :param stop: Row after the last row of the partition.
+        :return: A new ColonyState with ``stop - start`` agents.
+        """
+        rows = slice(start, stop)
+        partition = ColonyState(
+            np.array(self.positions[rows]), np.array(self.influence_factors[rows]),
+            *(self._slice_rows(getattr(self, key), rows) for key in self.MODEL_KEYS),
+            nest_ids=np.array(self.nest_ids[rows]), locations=self.locations[rows], model_registry=self.model_registry, **self._row_params(rows)
+        )
+        partition.load_pending_updates({key: factors[:, rows] for key, factors in self.pending_updates().items()})
+        return partition
+
+    @classmethod
+    def concatenate(cls, partitions: Sequence['ColonyState']) -> 'ColonyState':
+        """
+        Reassembles partitions, in order, into one colony. Inverse of ``partition``.
+
+        A model tensor that is still a shared broadcast view with the same values in every partition stays shared;
+        otherwise the partitions' rows are concatenated into one private array. Buffered model updates, which
+        partitions stepped in lockstep hold for the same number of steps, are concatenated unfolded.
+
+        :param partitions: Partitions ordered by their first row.
+        :return: A new ColonyState.
+        """
+        n_agents = sum(partition.n_agents for partition in partitions)
+        matrices = {}
+        for key in cls.MODEL_KEYS:
+            blocks = [getattr(partition, key) for partition in partitions]
+            first = blocks[0]
+            if all(not block.flags.writeable and block.strides[0] == 0 and np.array_equal(block[0], first[0]) for block in blocks):
+                matrices[key] = np.broadcast_to(first[0], (n_agents,) + first.shape[1:])
+            else:
+                matrices[key] = np.concatenate([np.asarray(block) for block in blocks])
+        agent_params = dict(partitions[0].agent_params)
+        for key, row_dims in cls.ROW_PARAM_DIMS.items():
+            if np.ndim(agent_params.get(key)) == row_dims:
+                agent_params[key] = np.concatenate([partition.agent_params[key] for partition in partitions])
+        colony = cls(
+            np.concatenate([partition.positions for partition in partitions]),
+            np.concatenate([partition.influence_factors for partition in partitions]),
+            nest_ids=np.concatenate([partition.nest_ids for partition in partitions]),
+            locations=np.concatenate([partition.locations for partition in partitions]),
+            model_registry=partitions[0].model_registry, **matrices, **agent_params
+        )
+        pending = [partition.pending_updates() for partition in partitions]
+        colony.load_pending_updates({key: np.concatenate([updates[key] for updates in pending], axis=1) for key in pending[0]})
+        return colony
+
+    def _row_params(self, rows: Any) -> Dict[str, Any]:
+        """
+        The shared agent parameters, with per-agent parameters (see ``ROW_PARAM_DIMS``) restricted to ``rows``.
+
+        :param rows: A slice, an index array or a single row index.
+        """
+        agent_params = dict(self.agent_params)
+        for key, row_dims in self.ROW_PARAM_DIMS.items():
+            if np.ndim(agent_params.get(key)) == row_dims:
+                agent_params[key] = agent_params[key][rows]
+        return agent_params
+
+    def set_preferences(self, preferences: np.ndarray, rows: Optional[Sequence[int]] = None):
+        """
+        Replaces the preferences of every agent, or of ``rows`` only, and invalidates the cached log preferences.
+
+        Preferences of single rows turn the shared preference vector into a per-agent array of shape
+        [n_agents, observation_dim].
+
+        :param preferences: New preferences of shape [observation_dim].
+        :param rows: Optional rows to change; the other agents keep their preferences.
+        """
+        if rows is None:
+            self.agent_params['preferences'] = preferences
+        else:
+            current = self.agent_params.get('preferences')
+            if current is None:
+                raise ValueError("The colony has no preferences to change individual rows of.")
+            per_agent = np.array(np.broadcast_to(current, (self.n_agents,) + np.shape(current)[-1:]), dtype=np.result_type(current, preferences))
+            per_agent[np.asarray(rows)] = preferences
+            self.agent_params['preferences'] = per_agent
+        self.log_cache.invalidate_preferences()
+        for row_index, agent in self._views.items():
+            if rows is None or row_index in rows:
+                agent.agent_params['preferences'] = self._row_params(row_index)['preferences']
+                agent.log_cache.invalidate_preferences()
+
+    def pending_updates(self) -> Dict[str, np.ndarray]:
+        """
+        The buffered, not yet folded model-update factors, keyed ``'<accumulator>/<factor>'`` (e.g.
+        ``'action_model_updates/actions'``), each of shape [pending steps, n_agents, ...]. Empty when nothing is buffered.
+        """
+        updates = {}
+        for key in self.ACCUMULATOR_KEYS:
+            for name, factors in getattr(self, key).pending_factors().items():
+                updates[f'{key}/{name}'] = factors
+        return updates
+
+    def load_pending_updates(self, updates: Dict[str, np.ndarray]):
+        """
+        Restores buffered model-update factors saved by ``pending_updates``, without folding them.
+        """
+        for key in self.ACCUMULATOR_KEYS:
+            factors = {name[len(key) + 1:]: value for name, value in updates.items() if name.startswith(key + '/')}
+            if factors:
+                getattr(self, key).load(factors)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Pickles shared broadcast tensors as a single row and drops row views, so sending a partition to a worker
+        process costs one copy of each shared tensor instead of one per agent.
+        """
+        state = dict(self.__dict__, _views={})
+        for key in self.MODEL_KEYS:
+            stacked = state[key]
+            if not stacked.flags.writeable and stacked.strides[0] == 0:
+                state[key] = ('shared', np.array(stacked[0]), len(stacked))
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        for key in self.MODEL_KEYS:
+            if isinstance(state[key], tuple):
+                _, row, n_rows = state[key]
+                row.setflags(write=False)
+                state[key] = np.broadcast_to(row, (n_rows,) + row.shape)
+        self.__dict__.update(state)
+
+    def materialize(self, matrix_name: str):
+        """
+        Replaces a shared, read-only stacked tensor with a writable per-agent copy and rebinds existing views.
+
+        :param matrix_name: Name of the stacked matrix, e.g. 'B_matrix'.
+        """
+        stacked = getattr(self, matrix_name)
+        if stacked.flags.writeable:
+            return
+        stacked = np.array(stacked)
+        setattr(self, matrix_name, stacked)
+        for row_index, agent in self._views.items():
+            setattr(agent, matrix_name, stacked[row_index])
+
+    def shared_bytes_saved(self) -> int:
+        """
+        Number of bytes saved by keeping shared model tensors as broadcast views instead of per-agent copies.
+        """
+        return sum(getattr(self, key)[0].nbytes * (self.n_agents - 1) for key in self.MODEL_KEYS if not getattr(self, key).flags.writeable)
+
+    @property
+    def n_agents(self) -> int:
+        """
+        Number of agents (rows) in the colony.
+        """
+        return len(self.positions)
+
+    def _validate_shapes(self):
+        """
+        Ensures every stacked array has one row per agent.
+        """
+        for name in ('influence_factors', 'nest_ids', 'locations') + self.MODEL_KEYS:
+            if len(getattr(self, name)) != self.n_agents:
+                raise ValueError(f"'{name}' has {len(getattr(self, name))} rows but the colony has {self.n_agents} agents.")
+
+    def perceive(self, observations: np.ndarray, rows: Optional[np.ndarray] = None):
+        """
+        Updates every agent's beliefs from a batch of observations in one pass.
+
+        :param observations: Observations of shape [n_agents, ...], or [len(rows), ...] when ``rows`` is given.
+        :param rows: Optional indices of the agents to update; the other agents are left untouched.
+        """
+        observations = self.precision_policy.compute(observations)
+        perception_strategy = self.agent_params.get('perception_strategy')
+        if perception_strategy is None:
+            prediction_error = observations - self._predict_sensory_outcomes(rows)
+        else:
+            # Custom strategies are written against single agents, so they fall back to row views.
+            row_indices = range(len(observations)) if rows is None else rows
+            prediction_error = np.stack([perception_strategy(observation, self.view(row_index)) for row_index, observation in zip(row_indices, observations)])
+        self._update_beliefs(prediction_error, rows)
+
+    def _predict_sensory_outcomes(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Predicts sensory outcomes for all agents (or ``rows``), equivalent to ``np.dot(A, position)`` row by row.
+
+        :return: Predicted outcomes of shape [n_agents, ...].
+        """
+        A_matrix, positions = (self.A_matrix, self.positions) if rows is None else (self.A_matrix[rows], self.positions[rows])
+        return np.einsum('n...k,nk->n...', A_matrix, positions, dtype=self.precision_policy.accumulation_dtype)
+
+    def _update_beliefs(self, prediction_error: np.ndarray, rows: Optional[np.ndarray] = None):
+        """
+        Moves every agent's position (or those of ``rows``) against its prediction error, scaled by its influence factor.
+
+        :param prediction_error: Prediction errors of shape [n_agents, state_dim].
+        """
+        if rows is None:
+            self.positions -= self.influence_factors.reshape((-1,) + (1,) * (self.positions.ndim - 1)) * prediction_error
+        else:
+            self.positions[rows] -= self.influence_factors[rows].reshape((-1,) + (1,) * (self.positions.ndim - 1)) * prediction_error
+
+    def decide_next_actions(self, possible_actions: np.ndarray, rows: Optional[np.ndarray] = None, horizons: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Chooses the EFE-minimizing action of every agent (or of ``rows``) in one batched evaluation.
+
+        :param possible_actions: Candidate actions of shape [n_actions, ...], indexed like the B matrix action axis.
+        :param rows: Optional indices of the agents to decide for.
+        :param horizons: Optional planning horizon of each decided agent; agents sharing a horizon are planned in
+            one batch. Without it every agent looks one step ahead.
+        :return: Chosen actions of shape [n_agents, ...], or [len(rows), ...].
+        """
+        return np.asarray(possible_actions)[self.decide_action_indices(rows, horizons)]
+
+    def decide_action_indices(self, rows: Optional[np.ndarray] = None, horizons: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Index of the EFE-minimizing action of every agent (or of ``rows``) along the flattened B action axes.
+
+        :param rows: Optional indices of the agents to decide for.
+        :param horizons: Optional planning horizon of each decided agent, as in ``decide_next_actions``.
+        :return: Action indices of shape [n_agents], or [len(rows)].
+        """
+        state_dim = self.positions.shape[-1]
+        B_matrix, positions = (self.B_matrix, self.positions) if rows is None else (self.B_matrix[rows], self.positions[rows])
+        transition_models = B_matrix.reshape(len(positions), -1, state_dim, state_dim)
+        log_preferences = self.log_cache.log_preferences(self.agent_params.get('preferences'))
+        uncertainty = self.agent_params.get('uncertainty', 0.1)
+        if rows is not None:
+            log_preferences = log_preferences[rows] if np.ndim(log_preferences) == 2 else log_preferences
+            uncertainty = np.asarray(uncertainty)[rows] if np.ndim(uncertainty) else uncertainty
+        dtype = self.precision_policy.accumulation_dtype
+        if horizons is None:
+            return BatchedEFEEvaluator.select_actions(transition_models, positions, log_preferences, uncertainty, dtype)
+        horizons = np.asarray(horizons)
+        action_indices = np.empty(len(positions), dtype=np.intp)
+        for horizon in np.unique(horizons):
+            group = np.flatnonzero(horizons == horizon)
+            group_preferences = log_preferences[group] if np.ndim(log_preferences) == 2 else log_preferences
+            group_uncertainty = np.asarray(uncertainty)[group] if np.ndim(uncertainty) else uncertainty
+            action_indices[group] = BatchedEFEEvaluator.select_actions_planned(transition_models[group], positions[group], group_preferences, group_uncertainty, int(horizon), dtype)
+        return action_indices
+
+    def update_internal_states(self, action_indices: np.ndarray, observations: np.ndarray, previous_positions: np.ndarray):
+        """
+        Applies the Dirichlet-style A/B updates of all agents for one step.
+
+        Each agent's chosen action is credited with the step's belief transition, ``B[n, a_n] += outer(q_next, q_prev)``,
+        where ``q_prev`` are the beliefs before this step's perception and ``q_next`` the current ones; A receives
+        ``outer(observation, observation)``.
+
+        In 'online' mode the counts are folded immediately; in 'batch' mode the chosen action indices and belief
+        vectors are buffered and scatter-added into the stacked matrices every ``model_update_interval`` steps, or
+        when ``flush_model_updates`` is called.
+
+        :param action_indices: Index of each agent's action along the flattened B action axes, e.g. from
+            ``decide_action_indices``, shape [n_agents].
+        :param observations: Observations received, shape [n_agents, observation_dim].
+        :param previous_positions: Beliefs before this step's perception, shape [n_agents, state_dim].
+        """
+        self.action_model_updates.accumulate(action_indices, self.precision_policy.compute(self.positions), self.precision_policy.compute(previous_positions))
+        self.observation_model_updates.accumulate(observations, observations)
+        if self.action_model_updates.is_full():
+            self.flush_model_updates()
+
+    def flush_model_updates(self):
+        """
+        Folds all buffered count updates into the stacked A and B matrices.
+        """
+        if self.action_model_updates.pending:
+            self.materialize('B_matrix')
+            self.action_model_updates.fold_into(self.B_matrix)
+        if self.observation_model_updates.pending:
+            self._add_counts('A_matrix', self.observation_model_updates.fold())
+            self.log_cache.invalidate_observation_model()
+            for agent in self._views.values():
+                agent.log_cache.invalidate_observation_model()
+
+    def _add_counts(self, matrix_name: str, counts: np.ndarray):
+        """
+        Adds per-agent counts of shape [n_agents, i, j] to the trailing axes of a stacked matrix.
+
+        :param matrix_name: Name of the stacked matrix, e.g. 'B_matrix'.
+        :param counts: Counts to add, one [i, j] block per agent.
+        """
+        self.materialize(matrix_name)
+        stacked = getattr(self, matrix_name)
+        stacked += counts.reshape((self.n_agents,) + (1,) * (stacked.ndim - counts.ndim) + counts.shape[1:])
+
+    def move(self, directions: np.ndarray):
+        """
+        Moves all agents on the grid at once. Beliefs (``positions``) are left to perception.
+
+        :param directions: Grid displacements of shape [n_agents, 2], e.g. the chosen MOVEMENT actions.
+        """
+        self.locations += directions
+
+    def view(self, row_index: int, agent_cls: Type[ActiveInferenceAgent] = ActiveNestmate) -> ActiveInferenceAgent:
+        """
+        Returns an agent object that is a thin view over one row of the colony.
+
+        Views are created once per row and reused, so identity and any per-agent attributes survive between calls.
+
+        :param row_index: Index of the agent.
+        :param agent_cls: Agent class to expose the row as, e.g. ActiveNestmate or ActiveColony.
+        :return: The agent view.
+        """
+        agent = self._views.get(row_index)
+        if agent is None or not isinstance(agent, agent_cls):
+            # Bound directly to the row, so no per-agent state or matrices are initialized first
+            agent = agent_cls.row_view(self, row_index, self._row_params(row_index))
+            self._views[row_index] = agent
+        return agent
+
+    def views(self, agent_cls: Type[ActiveInferenceAgent] = ActiveNestmate) -> List[ActiveInferenceAgent]:
+        """
+        Returns row views for every agent of the colony.
+
+        :param agent_cls: Agent class to expose the rows as.
+        :return: A list of agent views ordered by row.
+        """
+        return [self.view(row_index, agent_cls) for row_index in range(self.n_agents)]
+
+    def nest_rows(self, nest_id: int) -> np.ndarray:
+        """
+        Returns the row indices of the agents that belong to a nest.
+
+        :param nest_id: Identifier of the nest.
+        :return: An integer array of row indices.
+        """
+        return np.flatnonzero(self.nest_ids == nest_id)
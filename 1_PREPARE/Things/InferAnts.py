@@ -1,7 +1,10 @@
 import numpy as np
 import config
-from typing import Dict, Any
-from scipy.stats import entropy
+from typing import Dict, Any, Optional
+from PolicyScoring import BatchedEFEEvaluator
+from ModelLearning import OuterProductAccumulator, TransitionCountAccumulator
+from Precision import PrecisionPolicy
+from LogKernels import LogLikelihoodCache, expected_free_energy, posterior_from_logs, safe_log, variational_free_energy
 
 class MatrixInitializer:
     """
@@ -12,29 +15,112 @@ class MatrixInitializer:
         """
         Efficiently initializes a matrix based on a configuration key and agent parameters.
 
+        The matrix is stored in the dtype of the agent's precision policy. When ``agent_params`` carries a
+        ``model_registry``, the matrix is deduplicated through it and returned as a read-only shared tensor.
+
         :param config_key: Configuration key for the matrix.
         :param agent_params: Agent parameters containing configuration.
         :param dims: Dimensions for the matrix.
         :return: A numpy array representing the initialized matrix.
         """
-        return agent_params.get(config_key, np.zeros(dims, dtype=np.float32))
+        precision_policy = PrecisionPolicy.from_params(agent_params)
+        model_registry = agent_params.get('model_registry')
+        if config_key in agent_params:
+            matrix = precision_policy.store(agent_params[config_key])
+        elif model_registry is not None:
+            # Default tensors come from the registry directly, so no per-agent zeros are allocated and hashed
+            return model_registry.zeros(dims, precision_policy.storage_dtype)
+        else:
+            matrix = np.zeros(dims, dtype=precision_policy.storage_dtype)
+        return model_registry.share(matrix) if model_registry is not None else matrix
+
+    @staticmethod
+    def check_action_count(agent_params: Dict[str, Any]):
+        """
+        Ensures the B matrix has one transition model per candidate movement, since chosen action indices
+        are looked up in ``MOVEMENT``.
+
+        :param agent_params: Agent parameters containing ACTION_MODALITIES and optionally MOVEMENT.
+        """
+        action_modalities = agent_params.get('ACTION_MODALITIES')
+        if not action_modalities:
+            return
+        movement = agent_params.get('MOVEMENT', config.ANT_AND_COLONY_CONFIG['NESTMATE']['ACTIVE_INFERENCE']['BLANKET_STATES']['ACTION']['MOVEMENT'])
+        if int(np.prod(action_modalities)) != len(movement):
+            raise ValueError(f"ACTION_MODALITIES {tuple(action_modalities)} describe {int(np.prod(action_modalities))} actions but MOVEMENT lists {len(movement)}.")
 
 class ActiveInferenceAgent:
-    def __init__(self, position: np.ndarray, influence_factor: float, **agent_params: Dict[str, Any]):
+    def __init__(self, position: np.ndarray, influence_factor: float, location: Optional[np.ndarray] = None, **agent_params: Dict[str, Any]):
         """
         Initializes an active inference agent with specified parameters and matrices.
 
         :param position: Initial position of the agent in a numpy array.
         :param influence_factor: Influence factor for agent's actions as a float.
+        :param location: Grid cell (x, y) the agent occupies, where it deposits pheromone and emits sound. Defaults to the origin.
         :param agent_params: Additional parameters for agent configuration as a dictionary.
         """
-        self.position = position
-        self.influence_factor = influence_factor
-        self.agent_params = agent_params
-        self.A_matrix = MatrixInitializer.initialize('A_matrix_config', agent_params, *agent_params.get('SENSORY_MODALITIES'), agent_params.get('OBSERVATION_DIM'))
-        self.B_matrix = MatrixInitializer.initialize('B_matrix_config', agent_params, *agent_params.get('ACTION_MODALITIES'), agent_params.get('STATE_DIM'), agent_params.get('STATE_DIM'))
+        self._initialize_parameters(agent_params)
+        self.position = self.precision_policy.store(position)
+        self.influence_factor = self.precision_policy.scalar(influence_factor)
+        self.location = np.zeros(2) if location is None else np.array(location, dtype=np.float64)
+        MatrixInitializer.check_action_count(agent_params)
+        self.A_matrix = MatrixInitializer.initialize('A_matrix_config', agent_params, *agent_params.get('SENSORY_MODALITIES', ()), agent_params.get('OBSERVATION_DIM'))
+        self.B_matrix = MatrixInitializer.initialize('B_matrix_config', agent_params, *agent_params.get('ACTION_MODALITIES', ()), agent_params.get('STATE_DIM'), agent_params.get('STATE_DIM'))
         self.C_matrix = MatrixInitializer.initialize('C_matrix_config', agent_params, agent_params.get('OBSERVATION_DIM'))
         self.D_matrix = MatrixInitializer.initialize('D_matrix_config', agent_params, agent_params.get('STATE_DIM'))
+        self.colony_state = None
+        self.row_index = None
+
+    @classmethod
+    def row_view(cls, colony_state: Any, row_index: int, agent_params: Dict[str, Any]) -> 'ActiveInferenceAgent':
+        """
+        Creates an agent bound to one row of a ColonyState without initializing a state or matrices of its own.
+
+        :param colony_state: The ColonyState holding the stacked agent arrays.
+        :param row_index: Index of the row that represents this agent.
+        :param agent_params: The agent's parameters.
+        :return: The agent view.
+        """
+        agent = cls.__new__(cls)
+        agent._initialize_parameters(agent_params)
+        agent.bind_to_row(colony_state, row_index)
+        return agent
+
+    def _initialize_parameters(self, agent_params: Dict[str, Any]):
+        """
+        Sets up everything but the state and the generative model: precision policy, parameters, log cache and
+        model-update buffers.
+
+        :param agent_params: Agent parameters as passed to the constructor.
+        """
+        self.precision_policy = PrecisionPolicy.from_params(agent_params)
+        self.agent_params = agent_params
+        self.log_cache = LogLikelihoodCache(dtype=self.precision_policy.accumulation_dtype)
+        adaptive_learning = config.ACTIVE_INFERENCE_CONFIG['ADAPTIVE_LEARNING']
+        self.model_updating = agent_params.get('model_updating', adaptive_learning['MODEL_UPDATING'])
+        fold_interval = agent_params.get('model_update_interval', adaptive_learning['BATCH_UPDATE_INTERVAL']) if self.model_updating == 'batch' else 1
+        self.action_model_updates = TransitionCountAccumulator(fold_interval)
+        self.observation_model_updates = OuterProductAccumulator(fold_interval)
+
+    def bind_to_row(self, colony_state: Any, row_index: int):
+        """
+        Rebinds the agent's state and generative model to one row of a ColonyState.
+
+        After binding, the agent is a thin view: its attributes are numpy views into the colony's stacked arrays,
+        so reads and in-place updates made through the agent and through the batched engine see the same memory.
+
+        :param colony_state: The ColonyState holding the stacked agent arrays.
+        :param row_index: Index of the row that represents this agent.
+        """
+        self.colony_state = colony_state
+        self.row_index = row_index
+        self.position = colony_state.positions[row_index]
+        self.location = colony_state.locations[row_index]
+        self.influence_factor = colony_state.influence_factors[row_index, ...]
+        self.A_matrix = colony_state.A_matrix[row_index]
+        self.B_matrix = colony_state.B_matrix[row_index]
+        self.C_matrix = colony_state.C_matrix[row_index]
+        self.D_matrix = colony_state.D_matrix[row_index]
 
     def perceive(self, observations: np.ndarray):
         """
@@ -42,6 +128,7 @@ class ActiveInferenceAgent:
 
         :param observations: New sensory observations as a numpy array.
         """
+        observations = self.precision_policy.compute(observations)
         prediction_error = self.agent_params.get('perception_strategy', lambda obs, agent: obs - agent._predict_sensory_outcomes())(observations, self)
         self._update_beliefs(prediction_error)
 
@@ -51,7 +138,7 @@ class ActiveInferenceAgent:
 
         :return: A numpy array of predicted sensory outcomes.
         """
-        return np.dot(self.A_matrix, self.position)
+        return np.matmul(self.A_matrix, self.position, dtype=self.precision_policy.accumulation_dtype)
 
     def _update_beliefs(self, prediction_error: np.ndarray):
         """
@@ -68,11 +155,20 @@ class ActiveInferenceAgent:
         :param observation: Observation as a numpy array.
         :return: Variational Free Energy as a float.
         """
-        qs = self._approximate_posterior(observation)
-        expected_log_likelihood = np.sum(qs * np.log(self.A_matrix[:, observation]))
-        kl_divergence = np.sum(qs * (np.log(qs) - np.log(self.position)))
-        vfe = -(expected_log_likelihood - kl_divergence)
-        return vfe
+        log_likelihood = self.log_cache.log_observation_model(self.A_matrix)[:, observation]
+        log_prior = safe_log(self.position, dtype=self.precision_policy.accumulation_dtype)
+        qs, log_qs = posterior_from_logs(log_likelihood, log_prior)
+        return variational_free_energy(qs, log_qs, log_likelihood, log_prior)
+
+    def _approximate_posterior(self, observation: np.ndarray) -> np.ndarray:
+        """
+        Approximates the posterior over states given an observation, using the cached log-likelihoods.
+
+        :param observation: Observation as a numpy array.
+        :return: Posterior over states as a numpy array.
+        """
+        qs, _ = posterior_from_logs(self.log_cache.log_observation_model(self.A_matrix)[:, observation], safe_log(self.position, dtype=self.precision_policy.accumulation_dtype))
+        return qs
 
     def calculate_efe(self, action: np.ndarray, future_states: np.ndarray, preferences: np.ndarray, uncertainty: float) -> float:
         """
@@ -84,10 +180,7 @@ class ActiveInferenceAgent:
         :param uncertainty: Uncertainty as a float.
         :return: Expected Free Energy as a float.
         """
-        pragmatic_value = np.sum(future_states * (np.log(future_states) - np.log(preferences)))
-        epistemic_value = entropy(future_states)
-        efe = pragmatic_value + uncertainty * epistemic_value
-        return efe
+        return expected_free_energy(future_states, self.log_cache.log_preferences(preferences), uncertainty)
 
     def decide_next_action(self) -> np.ndarray:
         """
@@ -95,71 +188,144 @@ class ActiveInferenceAgent:
 
         :return: The chosen action as a numpy array.
         """
-        possible_actions = self._generate_possible_actions()
-        efe_scores = np.array([self.calculate_efe(action, self._predict_future_states(action), self.agent_params.get('preferences'), self.agent_params.get('uncertainty', 0.1)) for action in possible_actions])
-        return possible_actions[np.argmin(efe_scores)]
+        return self._generate_possible_actions()[self.decide_action_index()]
 
-    def update_internal_states(self, action: np.ndarray, observation: np.ndarray):
+    def decide_action_index(self) -> int:
         """
-        Updates the agent's internal states based on action and observation.
+        Index of the EFE-minimizing action along the flattened B action axes, as ``ColonyState.decide_action_indices``.
 
-        :param action: Action taken by the agent as a numpy array.
-        :param observation: New observation received as a numpy array.
+        :return: The chosen action index.
         """
-        self._update_action_model(action, observation)
-        self._update_observation_model(observation)
+        future_states = self._predict_future_states()[np.newaxis]
+        log_preferences = self.log_cache.log_preferences(self.agent_params.get('preferences'))
+        efe_scores = BatchedEFEEvaluator.score(future_states, log_preferences, self.agent_params.get('uncertainty', 0.1))[0]
+        return int(np.argmin(efe_scores))
 
-    def _update_action_model(self, action: np.ndarray, observation: np.ndarray):
+    def _generate_possible_actions(self) -> np.ndarray:
         """
-        Updates the action model based on the taken action and new observation.
+        Returns the candidate movement actions of the agent.
 
-        :param action: Action taken by the agent as a numpy array.
-        :param observation: New observation received as a numpy array.
+        :return: A numpy array of shape [n_actions, 2] with one displacement per action.
+        """
+        return np.array(self.agent_params.get('MOVEMENT', config.ANT_AND_COLONY_CONFIG['NESTMATE']['ACTIVE_INFERENCE']['BLANKET_STATES']['ACTION']['MOVEMENT']))
+
+    def _predict_future_states(self) -> np.ndarray:
+        """
+        Predicts the state distribution that follows each candidate action, using one transition matrix per action.
+
+        :return: A numpy array of shape [n_actions, state_dim].
         """
-        self.B_matrix += np.outer(action, observation)
+        state_dim = self.position.shape[-1]
+        return BatchedEFEEvaluator.predict_future_states(self.B_matrix.reshape(1, -1, state_dim, state_dim), self.position[np.newaxis], dtype=self.precision_policy.accumulation_dtype)[0]
 
-    def _update_observation_model(self, observation: np.ndarray):
+    def update_internal_states(self, action_index: int, observation: np.ndarray, previous_position: np.ndarray):
         """
-        Updates the observation model based on the new observation.
+        Updates the agent's internal states with the same rule as ``ColonyState.update_internal_states``.
 
+        The chosen action's B slice is credited with the step's belief transition, ``B[a] += outer(q_next, q_prev)``,
+        and A receives ``outer(observation, observation)``. With ``model_updating == 'batch'`` the updates are
+        buffered and folded every ``model_update_interval`` steps; call ``flush_model_updates`` at episode end.
+
+        :param action_index: Index of the chosen action along the flattened B action axes, e.g. from
+            ``decide_action_index``.
         :param observation: New observation received as a numpy array.
+        :param previous_position: Beliefs before this step's perception.
+        """
+        compute = self.precision_policy.compute
+        self.action_model_updates.accumulate(action_index, compute(self.position), compute(previous_position))
+        self.observation_model_updates.accumulate(observation, observation)
+        if self.action_model_updates.is_full():
+            self.flush_model_updates()
+
+    def flush_model_updates(self):
+        """
+        Folds all buffered contributions into the A and B matrices in one update each.
+        """
+        if self.action_model_updates.pending:
+            self._ensure_private('B_matrix')
+            self.action_model_updates.fold_into(self.B_matrix)
+        if self.observation_model_updates.pending:
+            self._apply_observation_counts(self.observation_model_updates.fold())
+
+    def _apply_observation_counts(self, counts: np.ndarray):
         """
-        self.A_matrix += np.outer(observation, observation)
+        Adds accumulated counts to the observation model and invalidates the cached log-likelihoods.
+
+        :param counts: Summed outer products of observations.
+        """
+        self._ensure_private('A_matrix')
+        self.A_matrix += counts
+        self.log_cache.invalidate_observation_model()
+
+    def set_preferences(self, preferences: np.ndarray):
+        """
+        Replaces the agent's preferences and invalidates the cached log preferences. A view bound to a ColonyState
+        writes them through to its row, so the batched engine decides with them as well.
+
+        :param preferences: New preferences as a numpy array.
+        """
+        self.agent_params['preferences'] = preferences
+        self.log_cache.invalidate_preferences()
+        if self.colony_state is not None:
+            self.colony_state.set_preferences(preferences, rows=[self.row_index])
+
+    def _ensure_private(self, matrix_name: str):
+        """
+        Gives the agent a writable copy of a shared, read-only matrix before its first write.
+
+        :param matrix_name: Name of the matrix attribute, e.g. 'A_matrix'.
+        """
+        if getattr(self, matrix_name).flags.writeable:
+            return
+        if self.colony_state is not None:
+            self.colony_state.materialize(matrix_name)
+        else:
+            setattr(self, matrix_name, np.array(getattr(self, matrix_name)))
 
     def move(self, direction: np.ndarray):
         """
-        Updates the agent's position based on the chosen direction.
+        Moves the agent on the grid in the chosen direction.
 
-        :param direction: Direction to move in as a numpy array.
+        :param direction: Grid displacement (dx, dy) as a numpy array.
         """
-        self.position += direction
+        self.location += direction
 
     def release_pheromone(self, type: str, rate: float):
         """
-        Releases pheromone of a specified type at a specified rate.
+        Releases pheromone of a specified type at a specified rate at the agent's grid location.
+
+        The deposit is queued on the PheromoneField passed as ``agent_params['pheromone_field']`` and applied with
+        every other agent's deposits in one bulk scatter-add at the field's next step.
 
         :param type: Type of pheromone as a string.
-        :param rate: Rate of pheromone release as a float.
+        :param rate: Rate of pheromone release as a float, clipped to the type's ``max_rate``.
         """
-        pass
+        pheromone_field = self.agent_params.get('pheromone_field')
+        if pheromone_field is not None:
+            pheromone_field.queue(self.location, type, rate)
 
     def produce_sound(self, type: str, intensity: float):
         """
-        Produces sound of a specified type with a specified intensity.
+        Produces sound of a specified type with a specified intensity at the agent's grid location.
+
+        The emission is queued on the SoundField passed as ``agent_params['sound_field']`` and propagated with every
+        other agent's emissions in one batched pass when listeners are evaluated.
 
         :param type: Type of sound as a string.
-        :param intensity: Intensity of the sound as a float.
+        :param intensity: Intensity of the sound as a float, clipped to the configured INTENSITY_LEVELS.
         """
-        pass
+        sound_field = self.agent_params.get('sound_field')
+        if sound_field is not None:
+            sound_field.queue(self.location, type, intensity)
 
 class ActiveColony(ActiveInferenceAgent):
-    def __init__(self, position: np.ndarray, influence_factor: float, **agent_params: Dict[str, Any]):
-        super().__init__(position, influence_factor, **agent_params)
+    def _initialize_parameters(self, agent_params: Dict[str, Any]):
+        super()._initialize_parameters(agent_params)
         self.colony_config = config.ANT_AND_COLONY_CONFIG['COLONY']
 
 class ActiveNestmate(ActiveInferenceAgent):
-    def __init__(self, position: np.ndarray, influence_factor: float, **agent_params: Dict[str, Any]):
-        super().__init__(position, influence_factor, **agent_params)
+    def _initialize_parameters(self, agent_params: Dict[str, Any]):
+        super()._initialize_parameters(agent_params)
         self.nestmate_config = config.ANT_AND_COLONY_CONFIG['NESTMATE']
 
 
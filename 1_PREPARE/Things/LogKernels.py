@@ -0,0 +1,116 @@
+import numpy as np
+from scipy.special import xlogy
+from typing import Any, Optional, Tuple
+
+EPSILON = 1e-16  # Floor applied before every logarithm so that zero probabilities never yield -inf or NaN
+
+def safe_log(array: np.ndarray, epsilon: float = EPSILON, dtype: Optional[Any] = None) -> np.ndarray:
+    """
+    Natural logarithm with the argument clamped to ``epsilon`` from below.
+
+    :param array: Probabilities as a numpy array.
+    :param epsilon: Smallest value passed to the logarithm.
+    :param dtype: Optional dtype to compute in, e.g. float32 for float16-stored tensors whose range cannot
+        represent ``epsilon``.
+    :return: The clamped logarithm.
+    """
+    return np.log(np.maximum(np.asarray(array, dtype=dtype), epsilon))
+
+def posterior_from_logs(log_likelihood: np.ndarray, log_prior: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the normalized posterior over states and its logarithm without taking the log of the posterior itself.
+
+    :param log_likelihood: Log-likelihood of the observation under each state, shape [..., state_dim].
+    :param log_prior: Log prior over states, shape [..., state_dim].
+    :return: A tuple of the posterior and the log posterior.
+    """
+    log_joint = log_likelihood + log_prior
+    log_joint_max = np.max(log_joint, axis=-1, keepdims=True)
+    unnormalized = np.exp(log_joint - log_joint_max)
+    evidence = np.sum(unnormalized, axis=-1, keepdims=True)
+    log_posterior = log_joint - log_joint_max - np.log(evidence)
+    return unnormalized / evidence, log_posterior
+
+def variational_free_energy(qs: np.ndarray, log_qs: np.ndarray, log_likelihood: np.ndarray, log_prior: np.ndarray) -> np.ndarray:
+    """
+    Variational Free Energy ``-(E_q[log p(o|s)] - KL[q(s) || p(s)])`` from precomputed logarithms.
+
+    :param qs: Approximate posterior over states, shape [..., state_dim].
+    :param log_qs: Logarithm of ``qs``.
+    :param log_likelihood: Log-likelihood of the observation under each state.
+    :param log_prior: Log prior over states.
+    :return: VFE with the state axis reduced.
+    """
+    return np.sum(qs * (log_qs - log_prior - log_likelihood), axis=-1)
+
+def expected_free_energy(future_states: np.ndarray, log_preferences: np.ndarray, uncertainty: float) -> np.ndarray:
+    """
+    Expected Free Energy of predicted future states from cached log preferences.
+
+    The pragmatic term is ``sum(q * (log q - log C))`` and the epistemic term is the entropy of ``q`` after
+    renormalization, written as ``log Z - sum(q log q) / Z`` so that both terms share one ``xlogy(q, q)`` evaluation.
+
+    :param future_states: Predicted future states, shape [..., state_dim].
+    :param log_preferences: Cached log preferences, broadcastable to ``future_states``.
+    :param uncertainty: Weight of the epistemic term, broadcastable to the reduced shape.
+    :return: EFE with the state axis reduced.
+    """
+    # xlogy makes exact zeros contribute 0; the floor keeps round-off below zero finite, as in safe_log
+    q_log_q = np.sum(xlogy(future_states, np.maximum(future_states, EPSILON)), axis=-1)
+    pragmatic_value = q_log_q - np.sum(future_states * log_preferences, axis=-1)
+    total_mass = np.maximum(np.sum(future_states, axis=-1), EPSILON)
+    epistemic_value = np.log(total_mass) - q_log_q / total_mass
+    return pragmatic_value + uncertainty * epistemic_value
+
+class LogLikelihoodCache:
+    """
+    Caches ``log A`` and ``log C`` for one agent (or one stacked colony) between model updates.
+
+    Entries are recomputed when the source array object changes (e.g. after a copy-on-write or a rebind to a
+    ColonyState row) or after an explicit invalidation for in-place updates.
+    """
+    def __init__(self, epsilon: float = EPSILON, dtype: Optional[Any] = None):
+        self.epsilon = epsilon
+        self.dtype = dtype
+        self._observation_model: Optional[np.ndarray] = None
+        self._log_observation_model: Optional[np.ndarray] = None
+        self._preferences: Optional[np.ndarray] = None
+        self._log_preferences: Optional[np.ndarray] = None
+
+    def log_observation_model(self, observation_model: np.ndarray) -> np.ndarray:
+        """
+        Returns the cached clamped logarithm of the observation model (A).
+
+        :param observation_model: The agent's current A matrix.
+        :return: ``log A`` with zeros clamped to ``log(epsilon)``.
+        """
+        if self._log_observation_model is None or self._observation_model is not observation_model:
+            self._observation_model = observation_model
+            self._log_observation_model = safe_log(observation_model, self.epsilon, self.dtype)
+        return self._log_observation_model
+
+    def log_preferences(self, preferences: np.ndarray) -> np.ndarray:
+        """
+        Returns the cached clamped logarithm of the preferences (C).
+
+        :param preferences: The agent's current preferences.
+        :return: ``log C`` with zeros clamped to ``log(epsilon)``.
+        """
+        if self._log_preferences is None or self._preferences is not preferences:
+            self._preferences = preferences
+            self._log_preferences = safe_log(preferences, self.epsilon, self.dtype)
+        return self._log_preferences
+
+    def invalidate_observation_model(self):
+        """
+        Drops the cached ``log A`` after an in-place update of the observation model.
+        """
+        self._observation_model = None
+        self._log_observation_model = None
+
+    def invalidate_preferences(self):
+        """
+        Drops the cached ``log C`` after the preferences change.
+        """
+        self._preferences = None
+        self._log_preferences = None
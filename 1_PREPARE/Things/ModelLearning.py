@@ -0,0 +1,156 @@
+import numpy as np
+from typing import Dict, Optional
+
+class OuterProductAccumulator:
+    """
+    Buffers the factors of per-step outer-product (Dirichlet count) updates and folds them in one batched product.
+
+    Instead of adding ``np.outer(left, right)`` to a model matrix on every step, the left and right vectors are
+    written into preallocated buffers; ``fold`` returns ``sum_t outer(left_t, right_t)`` as a single einsum.
+    Leading batch axes (e.g. one row per agent of a ColonyState) are carried through unchanged.
+    """
+    def __init__(self, fold_interval: int = 1):
+        """
+        :param fold_interval: Number of steps buffered before ``is_full`` reports that a fold is due.
+        """
+        if fold_interval < 1:
+            raise ValueError("The fold interval must be a positive integer.")
+        self.fold_interval = fold_interval
+        self._left: Optional[np.ndarray] = None
+        self._right: Optional[np.ndarray] = None
+        self._count = 0
+
+    def accumulate(self, left: np.ndarray, right: np.ndarray):
+        """
+        Records one step's update factors.
+
+        :param left: Left factor of the outer product, shape [..., i].
+        :param right: Right factor of the outer product, shape [..., j].
+        """
+        left, right = np.asarray(left), np.asarray(right)
+        if self._left is None:
+            self._left = np.empty((self.fold_interval,) + left.shape, dtype=np.result_type(left, right))
+            self._right = np.empty((self.fold_interval,) + right.shape, dtype=self._left.dtype)
+        if self._count == self.fold_interval:
+            raise RuntimeError("The accumulator is full; fold it before accumulating more updates.")
+        self._left[self._count] = left
+        self._right[self._count] = right
+        self._count += 1
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of buffered steps not yet folded.
+        """
+        return self._count
+
+    def pending_factors(self) -> Dict[str, np.ndarray]:
+        """
+        The buffered factors of the steps not yet folded, keyed 'left' and 'right', shape [pending, ...] each.
+        """
+        if self._count == 0:
+            return {}
+        return {'left': self._left[:self._count], 'right': self._right[:self._count]}
+
+    def load(self, factors: Dict[str, np.ndarray]):
+        """
+        Replaces the buffer with previously buffered factors, e.g. from ``pending_factors`` of a checkpoint.
+
+        :param factors: Factors keyed like ``pending_factors``, each of shape [pending, ...].
+        """
+        left, right = np.asarray(factors['left']), np.asarray(factors['right'])
+        if len(left) > self.fold_interval:
+            raise ValueError(f"Cannot load {len(left)} buffered steps into an accumulator that folds every {self.fold_interval}.")
+        self._count = len(left)
+        if self._count == 0:
+            return
+        self._left = np.empty((self.fold_interval,) + left.shape[1:], dtype=np.result_type(left, right))
+        self._right = np.empty((self.fold_interval,) + right.shape[1:], dtype=self._left.dtype)
+        self._left[:self._count] = left
+        self._right[:self._count] = right
+
+    def is_full(self) -> bool:
+        """
+        Whether ``fold_interval`` steps have been buffered.
+        """
+        return self._count >= self.fold_interval
+
+    def fold(self) -> np.ndarray:
+        """
+        Returns the summed outer products of all buffered steps and clears the buffer.
+
+        :return: ``sum_t outer(left_t, right_t)`` of shape [..., i, j].
+        """
+        if self._count == 0:
+            raise RuntimeError("There are no buffered updates to fold.")
+        left, right = self._left[:self._count], self._right[:self._count]
+        self._count = 0
+        if len(left) == 1:
+            return left[0][..., :, np.newaxis] * right[0][..., np.newaxis, :]
+        return np.einsum('t...i,t...j->...ij', left, right)
+
+class TransitionCountAccumulator(OuterProductAccumulator):
+    """
+    Buffers the transition-count updates ``B[..., a, :, :] += outer(q_next, q_prev)`` of the chosen action only.
+
+    Each step records the chosen action index next to the two belief vectors, so the buffer grows with the number
+    of states rather than with ``n_actions * n_states``. ``fold_into`` scatter-adds the summed outer products into
+    the chosen action slices of the transition model.
+    """
+    def __init__(self, fold_interval: int = 1):
+        super().__init__(fold_interval)
+        self._actions: Optional[np.ndarray] = None
+
+    def accumulate(self, actions: np.ndarray, left: np.ndarray, right: np.ndarray):
+        """
+        Records one step's chosen actions and belief transitions.
+
+        :param actions: Chosen action index along the flattened action axes, shape [...] (a scalar for one agent).
+        :param left: Beliefs after the step, shape [..., n_states].
+        :param right: Beliefs before the step, shape [..., n_states].
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        if self._actions is None:
+            self._actions = np.empty((self.fold_interval,) + actions.shape, dtype=np.intp)
+        slot = self._count
+        super().accumulate(left, right)
+        self._actions[slot] = actions
+
+    def pending_factors(self) -> Dict[str, np.ndarray]:
+        """
+        The buffered factors keyed 'left', 'right' and 'actions', shape [pending, ...] each.
+        """
+        factors = super().pending_factors()
+        if factors:
+            factors['actions'] = self._actions[:self._count]
+        return factors
+
+    def load(self, factors: Dict[str, np.ndarray]):
+        actions = np.asarray(factors['actions'], dtype=np.intp)
+        super().load(factors)
+        if self._count:
+            self._actions = np.empty((self.fold_interval,) + actions.shape[1:], dtype=np.intp)
+            self._actions[:self._count] = actions
+
+    def fold(self) -> np.ndarray:
+        raise TypeError("Transition counts are folded into a model with fold_into.")
+
+    def fold_into(self, transition_model: np.ndarray):
+        """
+        Adds the buffered counts to the chosen action slices of a transition model in place and clears the buffer.
+
+        :param transition_model: Writable, contiguous model of shape [..., *action_axes, n_states, n_states], whose
+            leading axes match the buffered action indices.
+        """
+        if self._count == 0:
+            raise RuntimeError("There are no buffered updates to fold.")
+        left, right, actions = self._left[:self._count], self._right[:self._count], self._actions[:self._count]
+        self._count = 0
+        n_states = left.shape[-1]
+        batch = int(np.prod(actions.shape[1:], dtype=np.intp))
+        # Assigning the shape raises instead of silently copying if the model is not a reshapeable view
+        slices = transition_model.view()
+        slices.shape = (batch, -1, n_states, n_states)
+        counts = (left[..., :, np.newaxis] * right[..., np.newaxis, :]).reshape(-1, n_states, n_states)
+        rows = np.broadcast_to(np.arange(batch), (len(actions), batch)).ravel()
+        np.add.at(slices, (rows, actions.reshape(-1)), counts.astype(slices.dtype, copy=False))
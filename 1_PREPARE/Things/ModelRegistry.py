@@ -0,0 +1,110 @@
+import hashlib
+import numpy as np
+from typing import Dict, Any, Tuple
+
+class ModelRegistry:
+    """
+    A registry that deduplicates generative-model tensors by content hash.
+
+    Agents built from identical parameters receive the same read-only array instead of private copies.
+    Writers are expected to copy on first write (see ActiveInferenceAgent._ensure_private).
+    """
+    def __init__(self):
+        self._tensors: Dict[str, np.ndarray] = {}
+        self._references: Dict[str, int] = {}
+        self._digests_by_tensor_id: Dict[int, str] = {}
+        self._zero_digests: Dict[Tuple[Tuple[int, ...], str], str] = {}
+
+    @staticmethod
+    def digest(array: np.ndarray) -> str:
+        """
+        Computes a content hash covering the dtype, shape and raw bytes of an array.
+
+        :param array: The array to hash.
+        :return: A hexadecimal digest.
+        """
+        array = np.ascontiguousarray(array)
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(array.dtype.str.encode())
+        hasher.update(str(array.shape).encode())
+        hasher.update(array.data)
+        return hasher.hexdigest()
+
+    def _lookup_digest(self, array: np.ndarray) -> str:
+        """
+        Returns the digest of an array, without rehashing tensors the registry handed out itself.
+
+        Only the registry's own tensors are remembered by id; they stay alive for as long as the registry does, so
+        their ids cannot be reused. Any other source array is hashed on every call and never retained.
+
+        :param array: The array to hash.
+        :return: A hexadecimal digest.
+        """
+        digest = self._digests_by_tensor_id.get(id(array))
+        if digest is not None and self._tensors.get(digest) is array:
+            return digest
+        return self.digest(array)
+
+    def share(self, array: np.ndarray) -> np.ndarray:
+        """
+        Returns a read-only shared array with the same content as ``array``.
+
+        :param array: The tensor to deduplicate.
+        :return: The canonical read-only tensor for that content.
+        """
+        array = np.asarray(array)
+        digest = self._lookup_digest(array)
+        shared = self._tensors.get(digest)
+        if shared is None:
+            shared = np.array(array, copy=True)
+            shared.setflags(write=False)
+            self._tensors[digest] = shared
+            self._references[digest] = 0
+            self._digests_by_tensor_id[id(shared)] = digest
+        self._references[digest] += 1
+        return shared
+
+    def zeros(self, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        """
+        Returns the shared read-only zero tensor of a shape and dtype, allocating it only once.
+
+        :param shape: Shape of the tensor.
+        :param dtype: Dtype of the tensor.
+        :return: The canonical read-only zero tensor.
+        """
+        shape, dtype = tuple(int(dim) for dim in shape), np.dtype(dtype)
+        key = (shape, dtype.str)
+        digest = self._zero_digests.get(key)
+        if digest is None:
+            digest = self._zero_digests[key] = self.digest(np.zeros(shape, dtype=dtype))
+        shared = self._tensors.get(digest)
+        if shared is None:
+            return self.share(np.zeros(shape, dtype=dtype))
+        self._references[digest] += 1
+        return shared
+
+    def bytes_stored(self) -> int:
+        """
+        Number of bytes held by the unique tensors of the registry.
+        """
+        return sum(tensor.nbytes for tensor in self._tensors.values())
+
+    def bytes_saved(self) -> int:
+        """
+        Number of bytes that private per-agent copies would have needed, minus everything the registry itself holds.
+        """
+        private_bytes = sum(tensor.nbytes * self._references[digest] for digest, tensor in self._tensors.items())
+        return private_bytes - self.bytes_stored()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarizes the deduplication achieved by the registry.
+
+        :return: A dictionary with the unique tensor count, reference count, and bytes stored and saved.
+        """
+        return {
+            'unique_tensors': len(self._tensors),
+            'references': sum(self._references.values()),
+            'bytes_stored': self.bytes_stored(),
+            'bytes_saved': self.bytes_saved(),
+        }
@@ -0,0 +1,165 @@
+import logging
+import numpy as np
+from typing import Any, Dict, Optional
+import config
+
+def normalized_entropy(beliefs: np.ndarray) -> np.ndarray:
+    """
+    Entropy of each belief over the last axis, divided by its maximum ``log(state_dim)``, so it lies in [0, 1].
+
+    :param beliefs: Beliefs of shape [n_agents, state_dim]; rows need not be normalized.
+    :return: Normalized entropies of shape [n_agents].
+    """
+    beliefs = np.maximum(np.asarray(beliefs, dtype=np.float64), 0.0)
+    beliefs = beliefs / np.maximum(beliefs.sum(axis=-1, keepdims=True), 1e-16)
+    entropy = -np.sum(beliefs * np.log(np.maximum(beliefs, 1e-16)), axis=-1)
+    return entropy / max(np.log(beliefs.shape[-1]), 1e-16)
+
+class HorizonController:
+    """
+    Chooses each agent's planning horizon per step from its belief entropy, within a global compute budget.
+
+    An agent's desired horizon grows linearly with the normalized entropy of its beliefs, from ``min_horizon`` for
+    a certain agent to ``max_horizon`` for a uniform one (the 'contextual_complexity' strategy). Exhaustive
+    planning over ``h`` steps expands ``sum(n_actions ** k for k in 1..h)`` predicted states per agent, so the
+    colony's work is dominated by its longest horizons; the controller clips all desired horizons at the largest
+    common cap whose total work fits the budget.
+
+    The budget is given in FLOPs, in milliseconds per step, or both (the tighter one applies). A millisecond budget
+    is converted to FLOPs with running estimates of the time per planning FLOP and of the fixed, non-planning time
+    of a step, both fed back by ``record``: a step that overran shrinks the cap at once, and slack lets it grow by
+    one per step. A FLOP budget alone is deterministic; a millisecond budget makes horizons depend on timing.
+
+    With ``adaptive`` off every agent plans over the same horizon: ``max_horizon``, or the longest horizon whose
+    work for the whole colony fits the budget when it does not.
+    """
+    def __init__(self, n_actions: int, state_dim: int, max_horizon: int, min_horizon: int = 1, adaptive: bool = True,
+                 budget_ms: Optional[float] = None, budget_flops: Optional[float] = None, smoothing: float = 0.2, n_agents: Optional[int] = None):
+        """
+        :param n_actions: Number of candidate actions per step.
+        :param state_dim: Size of the state space.
+        :param max_horizon: Longest horizon an agent may plan over.
+        :param min_horizon: Shortest horizon, kept even when it exceeds the budget.
+        :param adaptive: When False, every agent plans over ``max_horizon``, clamped to the budget.
+        :param budget_ms: Target wall time of one step, in milliseconds.
+        :param budget_flops: Planning FLOPs allowed per step over the whole colony.
+        :param smoothing: Weight of the newest measurement in the running time estimates.
+        :param n_agents: Expected colony size, used to check ``max_horizon`` against ``budget_flops`` up front;
+            a single agent is assumed when it is not given.
+        """
+        if not 1 <= min_horizon <= max_horizon:
+            raise ValueError("Planning horizons must satisfy 1 <= min_horizon <= max_horizon.")
+        self.min_horizon = int(min_horizon)
+        self.max_horizon = int(max_horizon)
+        self.adaptive = adaptive
+        self.budget_ms = budget_ms
+        self.budget_flops = budget_flops
+        self.smoothing = smoothing
+        # work_per_agent[h] is the FLOP count of planning over h steps; one predicted state costs 2 * state_dim ** 2
+        expansions = np.cumsum(float(n_actions) ** np.arange(1, self.max_horizon + 1))
+        self.work_per_agent = np.concatenate([[0.0], 2.0 * state_dim ** 2 * expansions])
+        self.cap = self.min_horizon
+        self.seconds_per_flop: Optional[float] = None
+        self.overhead_seconds = 0.0
+        self.last_work = 0.0
+        self._validate_budget(1 if n_agents is None else int(n_agents))
+
+    def _validate_budget(self, n_agents: int) -> None:
+        """
+        Checks the horizon range against the FLOP budget: fails when even ``min_horizon`` cannot be afforded, and
+        warns when ``max_horizon`` will be clamped.
+        """
+        if self.budget_flops is None:
+            return
+        affordable = self.affordable_horizon(n_agents, float(self.budget_flops))
+        if self.work_per_agent[self.min_horizon] * n_agents > self.budget_flops:
+            raise ValueError(f"A budget of {self.budget_flops:g} FLOPs cannot plan {n_agents} agent(s) over the minimum horizon of {self.min_horizon}.")
+        if affordable < self.max_horizon:
+            logging.warning(f"Planning horizon {self.max_horizon} exceeds the budget of {self.budget_flops:g} FLOPs for {n_agents} agent(s); horizons are capped at {affordable}.")
+
+    @classmethod
+    def from_config(cls, n_actions: int, state_dim: int, n_agents: Optional[int] = None) -> 'HorizonController':
+        """
+        Builds a controller from ``ACTIVE_INFERENCE_CONFIG['PLANNING_HORIZON']``.
+
+        :param n_agents: Expected colony size, against which BASE_VALUE is checked.
+        """
+        horizon = config.ACTIVE_INFERENCE_CONFIG['PLANNING_HORIZON']
+        return cls(n_actions, state_dim,
+                   max_horizon=horizon['BASE_VALUE'],
+                   min_horizon=horizon.get('MIN_VALUE', 1),
+                   adaptive=horizon.get('TYPE', 'adaptive') == 'adaptive',
+                   budget_ms=horizon.get('STEP_BUDGET_MS'),
+                   budget_flops=horizon.get('STEP_BUDGET_FLOPS'),
+                   smoothing=horizon.get('SMOOTHING', 0.2),
+                   n_agents=n_agents)
+
+    def work(self, horizons: np.ndarray) -> float:
+        """
+        Planning FLOPs of one step of agents with the given horizons.
+        """
+        return float(self.work_per_agent[np.asarray(horizons)].sum())
+
+    def work_budget(self) -> float:
+        """
+        FLOPs the next step may spend on planning, or infinity when no budget applies yet.
+        """
+        budget = np.inf if self.budget_flops is None else float(self.budget_flops)
+        if self.budget_ms is not None and self.seconds_per_flop is not None:
+            budget = min(budget, max(self.budget_ms / 1000.0 - self.overhead_seconds, 0.0) / self.seconds_per_flop)
+        return budget
+
+    def affordable_horizon(self, n_agents: int, budget: float) -> int:
+        """
+        Longest horizon up to ``max_horizon`` that ``n_agents`` agents can all plan over within ``budget`` FLOPs,
+        but never below ``min_horizon``.
+        """
+        affordable = np.flatnonzero(self.work_per_agent[:self.max_horizon + 1] * n_agents <= budget)
+        return max(self.min_horizon, int(affordable[-1]) if len(affordable) else self.min_horizon)
+
+    def horizons(self, beliefs: np.ndarray) -> np.ndarray:
+        """
+        Horizons of the next step.
+
+        :param beliefs: Current beliefs of shape [n_agents, state_dim].
+        :return: Integer horizons of shape [n_agents], in [min_horizon, max_horizon].
+        """
+        n_agents = len(beliefs)
+        if not self.adaptive:
+            self.cap = self.affordable_horizon(n_agents, self.work_budget())
+            self.last_work = self.work_per_agent[self.cap] * n_agents
+            return np.full(n_agents, self.cap, dtype=np.intp)
+        span = self.max_horizon - self.min_horizon
+        desired = self.min_horizon + np.rint(span * normalized_entropy(beliefs)).astype(np.intp)
+        # Total work of every candidate cap, from the histogram of desired horizons
+        counts = np.bincount(desired, minlength=self.max_horizon + 1)
+        caps = np.arange(self.max_horizon + 1)
+        capped_work = np.array([np.dot(counts, self.work_per_agent[np.minimum(caps, cap)]) for cap in caps])
+        affordable = np.flatnonzero(capped_work <= self.work_budget())
+        best = int(affordable[-1]) if len(affordable) else self.min_horizon
+        # Shrink at once when over budget, but grow by at most one step at a time
+        self.cap = max(self.min_horizon, min(best, self.cap + 1))
+        horizons = np.minimum(desired, self.cap)
+        self.last_work = self.work(horizons)
+        return horizons
+
+    def record(self, step_seconds: float, planning_seconds: float) -> None:
+        """
+        Feeds back the measured wall time of the step planned by the last ``horizons`` call.
+
+        :param step_seconds: Wall time of the whole step.
+        :param planning_seconds: Part of it spent choosing actions.
+        """
+        alpha = self.smoothing
+        if self.last_work > 0:
+            rate = planning_seconds / self.last_work
+            self.seconds_per_flop = rate if self.seconds_per_flop is None else (1 - alpha) * self.seconds_per_flop + alpha * rate
+        self.overhead_seconds = (1 - alpha) * self.overhead_seconds + alpha * max(step_seconds - planning_seconds, 0.0)
+        if self.budget_ms is not None and step_seconds * 1000.0 > self.budget_ms:
+            logging.debug(f"Step took {step_seconds * 1000.0:.1f} ms of a {self.budget_ms} ms budget; planning horizon cap is {self.cap}.")
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Current cap and time estimates, e.g. for reporting.
+        """
+        return {'cap': self.cap, 'seconds_per_flop': self.seconds_per_flop, 'overhead_seconds': self.overhead_seconds, 'last_work': self.last_work}
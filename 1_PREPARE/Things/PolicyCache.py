@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+_POLICY_CACHE: Dict[Tuple[Tuple[int, ...], int], np.ndarray] = {}
+_POLICY_CACHE_LOCK = threading.Lock()
+
+def controls_per_factor(num_states: Sequence[int], controllable_factors: Optional[Sequence[int]] = None) -> Tuple[int, ...]:
+    """
+    Number of control states of each hidden-state factor, following pymdp's ``construct_policies`` defaults:
+    a controllable factor has one control per state, an uncontrollable factor has a single (null) control.
+    """
+    controllable_factors = range(len(num_states)) if controllable_factors is None else set(controllable_factors)
+    return tuple(int(n) if factor in controllable_factors else 1 for factor, n in enumerate(num_states))
+
+def policy_count(num_controls: Sequence[int], policy_length: int) -> int:
+    """
+    Number of policies for the given controls per factor and policy length.
+    """
+    return int(np.prod(num_controls, dtype=np.int64)) ** policy_length
+
+def decode_policies(indices: np.ndarray, num_controls: Sequence[int], policy_length: int) -> np.ndarray:
+    """
+    Decodes flat policy indices into action sequences of shape [len(indices), policy_length, num_factors].
+
+    Policy ``i`` is the mixed-radix expansion of ``i`` over ``num_controls * policy_length`` digits, which is the
+    ordering of ``itertools.product`` used by pymdp's ``construct_policies``.
+    """
+    digits = np.unravel_index(indices, tuple(num_controls) * policy_length)
+    return np.stack(digits, axis=-1).reshape(len(indices), policy_length, len(num_controls))
+
+def policies_for_controls(num_controls: Sequence[int], policy_length: int) -> np.ndarray:
+    """
+    Returns the full policy array for the given controls, enumerating it at most once per process.
+
+    The returned array is shared between all callers and is read-only.
+    """
+    key = (tuple(int(n) for n in num_controls), int(policy_length))
+    policies = _POLICY_CACHE.get(key)
+    if policies is None:
+        with _POLICY_CACHE_LOCK:
+            policies = _POLICY_CACHE.get(key)
+            if policies is None:
+                policies = decode_policies(np.arange(policy_count(*key)), *key)
+                policies.setflags(write=False)
+                _POLICY_CACHE[key] = policies
+    return policies
+
+def cached_policies(num_states: Sequence[int], num_factors: int, policy_length: int, controllable_factors: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Cached replacement for ``control.construct_policies(num_states, None, policy_length, controllable_factors)``.
+
+    Agents with the same ``(num_states, num_factors, policy_length, controllable_factors)`` share one read-only
+    array of shape [n_policies, policy_length, num_factors].
+    """
+    if len(num_states) != num_factors:
+        raise ValueError(f"Expected {num_factors} state factors, got {len(num_states)}.")
+    return policies_for_controls(controls_per_factor(num_states, controllable_factors), policy_length)
+
+def iter_policy_chunks(num_controls: Sequence[int], policy_length: int, chunk_size: int = 4096) -> Iterator[np.ndarray]:
+    """
+    Streams the policy space in chunks of at most ``chunk_size`` policies without materializing all of it.
+
+    Chunks follow the same ordering as ``policies_for_controls`` and have shape [<= chunk_size, policy_length, num_factors].
+    """
+    total = policy_count(num_controls, policy_length)
+    for start in range(0, total, chunk_size):
+        yield decode_policies(np.arange(start, min(start + chunk_size, total)), num_controls, policy_length)
+
+def clear_policy_cache() -> None:
+    """
+    Drops every cached policy array.
+    """
+    with _POLICY_CACHE_LOCK:
+        _POLICY_CACHE.clear()
+
+def cached_policy_keys() -> List[Tuple[Tuple[int, ...], int]]:
+    """
+    Lists the ``(num_controls, policy_length)`` keys currently held by the cache.
+    """
+    return list(_POLICY_CACHE)
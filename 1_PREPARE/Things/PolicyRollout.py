@@ -0,0 +1,138 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from LogKernels import safe_log
+from SparseModels import IndexTransition, SparseLikelihood
+
+def factor_list(model) -> List[np.ndarray]:
+    """
+    Returns the factors of a pymdp-style object array (or list) as a list of numeric arrays.
+    """
+    if (isinstance(model, np.ndarray) and model.dtype == object) or isinstance(model, (list, tuple)):
+        return [_as_factor(factor) for factor in model]
+    return [_as_factor(model)]
+
+def _as_factor(factor):
+    """
+    Keeps sparse factors as they are and converts everything else to a numeric array.
+    """
+    return factor if isinstance(factor, (IndexTransition, SparseLikelihood)) else np.asarray(factor)
+
+def _log_softmax(values: np.ndarray) -> np.ndarray:
+    """
+    Log of the normalized exponential, used to read pymdp-style preferences as log probabilities.
+    """
+    shifted = values - values.max()
+    return shifted - np.log(np.exp(shifted).sum())
+
+class RolloutTrie:
+    """
+    Propagates beliefs through the transition model along policies, caching every action prefix in a trie.
+
+    Each node holds the predicted state marginals after its action prefix and the expected free energy accumulated
+    along it, so policies that share their first k actions reuse the same k intermediate beliefs. Nodes are expanded
+    level by level, with all new nodes of a level computed in one batched einsum per factor.
+
+    Factors may also be sparse: IndexTransition B factors and SparseLikelihood A modalities (single-factor models)
+    are propagated without densifying them.
+    """
+    def __init__(self, transition_model, observation_model, preference_model):
+        """
+        :param transition_model: B factors of shape [n_states, n_states, n_controls], as in pymdp.
+        :param observation_model: A modalities of shape [n_observations, n_states_1, ..., n_states_F].
+        :param preference_model: C modalities, read as log preferences through a log-softmax, as in pymdp.
+        """
+        self.transition_model = factor_list(transition_model)
+        self.observation_model = factor_list(observation_model)
+        self.log_preferences = [_log_softmax(np.asarray(preferences, dtype=float)) for preferences in factor_list(preference_model)]
+        self.ambiguity = [model.state_entropy if isinstance(model, SparseLikelihood) else -np.sum(model * safe_log(model), axis=0) for model in self.observation_model]
+        self._root_states = None
+        self._nodes: Dict[Tuple, Tuple[List[np.ndarray], float]] = {}
+
+    def reset(self, root_states) -> None:
+        """
+        Sets the current posterior as the root of the trie and drops every cached prefix.
+        """
+        self._root_states = factor_list(root_states)
+        self._nodes = {(): (self._root_states, 0.0)}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _expected_observations(self, states: Sequence[np.ndarray]) -> List[np.ndarray]:
+        """
+        Predicted observation distributions of each modality for a batch of factorized state beliefs.
+
+        :param states: One array of shape [batch, n_states_f] per factor.
+        :return: One array of shape [batch, n_observations_m] per modality.
+        """
+        factor_axes = list(range(2, 2 + len(states)))
+        operands = [operand for factor, qs in zip(factor_axes, states) for operand in (qs, [0, factor])]
+        return [model.predict_observations(states[0]) if isinstance(model, SparseLikelihood) else np.einsum(model, [1] + factor_axes, *operands, [0, 1]) for model in self.observation_model]
+
+    def _node_costs(self, states: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Expected free energy contributed by one time step: risk ``KL[q(o) || C]`` plus ambiguity ``E_q(s)[H[A]]``.
+
+        :param states: One array of shape [batch, n_states_f] per factor.
+        :return: Costs of shape [batch].
+        """
+        factor_axes = list(range(1, 1 + len(states)))
+        operands = [operand for factor, qs in zip(factor_axes, states) for operand in (qs, [0, factor])]
+        costs = np.zeros(len(states[0]))
+        for expected_observations, log_preferences, ambiguity in zip(self._expected_observations(states), self.log_preferences, self.ambiguity):
+            costs += np.sum(expected_observations * (safe_log(expected_observations) - log_preferences), axis=1)
+            costs += np.einsum(ambiguity, factor_axes, *operands, [0])
+        return costs
+
+    def _expand(self, prefixes: List[Tuple]) -> None:
+        """
+        Computes the nodes for ``prefixes`` (all of the same length) from their already cached parents.
+        """
+        parents = [self._nodes[prefix[:-1]] for prefix in prefixes]
+        actions = np.array([prefix[-1] for prefix in prefixes])
+        states = []
+        for factor, transitions in enumerate(self.transition_model):
+            parent_states = np.stack([parent[0][factor] for parent in parents])
+            if isinstance(transitions, IndexTransition):
+                states.append(transitions.predict_batch(parent_states, actions[:, factor]))
+            else:
+                states.append(np.einsum('ijk,kj->ki', transitions[:, :, actions[:, factor]], parent_states))
+        costs = np.array([parent[1] for parent in parents]) + self._node_costs(states)
+        for index, prefix in enumerate(prefixes):
+            self._nodes[prefix] = ([qs[index] for qs in states], costs[index])
+
+    def _prefixes(self, policy: np.ndarray) -> List[Tuple]:
+        """
+        Action prefixes of a policy of shape [policy_length, num_factors], from length one to the full policy.
+        """
+        steps = [tuple(int(action) for action in step) for step in np.asarray(policy)]
+        return [tuple(steps[:length]) for length in range(1, len(steps) + 1)]
+
+    def evaluate(self, policies: np.ndarray) -> np.ndarray:
+        """
+        Expected free energy of every policy, expanding only prefixes not already in the trie.
+
+        :param policies: Policies of shape [n_policies, policy_length, num_factors].
+        :return: EFE per policy of shape [n_policies].
+        """
+        if self._root_states is None:
+            raise RuntimeError("RolloutTrie.reset must be called with the current posterior before evaluating policies.")
+        policy_prefixes = [self._prefixes(policy) for policy in policies]
+        for depth in range(max((len(prefixes) for prefixes in policy_prefixes), default=0)):
+            missing = list(dict.fromkeys(prefixes[depth] for prefixes in policy_prefixes if depth < len(prefixes) and prefixes[depth] not in self._nodes))
+            if missing:
+                self._expand(missing)
+        return np.array([self._nodes[prefixes[-1]][1] if prefixes else 0.0 for prefixes in policy_prefixes])
+
+    def rollout(self, policy: np.ndarray) -> Tuple[List[List[np.ndarray]], List[List[np.ndarray]]]:
+        """
+        Predicted state beliefs and observation distributions at each step of one policy.
+
+        :param policy: Policy of shape [policy_length, num_factors].
+        :return: Per-step lists of state marginals (one per factor) and of observation distributions (one per modality).
+        """
+        prefixes = self._prefixes(policy)
+        self.evaluate(np.asarray(policy)[np.newaxis])
+        future_states = [self._nodes[prefix][0] for prefix in prefixes]
+        future_observations = [[observations[0] for observations in self._expected_observations([qs[np.newaxis] for qs in states])] for states in future_states]
+        return future_states, future_observations
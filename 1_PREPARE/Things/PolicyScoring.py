@@ -0,0 +1,88 @@
+import numpy as np
+from typing import Any, Optional
+from LogKernels import expected_free_energy
+
+class BatchedEFEEvaluator:
+    """
+    Scores every candidate action of every agent with Expected Free Energy in one tensor pass.
+
+    Future states for all (agent, action) pairs are predicted with a single einsum over the stacked transition
+    models, and the pragmatic and epistemic terms share one ``p * log p`` evaluation (see LogKernels).
+    """
+    @staticmethod
+    def predict_future_states(B_matrix: np.ndarray, positions: np.ndarray, dtype: Optional[Any] = None) -> np.ndarray:
+        """
+        Predicts the state distribution after each action for each agent.
+
+        :param B_matrix: Stacked transition models of shape [n_agents, n_actions, state_dim, state_dim].
+        :param positions: Current states of shape [n_agents, state_dim].
+        :param dtype: Optional accumulation dtype, e.g. float32 for float16-stored tensors.
+        :return: Future states of shape [n_agents, n_actions, state_dim].
+        """
+        return np.einsum('naij,nj->nai', B_matrix, positions, dtype=dtype)
+
+    @staticmethod
+    def score(future_states: np.ndarray, log_preferences: np.ndarray, uncertainty: float) -> np.ndarray:
+        """
+        Computes the Expected Free Energy of every candidate future.
+
+        Matches ``ActiveInferenceAgent.calculate_efe``: the pragmatic term is ``sum(q * (log q - log C))`` and the
+        epistemic term is ``scipy.stats.entropy(q)``, i.e. the entropy of ``q`` renormalized to sum to one.
+
+        :param future_states: Future states of shape [n_agents, n_actions, state_dim].
+        :param log_preferences: Cached log preferences of shape [state_dim] or [n_agents, state_dim].
+        :param uncertainty: Weight of the epistemic term, as a scalar or an array of shape [n_agents].
+        :return: EFE scores of shape [n_agents, n_actions].
+        """
+        log_preferences = np.asarray(log_preferences)
+        if log_preferences.ndim == 2:
+            log_preferences = log_preferences[:, np.newaxis]
+        return expected_free_energy(future_states, log_preferences, np.reshape(uncertainty, (-1, 1)))
+
+    @classmethod
+    def select_actions(cls, B_matrix: np.ndarray, positions: np.ndarray, log_preferences: np.ndarray, uncertainty: float = 0.1, dtype: Optional[Any] = None) -> np.ndarray:
+        """
+        Picks the EFE-minimizing action index for every agent.
+
+        :param B_matrix: Stacked transition models of shape [n_agents, n_actions, state_dim, state_dim].
+        :param positions: Current states of shape [n_agents, state_dim].
+        :param log_preferences: Cached log preferences of shape [state_dim] or [n_agents, state_dim].
+        :param uncertainty: Weight of the epistemic term.
+        :param dtype: Optional accumulation dtype.
+        :return: Chosen action indices of shape [n_agents].
+        """
+        efe_scores = cls.score(cls.predict_future_states(B_matrix, positions, dtype), log_preferences, uncertainty)
+        return np.argmin(efe_scores, axis=1)
+
+    @classmethod
+    def select_actions_planned(cls, B_matrix: np.ndarray, positions: np.ndarray, log_preferences: np.ndarray, uncertainty: float = 0.1, horizon: int = 1, dtype: Optional[Any] = None) -> np.ndarray:
+        """
+        Picks, for every agent, the first action of the action sequence of length ``horizon`` with the lowest
+        cumulative EFE.
+
+        Sequences are expanded breadth-first, one einsum per step over all agents and all prefixes, so each prefix
+        is predicted once. Work and memory grow as ``n_actions ** horizon``; see PlanningHorizon.HorizonController.
+
+        :param B_matrix: Stacked transition models of shape [n_agents, n_actions, state_dim, state_dim].
+        :param positions: Current states of shape [n_agents, state_dim].
+        :param log_preferences: Cached log preferences of shape [state_dim] or [n_agents, state_dim].
+        :param uncertainty: Weight of the epistemic term, as a scalar or an array of shape [n_agents].
+        :param horizon: Number of steps to plan over; 1 is ``select_actions``.
+        :param dtype: Optional accumulation dtype.
+        :return: Chosen first-action indices of shape [n_agents].
+        """
+        if horizon <= 1:
+            return cls.select_actions(B_matrix, positions, log_preferences, uncertainty, dtype)
+        n_agents, n_actions = B_matrix.shape[:2]
+        log_preferences = np.asarray(log_preferences)
+        if log_preferences.ndim == 2:
+            log_preferences = log_preferences[:, np.newaxis, np.newaxis]
+        uncertainty = np.reshape(uncertainty, (-1, 1, 1))
+        states = positions[:, np.newaxis]
+        cumulative_efe = np.zeros((n_agents, 1), dtype=dtype or positions.dtype)
+        for _ in range(horizon):
+            future_states = np.einsum('naij,npj->npai', B_matrix, states, dtype=dtype)
+            cumulative_efe = (cumulative_efe[..., np.newaxis] + expected_free_energy(future_states, log_preferences, uncertainty)).reshape(n_agents, -1)
+            states = future_states.reshape(n_agents, -1, future_states.shape[-1])
+        # Sequences are laid out first action major, so the first action is the leading mixed-radix digit
+        return np.argmin(cumulative_efe, axis=1) // n_actions ** (horizon - 1)
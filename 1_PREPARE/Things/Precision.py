@@ -0,0 +1,69 @@
+import numpy as np
+import config
+from typing import Dict, Any, Optional
+
+class PrecisionPolicy:
+    """
+    A colony-wide floating-point policy: one dtype for stored agent tensors and one for arithmetic.
+
+    Storage and accumulation dtypes are usually identical (float32 by default). Setting the storage dtype to
+    float16 halves the memory of the stacked agent tensors while every kernel still accumulates in float32.
+    """
+    def __init__(self, storage_dtype: Any = np.float32, accumulation_dtype: Optional[Any] = None):
+        """
+        :param storage_dtype: Dtype of stored positions and generative-model tensors.
+        :param accumulation_dtype: Dtype used for intermediate results; defaults to the storage dtype, but is
+            never narrower than float32.
+        """
+        self.storage_dtype = np.dtype(storage_dtype)
+        self.accumulation_dtype = np.promote_types(np.dtype(accumulation_dtype or storage_dtype), np.float32)
+
+    @classmethod
+    def from_config(cls, computation_settings: Optional[Dict[str, Any]] = None) -> 'PrecisionPolicy':
+        """
+        Builds the policy from ``SIMULATION_SETTINGS['COMPUTATION_SETTINGS']``.
+
+        :param computation_settings: Settings to read, defaulting to the global configuration.
+        :return: A PrecisionPolicy.
+        """
+        settings = computation_settings or config.SIMULATION_SETTINGS['COMPUTATION_SETTINGS']
+        return cls(settings.get('DTYPE', 'float32'), settings.get('ACCUMULATION_DTYPE'))
+
+    @staticmethod
+    def from_params(agent_params: Dict[str, Any]) -> 'PrecisionPolicy':
+        """
+        Returns the policy carried by ``agent_params``, or the configured default.
+
+        :param agent_params: Agent parameters, optionally holding a 'precision_policy'.
+        :return: A PrecisionPolicy.
+        """
+        return agent_params.get('precision_policy') or DEFAULT_PRECISION_POLICY
+
+    def store(self, array: Any) -> np.ndarray:
+        """
+        Converts an array to the storage dtype, without copying when it already matches.
+
+        :param array: Array-like to convert.
+        :return: The array in the storage dtype.
+        """
+        return np.asarray(array, dtype=self.storage_dtype)
+
+    def compute(self, array: Any) -> np.ndarray:
+        """
+        Converts an array to the accumulation dtype, without copying when it already matches.
+
+        :param array: Array-like to convert.
+        :return: The array in the accumulation dtype.
+        """
+        return np.asarray(array, dtype=self.accumulation_dtype)
+
+    def scalar(self, value: float) -> np.generic:
+        """
+        Converts a Python or numpy scalar to the accumulation dtype so it does not promote arrays it multiplies.
+
+        :param value: Scalar to convert.
+        :return: The scalar in the accumulation dtype.
+        """
+        return self.accumulation_dtype.type(value)
+
+DEFAULT_PRECISION_POLICY = PrecisionPolicy.from_config()
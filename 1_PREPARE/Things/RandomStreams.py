@@ -0,0 +1,63 @@
+import hashlib
+import logging
+import numpy as np
+from typing import Optional, Union
+import config
+
+def _stream_key(name: str) -> int:
+    """
+    Stable 32-bit key of a stream name, independent of Python's per-process string hashing.
+    """
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=4).digest(), 'little')
+
+class RandomStreams:
+    """
+    A hierarchy of independent random streams derived from one root ``numpy.random.SeedSequence``.
+
+    A stream is addressed by a path such as ``('nest', 3)`` or ``('agent', 3, 17)``, and its seed depends only on
+    the root entropy and that path, not on the order in which streams are requested. So a nest, agent or worker
+    draws the same numbers whether the colony is initialized serially, in batches or across any number of workers.
+    """
+    def __init__(self, seed: Optional[Union[int, np.random.SeedSequence]] = None):
+        """
+        :param seed: Root seed or SeedSequence. Without one, fresh entropy is drawn and logged so the run can be
+            replayed by passing it back.
+        """
+        self.root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        if seed is None:
+            logging.info(f"Random streams seeded with entropy {self.root.entropy}; pass it as SEED to replay this run.")
+
+    @classmethod
+    def from_config(cls) -> 'RandomStreams':
+        """
+        Builds the hierarchy from ``SIMULATION_SETTINGS['SEED']``.
+        """
+        return cls(config.SIMULATION_SETTINGS.get('SEED'))
+
+    def seed_sequence(self, name: str, *indices: int) -> np.random.SeedSequence:
+        """
+        The SeedSequence of the stream at ``(name, *indices)`` below this node.
+        """
+        key = (_stream_key(name),) + tuple(int(index) for index in indices)
+        return np.random.SeedSequence(self.root.entropy, spawn_key=self.root.spawn_key + key)
+
+    def generator(self, name: str, *indices: int) -> np.random.Generator:
+        """
+        A fresh Generator for the stream at ``(name, *indices)``; requesting the same path again restarts it.
+        """
+        return np.random.default_rng(self.seed_sequence(name, *indices))
+
+    def child(self, name: str, *indices: int) -> 'RandomStreams':
+        """
+        The sub-hierarchy rooted at ``(name, *indices)``, e.g. to hand a worker its own streams.
+        """
+        return RandomStreams(self.seed_sequence(name, *indices))
+
+    def nest(self, nest_id: int) -> np.random.Generator:
+        return self.generator('nest', nest_id)
+
+    def agent(self, nest_id: int, agent_id: int) -> np.random.Generator:
+        return self.generator('agent', nest_id, agent_id)
+
+    def worker(self, worker_id: int) -> np.random.Generator:
+        return self.generator('worker', worker_id)
@@ -0,0 +1,126 @@
+import numpy as np
+from scipy import sparse
+from typing import Optional, Sequence, Union
+from LogKernels import safe_log
+
+class IndexTransition:
+    """
+    A deterministic transition model stored as an index array instead of a dense [n_states, n_states, n_actions] tensor.
+
+    ``next_state[action, state]`` is the single successor of ``state`` under ``action``; the equivalent dense tensor
+    in pymdp layout has ``B[next_state[a, s], s, a] = 1`` and zeros elsewhere.
+    """
+    def __init__(self, next_state: np.ndarray, n_states: Optional[int] = None):
+        """
+        :param next_state: Successor indices of shape [n_actions, n_states].
+        :param n_states: Size of the state space, defaulting to the number of columns of ``next_state``.
+        """
+        self.next_state = np.asarray(next_state, dtype=np.intp)
+        self.n_actions, n_columns = self.next_state.shape
+        self.n_states = n_columns if n_states is None else n_states
+        self.shape = (self.n_states, n_columns, self.n_actions)
+
+    @property
+    def nbytes(self) -> int:
+        return self.next_state.nbytes
+
+    def predict(self, qs: np.ndarray, action: int) -> np.ndarray:
+        """
+        Pushes a belief over states through one action, equivalent to ``B[:, :, action] @ qs``.
+        """
+        return np.bincount(self.next_state[action], weights=qs, minlength=self.n_states)
+
+    def predict_batch(self, qs: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        """
+        Pushes a batch of beliefs through one action each in a single scatter-add.
+
+        :param qs: Beliefs of shape [batch, n_states].
+        :param actions: Action index per belief, shape [batch].
+        :return: Predicted beliefs of shape [batch, n_states].
+        """
+        batch = len(qs)
+        targets = self.next_state[actions] + (np.arange(batch) * self.n_states)[:, np.newaxis]
+        return np.bincount(targets.ravel(), weights=qs.ravel(), minlength=batch * self.n_states).reshape(batch, self.n_states)
+
+    def to_csr(self, action: int) -> sparse.csr_matrix:
+        """
+        Returns ``B[:, :, action]`` as a CSR matrix.
+        """
+        n_columns = self.next_state.shape[1]
+        return sparse.csr_matrix((np.ones(n_columns), (self.next_state[action], np.arange(n_columns))), shape=self.shape[:2])
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Materializes the dense pymdp-layout tensor ``B[next, current, action]``.
+        """
+        dense = np.zeros(self.shape)
+        n_columns = self.next_state.shape[1]
+        dense[self.next_state, np.arange(n_columns)[np.newaxis, :], np.arange(self.n_actions)[:, np.newaxis]] = 1.0
+        return dense
+
+class SparseLikelihood:
+    """
+    An observation model ``A[observation, state]`` stored as a CSR matrix.
+    """
+    def __init__(self, matrix):
+        self.matrix = sparse.csr_matrix(matrix)
+        self.shape = self.matrix.shape
+        data = self.matrix.data
+        # Column-wise entropy H[A(:, s)], accumulated over the non-zero entries only
+        self.state_entropy = -np.bincount(self.matrix.indices, weights=data * safe_log(data), minlength=self.shape[1])
+
+    @classmethod
+    def identity(cls, n_observations: int, n_states: int) -> 'SparseLikelihood':
+        """
+        Sparse counterpart of ``np.eye(n_observations, n_states)``.
+        """
+        return cls(sparse.eye(n_observations, n_states, format='csr'))
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+
+    def likelihood(self, observation: int) -> np.ndarray:
+        """
+        Dense likelihood of one observation over states, i.e. the row ``A[observation, :]``.
+        """
+        return self.matrix.getrow(observation).toarray()[0]
+
+    def predict_observations(self, qs: np.ndarray) -> np.ndarray:
+        """
+        Expected observations ``A @ qs`` for a belief of shape [n_states] or a batch of shape [batch, n_states].
+        """
+        return (self.matrix @ np.asarray(qs).T).T
+
+    def to_dense(self) -> np.ndarray:
+        return self.matrix.toarray()
+
+def joint_posterior(likelihoods: Sequence[Union[np.ndarray, SparseLikelihood]], observations: Sequence[int], prior: np.ndarray) -> np.ndarray:
+    """
+    Exact posterior of a single hidden factor given one observation per modality,
+    ``softmax(sum_m log A_m[o_m, :] + log prior)``.
+
+    :param likelihoods: Observation model of each modality, dense [n_observations, n_states] or SparseLikelihood.
+    :param observations: Observed index of each modality.
+    :param prior: Prior over states.
+    :return: Posterior over states.
+    """
+    log_joint = safe_log(prior)
+    for likelihood, observation in zip(likelihoods, observations):
+        row = likelihood.likelihood(observation) if isinstance(likelihood, SparseLikelihood) else likelihood[observation]
+        log_joint = log_joint + safe_log(row)
+    posterior = np.exp(log_joint - log_joint.max())
+    return posterior / posterior.sum()
+
+def sparse_expected_free_energy(likelihood: SparseLikelihood, log_preferences: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """
+    One-step EFE (risk plus ambiguity) of predicted beliefs, evaluated without densifying A.
+
+    :param likelihood: Sparse observation model.
+    :param log_preferences: Log preferences over observations.
+    :param qs: Predicted beliefs of shape [n_states] or [batch, n_states].
+    :return: EFE per belief.
+    """
+    expected_observations = likelihood.predict_observations(qs)
+    risk = np.sum(expected_observations * (safe_log(expected_observations) - log_preferences), axis=-1)
+    return risk + np.asarray(qs) @ likelihood.state_entropy
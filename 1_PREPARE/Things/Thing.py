@@ -1,20 +1,26 @@
 from pymdp import inference, control, utils
 import numpy as np
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from autograd import numpy as np_auto
+from Precision import PrecisionPolicy, DEFAULT_PRECISION_POLICY
+from PolicyCache import cached_policies
+from PolicyRollout import RolloutTrie
+from SparseModels import IndexTransition, SparseLikelihood
+from ThingBatch import ThingBatch
 
 class Thing:
     """
     A Thing class that utilizes active inference, leveraging the pymdp library for interaction with its environment.
     """
-    def __init__(self, observation_model: np.ndarray, transition_model: np.ndarray, preference_model: np.ndarray, initial_state_distribution: np.ndarray, policy_prior: Optional[np.ndarray] = None, policy_length: int = 1, inference_depth: int = 1, controllable_factors: Optional[List[int]] = None, possible_policies: Optional[np.ndarray] = None):
+    def __init__(self, observation_model: np.ndarray, transition_model: np.ndarray, preference_model: np.ndarray, initial_state_distribution: np.ndarray, policy_prior: Optional[np.ndarray] = None, policy_length: int = 1, inference_depth: int = 1, controllable_factors: Optional[List[int]] = None, possible_policies: Optional[np.ndarray] = None, precision_policy: Optional[PrecisionPolicy] = None):
         """
         Initializes the Thing with models of the environment, preferences, and initial states.
         """
-        self.observation_model = utils.to_obj_array(observation_model)
-        self.transition_model = utils.to_obj_array(transition_model)
-        self.preference_model = preference_model
-        self.initial_state_distribution = initial_state_distribution
+        self.precision_policy = precision_policy or DEFAULT_PRECISION_POLICY
+        self.observation_model = self._store_factors(utils.to_obj_array(observation_model))
+        self.transition_model = self._store_factors(utils.to_obj_array(transition_model))
+        self.preference_model = self._store_factors(utils.to_obj_array(preference_model))
+        self.initial_state_distribution = self._store_factors(utils.to_obj_array(initial_state_distribution))
         self.policy_prior = policy_prior if policy_prior is not None else self._initialize_policy_prior()
         self.policy_length = policy_length
         self.inference_depth = inference_depth
@@ -25,6 +31,34 @@ class Thing:
         self.model_dimensions = self._calculate_model_dimensions()
         self.posterior_states = self.initial_state_distribution
         self.updated_policies = None
+        self.rollout_trie = None
+        self._rollout_root = None
+        self._pymdp_models = None
+
+    def _store_factors(self, factors: np.ndarray) -> np.ndarray:
+        """
+        Converts every dense factor of an object array to the storage dtype of the precision policy.
+        Sparse factors (IndexTransition, SparseLikelihood) are kept as they are.
+        """
+        for index, factor in enumerate(factors):
+            if not isinstance(factor, (IndexTransition, SparseLikelihood)):
+                factors[index] = self.precision_policy.store(factor)
+        return factors
+
+    def _dense_models(self) -> (np.ndarray, np.ndarray):
+        """
+        The observation and transition models as pymdp accepts them, with sparse factors densified once and cached.
+        Sparse factors serve the rollout and EFE paths; pymdp's inference and control only take dense arrays.
+        """
+        if self._pymdp_models is None:
+            models = []
+            for factors in (self.observation_model, self.transition_model):
+                dense = np.empty(len(factors), dtype=object)
+                for index, factor in enumerate(factors):
+                    dense[index] = factor.to_dense() if isinstance(factor, (IndexTransition, SparseLikelihood)) else factor
+                models.append(dense)
+            self._pymdp_models = tuple(models)
+        return self._pymdp_models
 
     def _construct_generative_model(self) -> Dict[str, Any]:
         """
@@ -66,15 +100,28 @@ class Thing:
     def _generate_possible_policies(self) -> np.ndarray:
         """
         Generates a set of possible policies based on the model dimensions and controllable factors.
+        Policies are shared, read-only arrays enumerated once per process for each model shape.
         """
-        return control.construct_policies(self.model_dimensions['num_states'], self.model_dimensions['num_factors'], self.policy_length, self.controllable_factors)
+        return cached_policies(self.model_dimensions['num_states'], self.model_dimensions['num_factors'], self.policy_length, self.controllable_factors)
+
+    def set_policy_length(self, policy_length: int) -> None:
+        """
+        Changes the planning horizon, e.g. as chosen by PlanningHorizon.HorizonController. The possible policies come
+        from the shared policy cache, so switching between horizons does not re-enumerate them.
+        """
+        if policy_length == self.policy_length:
+            return
+        self.policy_length = policy_length
+        self.possible_policies = self._generate_possible_policies()
+        self.updated_policies = None
 
     def update_beliefs(self, observation: np.ndarray) -> None:
         """
         Updates the Thing's beliefs based on new observations.
         """
-        self.posterior_states = inference.update_posterior_states(self.observation_model, observation, self.transition_model, self.posterior_states, self.policy_length, self.inference_depth)
-        self.updated_policies, _ = control.update_posterior_policies(self.posterior_states, self.observation_model, self.transition_model, self.preference_model, self.possible_policies, self.policy_prior)
+        observation_model, transition_model = self._dense_models()
+        self.posterior_states = inference.update_posterior_states(observation_model, observation, transition_model, self.posterior_states, self.policy_length, self.inference_depth)
+        self.updated_policies, _ = control.update_posterior_policies(self.posterior_states, observation_model, transition_model, self.preference_model, self.possible_policies, self.policy_prior)
 
     def select_action(self) -> np.ndarray:
         """
@@ -88,6 +135,19 @@ class Thing:
         """
         self.update_beliefs(observation)
         return self.select_action()
+
+    @staticmethod
+    def step_all(things: Sequence['Thing'], observations: np.ndarray) -> np.ndarray:
+        """
+        Executes a decision-making cycle for many Things. Things with a single hidden-state and control factor that
+        share their possible policies are stepped together by one vectorized ThingBatch; any others step one by one.
+
+        :param observations: Observation indices of shape [n_things, n_modalities].
+        :return: Actions of shape [n_things, num_factors], as returned by ``step``.
+        """
+        if ThingBatch.supports(things):
+            return ThingBatch(things).step(observations)[:, np.newaxis].astype(np.float64)
+        return np.stack([thing.step(observation) for thing, observation in zip(things, observations)])
     
     def calculate_vfe(self, observation: np.ndarray) -> float:
         """
@@ -108,27 +168,28 @@ class Thing:
         """
         Calculates the Expected Free Energy (EFE) for a given policy.
         """
-        future_states, future_observations = self.simulate_future(policy)
-        
-        preferences = self.preference_model
-        
-        efe = 0.0
-        for obs in future_observations:
-            for state in future_states:
-                q_state = self.posterior_states[state]
-                q_obs = future_observations[obs]
-                p_desired = preferences[obs]
-                
-                efe_component = q_state * q_obs * (np_auto.log(q_state) - np_auto.log(p_desired))
-                efe += efe_component
-        
-        return efe
+        return float(self._rollout_trie().evaluate(np.asarray(policy)[np.newaxis])[0])
 
-    def simulate_future(self, policy: np.ndarray) -> (np.ndarray, np.ndarray):
+    def evaluate_policies(self) -> np.ndarray:
+        """
+        Calculates the Expected Free Energy of every possible policy at once, reusing shared policy prefixes.
+        """
+        return self._rollout_trie().evaluate(self.possible_policies)
+
+    def simulate_future(self, policy: np.ndarray) -> (List[List[np.ndarray]], List[List[np.ndarray]]):
         """
         Simulates future states and observations based on the given policy.
+        Returns, for each step of the policy, the state marginals per factor and the observation distributions per modality.
+        """
+        return self._rollout_trie().rollout(policy)
+
+    def _rollout_trie(self) -> RolloutTrie:
+        """
+        Returns the rollout trie rooted at the current posterior, rebuilding its cache when the posterior has changed.
         """
-        # Implementation to be defined based on transition_model and observation_model
-        future_states = np.zeros(self.model_dimensions['num_states'])
-        future_observations = np.zeros(self.model_dimensions['num_observations'])
-        return future_states, future_observations
+        if self.rollout_trie is None:
+            self.rollout_trie = RolloutTrie(self.transition_model, self.observation_model, self.preference_model)
+        if self._rollout_root is not self.posterior_states:
+            self.rollout_trie.reset(self.posterior_states)
+            self._rollout_root = self.posterior_states
+        return self.rollout_trie
@@ -0,0 +1,193 @@
+import numpy as np
+from typing import List, Optional, Sequence
+from LogKernels import safe_log
+
+OUTCOME_EPSILON = np.exp(-16)  # pymdp's spm_MDP_G floor, both for outcome log-probabilities and for states worth evaluating
+
+def _factor(model: np.ndarray, index: int = 0) -> np.ndarray:
+    """
+    Returns one factor of a pymdp-style object array, or the array itself when it is already numeric.
+    """
+    if isinstance(model, np.ndarray) and model.dtype == object:
+        return np.asarray(model[index])
+    if isinstance(model, (list, tuple)):
+        return np.asarray(model[index])
+    return np.asarray(model)
+
+def _modalities(model: np.ndarray) -> List[np.ndarray]:
+    """
+    Returns the factors of a pymdp-style object array as a list of numeric arrays.
+    """
+    if (isinstance(model, np.ndarray) and model.dtype == object) or isinstance(model, (list, tuple)):
+        return [np.asarray(factor) for factor in model]
+    return [np.asarray(model)]
+
+def _joint_likelihood(models: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Likelihood of every combination of outcomes across modalities, of shape [n_agents, prod(n_observations), n_states],
+    with the first modality varying slowest (as pymdp's ``spm_cross``).
+    """
+    joint = models[0]
+    for model in models[1:]:
+        joint = np.einsum('nas,nbs->nabs', joint, model).reshape(len(joint), -1, joint.shape[-1])
+    return joint
+
+def _softmax(log_values: np.ndarray) -> np.ndarray:
+    """
+    Normalized exponential along the last axis.
+    """
+    shifted = np.exp(log_values - log_values.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+class ThingBatch:
+    """
+    Runs state inference, policy evaluation and action sampling for many same-shaped Things in vectorized numpy.
+
+    Observation models, transition models, preferences and posteriors of the Things are stacked along a leading
+    agent axis. Every kernel is row-independent, so each agent's result is identical to running a batch of that
+    single agent. Models must have a single hidden-state factor and a single control factor; any number of
+    observation modalities is supported.
+
+    The single-factor equations are implemented directly rather than through pymdp, following pymdp's
+    ``inference.update_posterior_states``, ``control.update_posterior_policies`` (utility plus state information
+    gain over the joint outcome, as ``spm_MDP_G``) and ``control.sample_action``, including their log floors.
+    Deterministic action selection, pymdp's default, breaks exact ties by the lowest action index where pymdp
+    picks one at random; stochastic selection draws from ``rng`` rather than pymdp's global random state.
+    """
+    def __init__(self, things: Sequence, gamma: float = 16.0):
+        """
+        Stacks the generative models of ``things``; they must share model shapes and possible policies.
+        """
+        if not things:
+            raise ValueError("ThingBatch needs at least one Thing.")
+        self.things = list(things)
+        self.gamma = gamma
+        if any(len(_modalities(thing.transition_model)) != 1 or len(_modalities(thing.posterior_states)) != 1 for thing in self.things):
+            raise ValueError("ThingBatch supports models with a single hidden-state factor.")
+        self.observation_model = [np.stack(models) for models in zip(*(_modalities(thing.observation_model) for thing in self.things))]
+        self.transition_model = np.stack([_factor(thing.transition_model) for thing in self.things])
+        self.preference_model = [np.stack(models) for models in zip(*(_modalities(thing.preference_model) for thing in self.things))]
+        self.posterior_states = np.stack([_factor(thing.posterior_states) for thing in self.things])
+        self.possible_policies = np.asarray(self.things[0].possible_policies)
+        if self.possible_policies.ndim != 3 or self.possible_policies.shape[-1] != 1:
+            raise ValueError("ThingBatch supports policies over a single control factor, of shape [n_policies, policy_length, 1].")
+        self.log_policy_prior = self._stack_log_policy_prior()
+        self.log_observation_model = [safe_log(model) for model in self.observation_model]
+        self.log_preferences = [safe_log(_softmax(model)) for model in self.preference_model]
+        self.joint_observation_model = _joint_likelihood(self.observation_model)
+        self.outcome_negentropy = np.einsum('nos,nos->ns', self.joint_observation_model, np.log(self.joint_observation_model + OUTCOME_EPSILON))
+        self.updated_policies: Optional[np.ndarray] = None
+
+    def _stack_log_policy_prior(self) -> np.ndarray:
+        """
+        Stacks each Thing's policy prior as log probabilities over policies, defaulting to a uniform prior.
+        """
+        n_policies = len(self.possible_policies)
+        priors = []
+        for thing in self.things:
+            prior = getattr(thing, 'policy_prior', None)
+            prior = np.ones(n_policies) / n_policies if prior is None or np.size(prior) != n_policies else np.ravel(prior)
+            priors.append(safe_log(prior / prior.sum()))
+        return np.stack(priors)
+
+    def update_posterior_states(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Updates the posterior over hidden states of every agent.
+
+        For a single hidden-state factor the fixed-point iteration converges in one step to
+        ``softmax(sum_m log A_m[o_m] + log prior)``, which is what is computed here for all agents at once.
+
+        :param observations: Observation indices of shape [n_agents, n_modalities].
+        :return: Posteriors of shape [n_agents, n_states].
+        """
+        observations = np.asarray(observations).reshape(len(self.things), -1)
+        agents = np.arange(len(self.things))
+        log_posterior = safe_log(self.posterior_states)
+        for modality, log_model in enumerate(self.log_observation_model):
+            log_posterior = log_posterior + log_model[agents, observations[:, modality], :]
+        self.posterior_states = _softmax(log_posterior)
+        return self.posterior_states
+
+    def update_posterior_policies(self) -> np.ndarray:
+        """
+        Evaluates the negative expected free energy (utility plus state information gain) of every policy for every
+        agent and returns ``softmax(gamma * G + log E)`` of shape [n_agents, n_policies].
+
+        Each time step applies one agent's transition matrix per distinct action to the policies taking it, so no
+        [n_agents, n_states, n_states, n_policies] gather of transition matrices is built.
+        """
+        n_agents, n_policies = len(self.things), len(self.possible_policies)
+        qs_pi = np.repeat(self.posterior_states[:, np.newaxis, :], n_policies, axis=1)
+        G = np.zeros((n_agents, n_policies))
+        for time_step in range(self.possible_policies.shape[1]):
+            actions = self.possible_policies[:, time_step, 0]
+            for action in np.unique(actions):
+                taking = actions == action
+                qs_pi[:, taking] = np.einsum('nij,npj->npi', self.transition_model[:, :, :, action], qs_pi[:, taking])
+            for model, log_preferences in zip(self.observation_model, self.log_preferences):
+                G += np.einsum('nos,nps,no->np', model, qs_pi, log_preferences)
+            # Information gain over the joint outcome, counting only states above pymdp's floor
+            qs_evaluated = np.where(qs_pi > OUTCOME_EPSILON, qs_pi, 0.0)
+            qo_joint = np.einsum('nos,nps->npo', self.joint_observation_model, qs_evaluated)
+            G += np.einsum('nps,ns->np', qs_evaluated, self.outcome_negentropy) - np.einsum('npo,npo->np', qo_joint, np.log(qo_joint + 1e-16))
+        self.updated_policies = _softmax(self.gamma * G + self.log_policy_prior)
+        return self.updated_policies
+
+    def sample_actions(self, rng: Optional[np.random.Generator] = None, action_selection: str = 'deterministic', alpha: float = 16.0) -> np.ndarray:
+        """
+        Selects every agent's next action from its marginal posterior over first actions, as pymdp's ``sample_action``.
+
+        :param rng: Random generator for stochastic selection; ``n_agents`` uniforms are drawn from it in agent order.
+        :param action_selection: 'deterministic' (the most probable action) or 'stochastic' (a sample from
+            ``softmax(alpha * log marginal)``).
+        :param alpha: Action precision of stochastic selection.
+        :return: Action indices of shape [n_agents].
+        """
+        first_actions = self.possible_policies[:, 0, 0]
+        action_marginals = self.updated_policies @ np.eye(first_actions.max() + 1)[first_actions]
+        action_marginals /= action_marginals.sum(axis=1, keepdims=True)
+        if action_selection == 'deterministic':
+            return np.argmax(action_marginals, axis=1)
+        if action_selection != 'stochastic':
+            raise ValueError(f"Unknown action selection '{action_selection}'. Expected 'deterministic' or 'stochastic'.")
+        if rng is None:
+            raise ValueError("Stochastic action selection needs a random generator.")
+        cumulative = np.cumsum(_softmax(alpha * np.log(action_marginals + 1e-16)), axis=1)
+        thresholds = rng.random(len(self.things)) * cumulative[:, -1]
+        return np.argmax(cumulative > thresholds[:, np.newaxis], axis=1)
+
+    @staticmethod
+    def supports(things: Sequence) -> bool:
+        """
+        Whether ``things`` can be stepped as one batch: single-factor models over one control factor, with the same
+        possible policies.
+        """
+        if not things:
+            return False
+        policies = np.asarray(things[0].possible_policies)
+        return policies.ndim == 3 and policies.shape[-1] == 1 and all(
+            len(_modalities(thing.transition_model)) == 1 and len(_modalities(thing.posterior_states)) == 1
+            and _factor(thing.transition_model).dtype != object and np.array_equal(np.asarray(thing.possible_policies), policies) for thing in things
+        )
+
+    def step(self, observations: np.ndarray, rng: Optional[np.random.Generator] = None, action_selection: str = 'deterministic') -> np.ndarray:
+        """
+        Runs a full decision-making cycle for every agent and writes the posteriors back to the Things, keeping each
+        Thing's container type (a pymdp object array stays an object array).
+
+        :param observations: Observation indices of shape [n_agents, n_modalities].
+        :param rng: Random generator used for stochastic action selection.
+        :param action_selection: 'deterministic' (pymdp's default) or 'stochastic'.
+        :return: Action indices of shape [n_agents].
+        """
+        self.update_posterior_states(observations)
+        self.update_posterior_policies()
+        actions = self.sample_actions(rng, action_selection)
+        for thing, posterior, policies in zip(self.things, self.posterior_states, self.updated_policies):
+            if isinstance(thing.posterior_states, np.ndarray) and thing.posterior_states.dtype == object:
+                factors = np.empty(1, dtype=object)
+                factors[0] = posterior
+                posterior = factors
+            thing.posterior_states = posterior
+            thing.updated_policies = policies
+        return actions
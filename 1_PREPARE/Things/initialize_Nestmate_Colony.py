@@ -1,29 +1,52 @@
+import logging
 import numpy as np
 from InferAnts import ActiveNestmate
-from typing import List, Dict, Any, Tuple
-from .configs.config import config
-from .configs.metaconfig import metaconfig
+from ColonyState import ColonyState
+from ModelRegistry import ModelRegistry
+from Precision import PrecisionPolicy
+from RandomStreams import RandomStreams
+from typing import List, Dict, Any, Optional, Tuple
+import config
+import metaconfig
 
 class ColonyInitializer:
-    def __init__(self, env_config: Dict[str, Any], ant_config: Dict[str, Any], meta_config: Dict[str, Any]):
+    def __init__(self, env_config: Dict[str, Any], ant_config: Dict[str, Any], meta_config: Dict[str, Any], random_streams: Optional[RandomStreams] = None,
+                 environment_fields: Optional[Dict[str, Any]] = None):
         self.env_config = env_config
         self.ant_config = ant_config
         self.meta_config = meta_config
+        self.random_streams = random_streams or RandomStreams.from_config()
+        # Shared environment channels, e.g. {'pheromone_field': ..., 'sound_field': ...}, handed to every nestmate
+        self.environment_fields = environment_fields or {}
+        self.model_registry = ModelRegistry()
+        self.precision_policy = PrecisionPolicy.from_config()
 
     def initialize_colony(self, nest_count: int, agent_count_per_nest: int) -> List[List[ActiveNestmate]]:
-        return [self._initialize_nest(nest_id, agent_count_per_nest) for nest_id in range(nest_count)]
+        colony = [self._initialize_nest(nest_id, agent_count_per_nest) for nest_id in range(nest_count)]
+        logging.info(f"Generative model deduplication: {self.model_registry.report()}")
+        return colony
+
+    def initialize_colony_state(self, nest_count: int, agent_count_per_nest: int) -> ColonyState:
+        nests = self.initialize_colony(nest_count, agent_count_per_nest)
+        agents = [nestmate for nest in nests for nestmate in nest]
+        nest_ids = np.repeat(np.arange(nest_count), agent_count_per_nest)
+        return ColonyState.from_agents(agents, nest_ids=nest_ids)
 
     def _initialize_nest(self, nest_id: int, agent_count: int) -> List[ActiveNestmate]:
-        positions = np.random.choice(self.env_config['NEST_POSITIONS'], size=agent_count, replace=False)
-        return [self._initialize_single_nestmate(nest_id, nestmate_id, self._generate_developmental_parameters(), position) for nestmate_id, position in enumerate(positions)]
+        # Each nest draws from its own stream, in batches, so a nest is reproducible however the colony is built
+        rng = self.random_streams.nest(nest_id)
+        positions = rng.choice(self.env_config['NEST_POSITIONS'], size=agent_count, replace=False)
+        influence_factors = rng.uniform(*self.ant_config['INFLUENCE_FACTOR_RANGE'], size=agent_count)
+        developmental_parameters = self._generate_developmental_parameters(rng, agent_count)
+        return [self._initialize_single_nestmate(nest_id, nestmate_id, parameters, position, influence_factor)
+                for nestmate_id, (parameters, position, influence_factor) in enumerate(zip(developmental_parameters, positions, influence_factors))]
 
-    def _initialize_single_nestmate(self, nest_id: int, nestmate_id: int, developmental_parameters: Dict[str, Any], position: Tuple[int, int]) -> ActiveNestmate:
-        influence_factor = np.random.uniform(*self.ant_config['INFLUENCE_FACTOR_RANGE'])
-        agent_params = {**self.meta_config['ACTIVE_INFERENCE'], **developmental_parameters}
-        return ActiveNestmate(position=position, influence_factor=influence_factor, **agent_params)
+    def _initialize_single_nestmate(self, nest_id: int, nestmate_id: int, developmental_parameters: Dict[str, Any], position: Tuple[int, int], influence_factor: float) -> ActiveNestmate:
+        agent_params = {**self.meta_config['ACTIVE_INFERENCE'], **developmental_parameters, **self.environment_fields,
+                        'model_registry': self.model_registry, 'precision_policy': self.precision_policy}
+        return ActiveNestmate(position=position, influence_factor=influence_factor, location=position, **agent_params)
 
-    def _generate_developmental_parameters(self) -> Dict[str, Any]:
-        return {
-            'growth_rate': np.random.uniform(0.1, 1.0),
-            'exploration_tendency': np.random.choice(['low', 'medium', 'high']),
-        }
+    def _generate_developmental_parameters(self, rng: np.random.Generator, agent_count: int) -> List[Dict[str, Any]]:
+        growth_rates = rng.uniform(0.1, 1.0, size=agent_count)
+        exploration_tendencies = rng.choice(['low', 'medium', 'high'], size=agent_count)
+        return [{'growth_rate': growth_rate, 'exploration_tendency': tendency} for growth_rate, tendency in zip(growth_rates, exploration_tendencies)]
@@ -2,21 +2,27 @@ import numpy as np
 from typing import List, Optional, Dict, Any
 from tabulate import tabulate  # Import tabulate for table formatting
 from termcolor import colored  # Import termcolor for coloring text
+from PolicyCache import policies_for_controls
+from RandomStreams import RandomStreams
 
 class NestmateAgent:
     """
     An agent that employs active inference for decision-making within an ant colony, leveraging a comprehensive model of its environment and nestmate dynamics, based on a partially-observable Markov decision process.
     """
-    def __init__(self, num_observations: List[int], num_states: List[int], num_actions: List[int], policy_length: int = 1, inference_depth: int = 1):
+    def __init__(self, num_observations: List[int], num_states: List[int], num_actions: List[int], policy_length: int = 1, inference_depth: int = 1, rng: Optional[np.random.Generator] = None,
+                 nest_id: int = 0, agent_id: int = 0, random_streams: Optional[RandomStreams] = None):
         """
         Initializes the NestmateAgent with dimensions for the environment, nestmate dynamics, and its preferences.
+        Random model entries are drawn from ``rng``, by default the agent's own ``random_streams.agent(nest_id, agent_id)`` stream
+        (of the configured SEED), so no two nestmates share a model.
         """
-        self.observation_model = [np.random.rand(num_obs, num_state) for num_obs, num_state in zip(num_observations, num_states)]
-        self.transition_model = [np.random.rand(num_state, num_state) for num_state in num_states]
+        rng = rng or (random_streams or RandomStreams.from_config()).agent(nest_id, agent_id)
+        self.observation_model = [rng.random((num_obs, num_state)) for num_obs, num_state in zip(num_observations, num_states)]
+        self.transition_model = [rng.random((num_state, num_state)) for num_state in num_states]
         self.preference_model = [np.eye(num_obs) for num_obs in num_observations]  # Identity matrices as placeholder preferences
-        self.initial_state_distribution = [np.random.dirichlet(np.ones(num_state)) for num_state in num_states]
+        self.initial_state_distribution = [rng.dirichlet(np.ones(num_state)) for num_state in num_states]
         
-        self.policy_prior = np.random.rand(np.prod(num_actions) ** policy_length)
+        self.policy_prior = rng.random(np.prod(num_actions) ** policy_length)
         
         self.generative_model = {
             'observation_model': self.observation_model,
@@ -43,19 +49,9 @@ class NestmateAgent:
 
     def _generate_possible_policies(self, num_actions: List[int]) -> np.ndarray:
         """
-        Generates the set of feasible policies based on the agent's models.
+        Generates the set of feasible policies based on the agent's models, reusing the process-wide policy cache.
         """
-        num_policies = np.prod([action ** self.policy_length for action in num_actions])
-        possible_policies = np.zeros((num_policies, self.policy_length, len(num_actions)), dtype=int)
-        
-        # Generate all possible policies
-        for policy_index in range(num_policies):
-            policy = np.unravel_index(policy_index, [action for action in num_actions] * self.policy_length)
-            for time_step in range(self.policy_length):
-                for factor_index, action in enumerate(policy[time_step * len(num_actions): (time_step + 1) * len(num_actions)]):
-                    possible_policies[policy_index, time_step, factor_index] = action
-        
-        return possible_policies
+        return policies_for_controls(num_actions, self.policy_length)
 
     def _output_variable_shapes(self) -> None:
         """
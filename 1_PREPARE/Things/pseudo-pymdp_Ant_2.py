@@ -2,22 +2,28 @@ import numpy as np
 from typing import List, Optional, Dict, Any
 from tabulate import tabulate  # Import tabulate for table formatting
 from termcolor import colored  # Import termcolor for coloring text
+from PolicyCache import policies_for_controls, policy_count
+from RandomStreams import RandomStreams
 
 class NestmateAgent:
     """
     An agent that employs active inference for decision-making within an ant colony, leveraging a comprehensive model of its environment and nestmate dynamics, based on a partially-observable Markov decision process (POMDP).
     """
-    def __init__(self, num_observations: List[int], num_states: List[int], num_actions: List[int], policy_length: int = 1, inference_depth: int = 1):
+    def __init__(self, num_observations: List[int], num_states: List[int], num_actions: List[int], policy_length: int = 1, inference_depth: int = 1, rng: Optional[np.random.Generator] = None,
+                 nest_id: int = 0, agent_id: int = 0, random_streams: Optional[RandomStreams] = None):
         """
         Initializes the NestmateAgent with dimensions for the environment, nestmate dynamics, and its preferences, aligning with the constructs of an Active Inference POMDP.
+        Dirichlet draws come from ``rng``, by default the agent's own ``random_streams.agent(nest_id, agent_id)`` stream
+        (of the configured SEED), so no two nestmates share a model.
         """
-        self.observation_model = [np.random.dirichlet(np.ones(num_state), num_obs) for num_obs, num_state in zip(num_observations, num_states)]  # Dirichlet distributions for observation probabilities
-        self.transition_model = [np.random.dirichlet(np.ones(num_state), num_state) for num_state in num_states]  # Dirichlet distributions for state transitions
+        rng = rng or (random_streams or RandomStreams.from_config()).agent(nest_id, agent_id)
+        self.observation_model = [rng.dirichlet(np.ones(num_state), num_obs) for num_obs, num_state in zip(num_observations, num_states)]  # Dirichlet distributions for observation probabilities
+        self.transition_model = [rng.dirichlet(np.ones(num_state), num_state) for num_state in num_states]  # Dirichlet distributions for state transitions
         self.preference_model = [np.eye(num_obs) for num_obs in num_observations]  # Identity matrices for preferences
         
-        self.initial_state_distribution = [np.random.dirichlet(np.ones(num_state)) for num_state in num_states]  # Dirichlet distributions for initial state beliefs
+        self.initial_state_distribution = [rng.dirichlet(np.ones(num_state)) for num_state in num_states]  # Dirichlet distributions for initial state beliefs
         
-        self.policy_prior = np.log(np.random.dirichlet(np.ones(np.prod(num_actions) ** policy_length)))  # Log probabilities for policy priors
+        self.policy_prior = np.log(rng.dirichlet(np.ones(np.prod(num_actions) ** policy_length)))  # Log probabilities for policy priors
         
         self.generative_model = {
             'observation_model': self.observation_model,
@@ -46,10 +52,8 @@ class NestmateAgent:
         """
         Enumerates all possible policies, considering the action space and policy length, to summarize the total number of feasible policies.
         """
-        action_combinations = [np.array(range(n)) for n in num_actions]
-        policy_space = np.array(np.meshgrid(*action_combinations)).T.reshape(-1, len(num_actions))
-        num_policies = np.prod([len(n) ** self.policy_length for n in action_combinations])
-        possible_policies = np.array(np.meshgrid(*[policy_space for _ in range(self.policy_length)])).T.reshape(-1, self.policy_length, len(num_actions))
+        num_policies = policy_count(num_actions, self.policy_length)
+        possible_policies = policies_for_controls(num_actions, self.policy_length)
 
         print(f"Total number of possible policies: {num_policies}")
         return possible_policies
@@ -87,10 +91,11 @@ def main():
         # ([1], [2], [2], 1)
     ]
 
-    for num_observations, num_states, num_actions, policy_length in scenarios:
+    random_streams = RandomStreams.from_config()
+    for agent_id, (num_observations, num_states, num_actions, policy_length) in enumerate(scenarios):
         scenario_description = f"In this scenario, the agent navigates an environment with {len(num_observations)} observation modality(ies), {len(num_states)} hidden state(s), {len(num_actions)} affordance(s), and a decision-making horizon of {policy_length} timestep(s). This setup challenges the agent to infer the best course of action given its understanding of the world and its preferences."
         print(f"\n{scenario_description}")
-        agent = NestmateAgent(num_observations, num_states, num_actions, policy_length, inference_depth=1)
+        agent = NestmateAgent(num_observations, num_states, num_actions, policy_length, inference_depth=1, agent_id=agent_id, random_streams=random_streams)
         # agent._output_variable_shapes()
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from pymdp import inference, control, utils
 import numpy as np
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
+from PolicyCache import cached_policies
+from ThingBatch import ThingBatch
 
 class AntAgent:
     """
@@ -60,9 +62,9 @@ class AntAgent:
 
     def _define_possible_policies(self) -> np.ndarray:
         """
-        Generates the set of feasible policies based on the agent's models.
+        Generates the set of feasible policies based on the agent's models, reusing the process-wide policy cache.
         """
-        return control.construct_policies(self.model_dimensions['num_states'], self.model_dimensions['num_factors'], self.policy_length, self.controllable_factors)
+        return cached_policies(self.model_dimensions['num_states'], self.model_dimensions['num_factors'], self.policy_length, self.controllable_factors)
 
     def update_beliefs_about_states(self, observation: np.ndarray) -> None:
         """
@@ -90,3 +92,16 @@ class AntAgent:
         self.update_beliefs_about_states(observation)  
         self.update_beliefs_about_policies()
         return self.choose_action()
+
+    @staticmethod
+    def execute_steps(agents: Sequence['AntAgent'], observations: np.ndarray) -> np.ndarray:
+        """
+        Conducts one action selection cycle for many agents, vectorized through ThingBatch when every agent has a
+        single hidden-state and control factor and the same possible policies, and agent by agent otherwise.
+
+        :param observations: Observation indices of shape [n_agents, n_modalities].
+        :return: Actions of shape [n_agents, num_factors], as returned by ``execute_step``.
+        """
+        if ThingBatch.supports(agents):
+            return ThingBatch(agents).step(observations)[:, np.newaxis].astype(np.float64)
+        return np.stack([agent.execute_step(observation) for agent, observation in zip(agents, observations)])
@@ -5,14 +5,30 @@ SIMULATION_SETTINGS = {
     'MAX_STEPS': 500,  # Maximum number of steps per simulation
     'AGENT_COUNT': 100,  # Total number of agents participating in the simulation
     'NEST_COUNT': 5,  # Total number of nests within the simulation environment
+    'SEED': None,  # Root seed of all random streams; None draws fresh entropy, which is logged for replay
     'PARALLEL_EXECUTION': {
         'ENABLED': True,  # Flag to enable/disable parallel execution
         'WORKER_COUNT': 4,  # Specifies the number of workers for parallel execution
         'STRATEGY': 'distributed',  # Defines the strategy for parallelization: 'distributed' or 'multithreading'
     },
+    'EVENT_INTERVALS': {  # Update intervals in simulation time units when TIME_RESOLUTION is 'continuous'
+        'AGENT': 1.0,  # Default perception-action cycle of a nestmate
+        'NEST': 10.0,  # Nest-level bookkeeping
+        'PHEROMONE_FIELD': 1.0,  # Pheromone decay and diffusion
+        'SOUND_FIELD': 0.25,  # Acoustic propagation
+        'MORTALITY': 50.0,  # Colony-level mortality draws
+        'MEASURE': 1.0,  # Measurement, rendering and checkpoint pipeline
+    },
+    'STEP_PIPELINE': {
+        'ERROR_POLICY': 'fail_fast',  # Handling of stage errors: 'fail_fast' or 'retry'
+        'MAX_RETRIES': 2,  # Extra attempts of a failing stage under the 'retry' policy
+    },
     'COMPUTATION_SETTINGS': {
         'GPU_ACCELERATION': True,  # Flag to enable/disable GPU acceleration
         'GPU_PREFERENCE': 'high_performance',  # Preferred GPU mode: 'high_performance' or 'energy_saving'
+        'DTYPE': 'float32',  # Storage dtype of agent tensors: 'float64', 'float32' or 'float16'
+        'ACCUMULATION_DTYPE': 'float32',  # Dtype of intermediate results; float16 storage still accumulates in float32
+        'CALIBRATION_FILE': None,  # JSON file caching the cost-model calibration of each host; None keeps it in memory only
         'DISTRIBUTED_COMPUTING': {
             'ENABLED': True,  # Flag to enable/disable distributed computing
             'CLUSTER_NODE_COUNT': 4,  # Specifies the number of nodes in the computing cluster
@@ -26,7 +42,13 @@ ACTIVE_INFERENCE_CONFIG = {
     'ENABLED': True,  # Flag to enable/disable active inference mechanisms
     'INFERENCE_MODELS': ['variational', 'predictive_coding', 'bayesian_filtering', 'deep_active_inference', 'ensemble_methods'],
     'EXPECTATION_FREE_ENERGY': True,  # Enables calculation of expected free energy for decision making
-    'PLANNING_HORIZON': {'TYPE': 'adaptive', 'BASE_VALUE': 15, 'ADAPTATION_STRATEGY': 'contextual_complexity'},
+    'PLANNING_HORIZON': {
+        'TYPE': 'adaptive', 'BASE_VALUE': 15, 'ADAPTATION_STRATEGY': 'contextual_complexity',
+        'MIN_VALUE': 1,  # Shortest horizon an adaptive agent falls back to when the step is over budget
+        'STEP_BUDGET_MS': 50.0,  # Target wall time of one colony step; horizons shrink when it is exceeded
+        'STEP_BUDGET_FLOPS': None,  # Optional deterministic cap on planning FLOPs per step
+        'SMOOTHING': 0.2,  # Weight of the newest timing in the controller's running estimates
+    },
     'TIME_RESOLUTION': 'continuous',  # Updated to continuous for more granular temporal resolution
     'PRECISION_WEIGHTING': {
         'PERCEPTION': {'BASE': 0.8, 'ADAPTIVE': True},
@@ -39,6 +61,7 @@ ACTIVE_INFERENCE_CONFIG = {
         'LEARNING_RATE': 0.1,  # Adjusted rate of adaptation based on feedback
         'FEEDBACK_SENSITIVITY': 'adaptive',  # Updated to adaptive sensitivity to feedback
         'MODEL_UPDATING': 'online',  # Specifies the model updating strategy: 'online' or 'batch'
+        'BATCH_UPDATE_INTERVAL': 10,  # Steps buffered before batch-mode updates are folded into the A/B matrices
     },
     'CONTEXT_AWARENESS': {
         'ENABLED': True,  # Maintains context awareness
@@ -175,6 +198,7 @@ ANT_AND_COLONY_CONFIG = {
         'EXPANSION_STRATEGY': 'gradual',  # Colony expansion strategy
         'THREAT_RESPONSES': ['evacuation', 'defense', 'hide'],  # Threat responses
     },
+}
 
 # ENVIROPARAMETERS (NON-ANT)
 ENVIRONMENT_CONFIG = {
@@ -183,6 +207,12 @@ ENVIRONMENT_CONFIG = {
         'HEIGHT': 100,  # Grid height
         'DIMENSIONS': (100, 100),  # Tuple representing grid dimensions
         'TOTAL_SIZE': 10000,  # Total grid size, explicitly calculated for clarity
+        'TILING': {
+            'TILE_SIZE': 64,  # Side of a lazily allocated world tile, in cells
+            'MAX_RESIDENT_TILES': 256,  # Tiles kept in memory before inactive ones are spilled to disk
+            'ACTIVE_MARGIN': 1,  # Tiles around each ant's tile that field kernels also update
+            'SPILL_DIRECTORY': None,  # Directory of spilled tiles; None uses a temporary directory
+        },
     },
     'RESOURCE_ZONES': [
         {
@@ -220,6 +250,13 @@ ENVIRONMENT_CONFIG = {
         'MOLECULAR_STIGMERGY_TYPES': ['protein', 'fat', 'carbohydrate', 'other'],  # Types of molecular stigmergy
         'LEVEL_COUNT': 10,  # Total number of pheromone signal levels
         'DECAY_RATE': 0.01,  # Pheromone signal decay rate per time step
+        'DIFFUSION_RATE': 0.1,  # Fraction exchanged with each of the four neighbouring cells per time step (at most 0.25)
+    },
+    'SOUND_CONFIG': {
+        'REFERENCE_DISTANCE': 1.0,  # Distance (cells) at which a sound's intensity has halved
+        'CUTOFF_GAIN': 1e-3,  # Attenuation below which a sound is inaudible; sets the audible radius
+        'OCCLUSION_TRANSMISSION': 0.5,  # Fraction of intensity passing through one obstacle cell
+        'PAIRWISE_LIMIT': 1000000,  # Expected audible emitter-listener pairs above which the FFT grid path is used
     },
 }
 
@@ -26,6 +26,7 @@ class MetaConfig:
         return {
             'GPU_ACCELERATION_OPTIONS': [True, False],
             'GPU_PREFERENCE_OPTIONS': ['high_performance', 'energy_saving'],
+            'DTYPE_OPTIONS': ['float64', 'float32', 'float16'],
             'DISTRIBUTED_COMPUTING_OPTIONS': [True, False],
             'CLUSTER_NODE_COUNT_RANGE': (2, 16),
             'COMMUNICATION_PROTOCOLS': ['MPI', 'TCP/IP'],
@@ -64,6 +65,7 @@ class MetaConfig:
             'LEARNING_RATE_RANGE': (0.01, 0.5),
             'FEEDBACK_SENSITIVITY_OPTIONS': ['fixed', 'adaptive'],
             'MODEL_UPDATING_OPTIONS': ['online', 'batch'],
+            'BATCH_UPDATE_INTERVAL_RANGE': (1, 50),
         }
 
     def _context_awareness_config(self):
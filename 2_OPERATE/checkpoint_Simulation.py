@@ -0,0 +1,167 @@
+import os
+import json
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional
+from ColonyState import ColonyState
+from ModelRegistry import ModelRegistry
+
+def _is_shared(array: np.ndarray) -> bool:
+    """
+    Whether an array is a read-only zero-stride broadcast of a single row, stored as that row only.
+    """
+    return array.ndim > 0 and not array.flags.writeable and array.strides[0] == 0
+
+class Checkpoint:
+    """
+    One saved step. Arrays are opened as memory maps on first access, so resuming touches only what is read.
+    """
+    def __init__(self, directory: str, entry: Dict[str, Any]):
+        self.directory = directory
+        self.step: int = entry['step']
+        self.entries: Dict[str, Dict[str, Any]] = entry['arrays']
+        self.rng_states: Dict[str, Any] = entry.get('rng', {})
+        self.metadata: Dict[str, Any] = entry.get('metadata', {})
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Opens a saved array copy-on-write: reads come from the file, writes stay private to this process.
+        Shared tensors come back as read-only broadcast views of their single stored row.
+        """
+        entry = self.entries[name]
+        path = os.path.join(self.directory, 'arrays', entry['file'] + '.npy')
+        if entry.get('shared_rows') is None:
+            return np.load(path, mmap_mode='c')
+        row = np.load(path, mmap_mode='r')
+        return np.broadcast_to(row, (entry['shared_rows'],) + row.shape)
+
+    def restore_rng(self, name: str, generator: np.random.Generator) -> np.random.Generator:
+        """
+        Sets ``generator`` to the saved bit-generator state under ``name``.
+        """
+        generator.bit_generator.state = self.rng_states[name]
+        return generator
+
+class CheckpointStore:
+    """
+    An append-only checkpoint directory of memory-mappable ``.npy`` files.
+
+    Layout::
+
+        <directory>/arrays/<content digest>.npy   one file per distinct array content
+        <directory>/checkpoints.jsonl             one manifest line per saved step
+
+    Arrays are content-addressed, so a checkpoint only writes arrays that changed since any earlier checkpoint
+    (shared model tensors and static grids are written once). Array files are complete before the manifest line
+    that references them is appended, so a crash mid-write never corrupts an earlier checkpoint.
+    """
+    MANIFEST = 'checkpoints.jsonl'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'arrays'), exist_ok=True)
+        self.manifest_path = os.path.join(directory, self.MANIFEST)
+
+    def save(self, step: int, arrays: Dict[str, np.ndarray], rng_states: Optional[Dict[str, np.random.Generator]] = None, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Writes a checkpoint for ``step``.
+
+        :param step: Step the state belongs to (the last completed step).
+        :param arrays: Named arrays to save, e.g. stacked agent tensors and environment grids.
+        :param rng_states: Named generators whose bit-generator state is saved.
+        :param metadata: JSON-serializable values stored alongside.
+        :return: Number of bytes written to new array files.
+        """
+        entries, written = {}, 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            shared_rows = len(array) if _is_shared(array) else None
+            stored = array[0] if shared_rows is not None else array
+            digest = ModelRegistry.digest(stored)
+            path = os.path.join(self.directory, 'arrays', digest + '.npy')
+            if not os.path.exists(path):
+                written += self._write_array(path, stored)
+            entries[name] = {'file': digest, 'shared_rows': shared_rows}
+        entry = {
+            'step': int(step),
+            'arrays': entries,
+            'rng': {name: generator.bit_generator.state for name, generator in (rng_states or {}).items()},
+            'metadata': metadata or {},
+        }
+        with open(self.manifest_path, 'a') as manifest:
+            manifest.write(json.dumps(entry) + '\n')
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        logging.info(f"Checkpoint at step {step} saved to {self.directory} ({written} new bytes).")
+        return written
+
+    @staticmethod
+    def _write_array(path: str, array: np.ndarray) -> int:
+        temporary_path = path + '.tmp'
+        stored = np.lib.format.open_memmap(temporary_path, mode='w+', dtype=array.dtype, shape=array.shape)
+        stored[...] = array
+        stored.flush()
+        del stored
+        os.replace(temporary_path, path)
+        return array.nbytes
+
+    def steps(self) -> List[int]:
+        """
+        Steps of every complete checkpoint, in the order they were saved.
+        """
+        return [entry['step'] for entry in self._entries()]
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = []
+        with open(self.manifest_path) as manifest:
+            for line in manifest:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A line cut short by a crash; everything before it is intact.
+                    break
+        return entries
+
+    def load(self, step: Optional[int] = None) -> Checkpoint:
+        """
+        Opens the checkpoint of ``step``, or the latest one. Loading an earlier step forks the run from there.
+
+        :param step: Step to load, defaulting to the most recent checkpoint.
+        :return: The Checkpoint.
+        """
+        entries = self._entries()
+        if step is not None:
+            entries = [entry for entry in entries if entry['step'] == step]
+        if not entries:
+            raise FileNotFoundError(f"No checkpoint{'' if step is None else f' for step {step}'} in {self.directory}.")
+        return Checkpoint(self.directory, entries[-1])
+
+def colony_checkpoint_arrays(colony: ColonyState, prefix: str = 'colony/') -> Dict[str, np.ndarray]:
+    """
+    The stacked arrays that make up a colony's state, keyed for a checkpoint, including model updates that are
+    still buffered so that a resumed run folds them at the same step as the run that wrote it.
+    """
+    names = ('positions', 'locations', 'influence_factors', 'nest_ids') + ColonyState.MODEL_KEYS
+    arrays = {prefix + name: getattr(colony, name) for name in names}
+    arrays.update({prefix + 'pending/' + key: factors for key, factors in colony.pending_updates().items()})
+    return arrays
+
+def restore_colony(checkpoint: Checkpoint, template: ColonyState, prefix: str = 'colony/') -> ColonyState:
+    """
+    Rebuilds a colony from a checkpoint, taking its shared agent parameters from ``template``.
+
+    Stacked tensors are memory-mapped copy-on-write, so only the pages an agent actually touches are read.
+    """
+    arrays = {name: checkpoint[prefix + name] for name in ('positions', 'influence_factors', 'nest_ids') + ColonyState.MODEL_KEYS}
+    # Checkpoints written before agents had grid locations leave them at the origin
+    if prefix + 'locations' in checkpoint:
+        arrays['locations'] = checkpoint[prefix + 'locations']
+    colony = ColonyState(model_registry=template.model_registry, **arrays, **template.agent_params)
+    pending_prefix = prefix + 'pending/'
+    colony.load_pending_updates({name[len(pending_prefix):]: checkpoint[name] for name in checkpoint.entries if name.startswith(pending_prefix)})
+    return colony
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import pickle
+import logging
+import platform
+import threading
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+from ColonyState import ColonyState
+from PheromoneField import PheromoneField
+from PolicyScoring import BatchedEFEEvaluator
+import config
+
+CALIBRATION_SIZES = (64, 512, 4096)
+WORKER_OVERHEAD_BYTES = 64 * 2 ** 20  # Resident memory of an idle worker process running the interpreter with numpy
+STEP_LATENCY_SECONDS = 5e-5  # Per-worker scheduling latency of one pipe round trip, on top of measured serialization
+CACHE_BUDGET_BYTES = 2 ** 21  # Working-set budget for one chunk of policy evaluation
+
+_CALIBRATIONS: Dict[str, Dict[str, Any]] = {}
+_CALIBRATIONS_LOCK = threading.Lock()
+
+def _model_dimensions() -> Dict[str, int]:
+    """
+    State and action sizes of a nestmate, and the environment grid, as configured.
+    """
+    action = config.ANT_AND_COLONY_CONFIG['NESTMATE']['ACTIVE_INFERENCE']['BLANKET_STATES']['ACTION']
+    observations = config.ANT_AND_COLONY_CONFIG['NESTMATE']['ACTIVE_INFERENCE']['BLANKET_STATES']['SENSE']['OBSERVATIONS']
+    width, height = config.ENVIRONMENT_CONFIG['GRID']['DIMENSIONS']
+    return {
+        'state_dim': int(observations['TOTAL_SIZE']),
+        'n_actions': len(action['MOVEMENT']),
+        'field_layers': len(action['PHEROMONE_RELEASE']['TYPES']),
+        'grid_cells': int(width * height),
+    }
+
+def _host_key(dimensions: Dict[str, int]) -> str:
+    """
+    Identifies the host and model shape a calibration is valid for.
+    """
+    return json.dumps([platform.node(), platform.machine(), platform.processor(), os.cpu_count(), np.__version__, sorted(dimensions.items())])
+
+def _timed(function, repeats: int) -> float:
+    """
+    Best-of-``repeats`` wall time of ``function()``, in seconds.
+    """
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _fit_linear(sizes: Sequence[int], seconds: Sequence[float]) -> Dict[str, float]:
+    """
+    Least-squares fit of ``seconds = fixed + per_item * size``, with both coefficients clipped at zero.
+    """
+    per_item, fixed = np.polyfit(np.asarray(sizes, dtype=float), np.asarray(seconds), 1)
+    return {'fixed': max(float(fixed), 0.0), 'per_item': max(float(per_item), 0.0)}
+
+def calibrate(sizes: Sequence[int] = CALIBRATION_SIZES, repeats: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """
+    Micro-benchmarks the agent step, EFE scoring, environment update and step data exchange on this host.
+
+    :param sizes: Colony sizes the per-agent costs are fitted over.
+    :param repeats: Timings per measurement; the fastest is kept.
+    :param seed: Seed of the random benchmark models.
+    :return: Linear cost coefficients per kernel and the measured bytes per agent.
+    """
+    dimensions = _model_dimensions()
+    state_dim, n_actions = dimensions['state_dim'], dimensions['n_actions']
+    rng = np.random.default_rng(seed)
+    possible_actions = np.arange(n_actions)
+    agent_step, efe_scoring, exchange = [], [], []
+    bytes_per_agent = 0.0
+    for size in sizes:
+        B = rng.dirichlet(np.ones(state_dim), size=(n_actions, state_dim)).transpose(0, 2, 1).astype(np.float32)
+        B.setflags(write=False)
+        colony = ColonyState(
+            rng.dirichlet(np.ones(state_dim), size=size), np.full(size, 0.1),
+            rng.dirichlet(np.ones(state_dim), size=(size, state_dim)).astype(np.float32), np.broadcast_to(B, (size,) + B.shape),
+            np.zeros((size, state_dim), dtype=np.float32), np.zeros((size, state_dim), dtype=np.float32),
+            preferences=np.full(state_dim, 1.0 / state_dim),
+        )
+        observations = rng.dirichlet(np.ones(state_dim), size=size).astype(np.float32)
+        agent_step.append(_timed(lambda: (colony.perceive(observations), colony.decide_next_actions(possible_actions)), repeats))
+        transitions = np.broadcast_to(B, (size,) + B.shape)
+        log_preferences = colony.log_cache.log_preferences(colony.agent_params['preferences'])
+        efe_scoring.append(_timed(lambda: BatchedEFEEvaluator.select_actions(transitions, colony.positions, log_preferences, 0.1, np.float32), repeats))
+        exchange.append(_timed(lambda: pickle.loads(pickle.dumps((observations, np.zeros(size, dtype=np.intp), colony.positions), protocol=pickle.HIGHEST_PROTOCOL)), repeats))
+        private_arrays = (colony.positions, colony.influence_factors, colony.nest_ids, colony.A_matrix, colony.C_matrix, colony.D_matrix)
+        bytes_per_agent = sum(array.nbytes for array in private_arrays) / size
+    width = int(np.sqrt(dimensions['grid_cells']))
+    cell_counts = [max(16, width // 4) ** 2, max(16, width // 2) ** 2, max(16, width) ** 2]
+    pheromone_config = config.ENVIRONMENT_CONFIG['PHEROMONE_CONFIG']
+    environment_update = []
+    for cells in cell_counts:
+        side = int(np.sqrt(cells))
+        # The simulation's own pheromone step: flushing the (empty) deposit queue, then one decay-and-diffusion pass
+        field = PheromoneField(side, side, [str(layer) for layer in range(dimensions['field_layers'])],
+                               decay_rate=pheromone_config['DECAY_RATE'], diffusion_rate=pheromone_config.get('DIFFUSION_RATE', 0.1))
+        field.layers[...] = rng.random(field.layers.shape)
+        environment_update.append(_timed(field.step, repeats) / dimensions['field_layers'])
+    return {
+        'agent_step': _fit_linear(sizes, agent_step),
+        'efe_scoring': _fit_linear(sizes, efe_scoring),
+        'exchange': _fit_linear(sizes, exchange),
+        'environment_update': _fit_linear(cell_counts, environment_update),
+        'bytes_per_agent': bytes_per_agent,
+        'shared_model_bytes': int(n_actions * state_dim * state_dim * 4),
+    }
+
+def load_calibration(path: Optional[str] = None, recalibrate: bool = False) -> Dict[str, Any]:
+    """
+    Returns the calibration of this host, measuring it at most once per process unless ``recalibrate`` is set.
+
+    Calibrations are only written to disk when a cache file is given, as ``path`` or as
+    ``SIMULATION_SETTINGS['COMPUTATION_SETTINGS']['CALIBRATION_FILE']``.
+
+    :param path: JSON file to read the calibration from and write it to, overriding the configured file.
+    :param recalibrate: Whether to measure again even if a calibration of this host is cached.
+    :return: Linear cost coefficients per kernel, as returned by ``calibrate``.
+    """
+    path = path or config.SIMULATION_SETTINGS['COMPUTATION_SETTINGS'].get('CALIBRATION_FILE')
+    key = _host_key(_model_dimensions())
+    with _CALIBRATIONS_LOCK:
+        if not recalibrate:
+            if key in _CALIBRATIONS:
+                return _CALIBRATIONS[key]
+            if path and os.path.exists(path):
+                try:
+                    with open(path) as cache:
+                        cached = json.load(cache)
+                    if cached.get('host') == key:
+                        _CALIBRATIONS[key] = cached['calibration']
+                        return _CALIBRATIONS[key]
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Ignoring unreadable calibration cache {path}: {e}")
+        start = time.perf_counter()
+        calibration = _CALIBRATIONS[key] = calibrate()
+        logging.info(f"Calibrated computational cost model in {time.perf_counter() - start:.2f} s.")
+        if path:
+            try:
+                with open(path, 'w') as cache:
+                    json.dump({'host': key, 'calibration': calibration}, cache, indent=2)
+            except OSError as e:
+                logging.warning(f"Could not cache calibration to {path}: {e}")
+        return calibration
+
+def _cost(calibration: Dict[str, Any], kernel: str, size: float) -> float:
+    return calibration[kernel]['fixed'] + calibration[kernel]['per_item'] * size
+
+def predict_step_seconds(calibration: Dict[str, Any], num_agents: int, grid_cells: int, field_layers: int, worker_count: int, cores: Optional[int] = None) -> float:
+    """
+    Predicted wall time of one step: the largest partition's agent work, its data exchange and the environment
+    update, which runs once on the coordinating process. Workers beyond the number of cores share them.
+    """
+    cost = lambda kernel, size: _cost(calibration, kernel, size)
+    rows = int(np.ceil(num_agents / min(worker_count, cores or os.cpu_count() or 1)))
+    step = cost('agent_step', rows) + cost('environment_update', grid_cells) * field_layers
+    if worker_count > 1:
+        step += cost('exchange', rows) + STEP_LATENCY_SECONDS * worker_count
+    return step
+
+def estimate_computational_resources(num_agents: int, num_food_sources: int, num_nests: int, max_steps: int, parallel_execution: Optional[Dict[str, Any]] = None,
+                                     calibration: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Predicts wall time and peak memory of a run from the calibrated cost model and recommends a worker layout.
+
+    :param num_agents: Total number of agents.
+    :param num_food_sources: Number of food sources in the environment.
+    :param num_nests: Number of nests.
+    :param max_steps: Steps of the run.
+    :param parallel_execution: Settings with 'ENABLED' and 'WORKER_COUNT', defaulting to the configuration.
+    :param calibration: Cost coefficients, defaulting to the cached calibration of this host.
+    :return: Predictions for the requested worker count and the recommended 'WORKER_COUNT' and chunk sizes.
+    """
+    parallel_execution = parallel_execution or config.SIMULATION_SETTINGS['PARALLEL_EXECUTION']
+    calibration = calibration or load_calibration()
+    dimensions = _model_dimensions()
+    grid_cells, field_layers = dimensions['grid_cells'], dimensions['field_layers']
+    requested_workers = parallel_execution['WORKER_COUNT'] if parallel_execution.get('ENABLED', False) else 1
+    max_workers = max(1, min(os.cpu_count() or 1, num_agents))
+    step_seconds = {workers: predict_step_seconds(calibration, num_agents, grid_cells, field_layers, workers) for workers in range(1, max_workers + 1)}
+    fastest = min(step_seconds.values())
+    # Prefer fewer workers when they are within 5% of the fastest layout
+    recommended_workers = min(workers for workers, seconds in step_seconds.items() if seconds <= 1.05 * fastest)
+
+    def peak_memory(workers: int) -> int:
+        # Agent rows live in the workers and are gathered once into the coordinator, hence twice the colony
+        agents = 2 * calibration['bytes_per_agent'] * num_agents
+        shared = calibration['shared_model_bytes'] * (workers + 1)
+        environment = 4 * grid_cells * field_layers + 64 * (num_food_sources + num_nests)
+        return int(agents + shared + environment + WORKER_OVERHEAD_BYTES * (workers if workers > 1 else 0))
+
+    agent_chunk_size = int(np.ceil(num_agents / recommended_workers))
+    policy_chunk_size = 1 << max(8, int(np.log2(max(1, CACHE_BUDGET_BYTES // (4 * dimensions['state_dim'] * dimensions['n_actions'])))))
+    requested_step = predict_step_seconds(calibration, num_agents, grid_cells, field_layers, requested_workers)
+    estimate = {
+        'requested_worker_count': requested_workers,
+        'predicted_step_seconds': requested_step,
+        'predicted_wall_seconds': requested_step * max_steps,
+        'predicted_peak_memory_bytes': peak_memory(requested_workers),
+        'predicted_efe_seconds': _cost(calibration, 'efe_scoring', int(np.ceil(num_agents / min(requested_workers, max_workers)))) * max_steps,
+        'recommended_worker_count': recommended_workers,
+        'recommended_wall_seconds': step_seconds[recommended_workers] * max_steps,
+        'recommended_peak_memory_bytes': peak_memory(recommended_workers),
+        'agent_chunk_size': agent_chunk_size,
+        'policy_chunk_size': policy_chunk_size,
+    }
+    if recommended_workers != requested_workers:
+        logging.info(f"Cost model recommends WORKER_COUNT={recommended_workers} (predicted {estimate['recommended_wall_seconds']:.1f} s) over {requested_workers} (predicted {estimate['predicted_wall_seconds']:.1f} s).")
+    return estimate
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    settings = config.SIMULATION_SETTINGS
+    print(estimate_computational_resources(settings['AGENT_COUNT'], settings.get('FOOD_SOURCE_COUNT', 0), settings['NEST_COUNT'], settings['MAX_STEPS']))
@@ -0,0 +1,172 @@
+import heapq
+import logging
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import config
+
+SLEEP = np.inf  # Returned as a next time or delay to deactivate an entity until it is woken
+
+class EventScheduler:
+    """
+    A discrete-event engine: a heap of next-update times in continuous simulation time.
+
+    Entities (a nest, a field, the measurement pipeline, ...) are registered with an update interval and a handler.
+    Agents are registered as a cohort: all agents due at the same time are popped together and handed to the
+    handler as one array of rows, so a batched ColonyState step only touches the agents that are due, and agents
+    that sleep cost nothing until they are woken.
+
+    Events at equal times run in the order they were scheduled, so runs are deterministic.
+    """
+    def __init__(self, start_time: float = 0.0):
+        self.time = start_time
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequence = 0
+        self._handlers: Dict[Any, Callable] = {}
+        self._intervals: Dict[Any, float] = {}
+        self._due: Dict[Any, float] = {}
+        self._cohorts: Dict[str, Dict[str, Any]] = {}
+        self.events_processed = 0
+
+    def _push(self, time: float, key: Any):
+        self._due[key] = time
+        if np.isfinite(time):
+            heapq.heappush(self._heap, (time, self._sequence, key))
+            self._sequence += 1
+
+    def register(self, name: str, handler: Callable[[float, 'EventScheduler'], Optional[float]], interval: float = SLEEP, start: Optional[float] = None):
+        """
+        Registers an entity updated every ``interval`` time units, or only when triggered if ``interval`` is SLEEP.
+
+        :param name: Unique entity name.
+        :param handler: ``handler(time, scheduler)``; may return the delay to its next update, SLEEP to sleep, or
+            None to keep its interval.
+        :param interval: Default delay between updates.
+        :param start: Time of the first update, defaulting to ``now + interval``.
+        """
+        if name in self._handlers:
+            raise ValueError(f"Entity '{name}' is already registered.")
+        self._handlers[name] = handler
+        self._intervals[name] = interval
+        self._push(self.time + interval if start is None else start, name)
+
+    def register_agents(self, name: str, handler: Callable[[float, np.ndarray, 'EventScheduler'], Optional[np.ndarray]], intervals: np.ndarray, start: Optional[np.ndarray] = None):
+        """
+        Registers a cohort of agents with one update interval each.
+
+        :param name: Cohort name.
+        :param handler: ``handler(time, rows, scheduler)`` for the rows due at ``time``; may return their next
+            delays (SLEEP entries put agents to sleep) or None to keep their intervals.
+        :param intervals: Update interval of each agent, shape [n_agents].
+        :param start: First update time of each agent, defaulting to ``now + intervals``.
+        """
+        intervals = np.asarray(intervals, dtype=float)
+        start = self.time + intervals if start is None else np.broadcast_to(np.asarray(start, dtype=float), intervals.shape)
+        self._cohorts[name] = {'handler': handler, 'intervals': intervals, 'due': np.array(start, dtype=float)}
+        for row in range(len(intervals)):
+            self._push(start[row], (name, row))
+
+    def wake(self, name: str, time: Optional[float] = None):
+        """
+        Triggers an entity at ``time`` (default: now), replacing its pending update if that is later.
+        """
+        time = self.time if time is None else time
+        if time < self._due.get(name, SLEEP):
+            self._push(time, name)
+
+    def wake_agents(self, name: str, rows: np.ndarray, time: Optional[float] = None):
+        """
+        Triggers agents of a cohort at ``time`` (default: now), replacing pending updates that are later.
+        """
+        time = self.time if time is None else time
+        due = self._cohorts[name]['due']
+        for row in np.asarray(rows).ravel():
+            if time < due[row]:
+                due[row] = time
+                self._push(time, (name, int(row)))
+
+    def _is_current(self, time: float, key: Any) -> bool:
+        """
+        Whether a heap entry is the entity's pending update rather than one superseded by a wake-up.
+        """
+        if isinstance(key, tuple):
+            return self._cohorts[key[0]]['due'][key[1]] == time
+        return self._due.get(key) == time
+
+    def _pop_cohort(self, time: float, name: str, first_row: int) -> np.ndarray:
+        """
+        Pops every other pending update of cohort ``name`` at exactly ``time``.
+        """
+        rows = [first_row]
+        while self._heap and self._heap[0][0] == time and isinstance(self._heap[0][2], tuple) and self._heap[0][2][0] == name:
+            _, _, (_, row) = heapq.heappop(self._heap)
+            if self._cohorts[name]['due'][row] == time:
+                rows.append(row)
+        return np.unique(np.array(rows, dtype=np.intp))
+
+    def run_until(self, end_time: float) -> int:
+        """
+        Processes every event due strictly before ``end_time`` and advances the clock to it.
+
+        :param end_time: Time to stop at.
+        :return: Number of handler calls made.
+        """
+        calls = 0
+        while self._heap and self._heap[0][0] < end_time:
+            time, _, key = heapq.heappop(self._heap)
+            if not self._is_current(time, key):
+                continue
+            self.time = time
+            calls += 1
+            if isinstance(key, tuple):
+                name = key[0]
+                cohort = self._cohorts[name]
+                rows = self._pop_cohort(time, name, key[1])
+                delays = cohort['handler'](time, rows, self)
+                delays = cohort['intervals'][rows] if delays is None else np.broadcast_to(np.asarray(delays, dtype=float), rows.shape)
+                self.events_processed += len(rows)
+                for row, delay in zip(rows, delays):
+                    cohort['due'][row] = time + delay
+                    if np.isfinite(delay):
+                        heapq.heappush(self._heap, (time + delay, self._sequence, (name, int(row))))
+                        self._sequence += 1
+            else:
+                delay = self._handlers[key](time, self)
+                self.events_processed += 1
+                self._push(time + (self._intervals[key] if delay is None else delay), key)
+        self.time = max(self.time, end_time)
+        return calls
+
+    def next_time(self) -> float:
+        """
+        Time of the earliest pending event, or SLEEP when nothing is scheduled.
+        """
+        while self._heap and not self._is_current(*self._heap[0][::2]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else SLEEP
+
+def configured_interval(entity: str) -> float:
+    """
+    Update interval of an entity type from ``SIMULATION_SETTINGS['EVENT_INTERVALS']`` (1.0 when not configured).
+    """
+    return float(config.SIMULATION_SETTINGS.get('EVENT_INTERVALS', {}).get(entity, 1.0))
+
+def colony_cohort_handler(colony: Any, possible_actions: np.ndarray, observe: Callable[[np.ndarray], np.ndarray], act: Optional[Callable[[np.ndarray, np.ndarray], None]] = None,
+                          horizon_controller: Optional[Any] = None) -> Callable:
+    """
+    Builds a cohort handler that runs a batched perception-action cycle over only the due rows of a ColonyState.
+
+    :param colony: ColonyState whose agents are stepped.
+    :param possible_actions: Candidate actions of shape [n_actions, ...].
+    :param observe: Returns observations for the given rows, shape [len(rows), ...].
+    :param act: Applies the chosen actions of the given rows.
+    :param horizon_controller: Optional PlanningHorizon.HorizonController choosing the horizons of the due rows.
+        Cohorts are not whole steps, so only its FLOP budget applies here.
+    :return: A handler for EventScheduler.register_agents.
+    """
+    def handler(time: float, rows: np.ndarray, scheduler: EventScheduler):
+        colony.perceive(observe(rows), rows=rows)
+        horizons = None if horizon_controller is None else horizon_controller.horizons(colony.positions[rows])
+        actions = colony.decide_next_actions(possible_actions, rows=rows, horizons=horizons)
+        if act is not None:
+            act(rows, actions)
+    return handler
@@ -1,46 +1,167 @@
-import time
 import logging
-from render_Simulation import SimulationRenderer
+import argparse
+from observe_Simulation import AsyncRenderObserver
 from situational_Antwareness import visualize_agent_internals
-from plan_Simulation import plan_simulation
+from plan_Simulation import SimulationPlan, materialize, plan_simulation
+from schedule_Simulation import ParallelStepScheduler
+from pipeline_Simulation import StepPipeline
+from event_Simulation import EventScheduler, configured_interval
+from checkpoint_Simulation import CheckpointStore, colony_checkpoint_arrays, restore_colony
 import numpy as np
 from MetaInformAnt_Simulation import MetaInformAntSimulation
 import config
 import metaconfig
 
 class SimulationExecutor:
-    def __init__(self, visualization_frequency=100, sleep_duration=0.1):
-        self.simulation = plan_simulation()
-        self.renderer = SimulationRenderer(*self.simulation.get_rendering_params())
+    def __init__(self, visualization_frequency=100, sleep_duration=0.1, headless=True, checkpoint_every=0, checkpoint_dir=None, resume=None):
+        self.plan = SimulationPlan.from_config()
+        self.world = materialize(self.plan)
+        self.simulation = plan_simulation(self.plan)
+        self.checkpoint_every = checkpoint_every
+        # Resumed runs keep appending to the directory they were resumed from unless told otherwise
+        checkpoint_dir = checkpoint_dir or resume
+        self.checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir and checkpoint_every > 0 else None
+        self.start_step = self._resume(resume) if resume else 0
         self.visualization_frequency = visualization_frequency
         self.sleep_duration = sleep_duration
+        self.headless = headless
+        # Headless runs never import matplotlib; otherwise the renderer keeps the main thread and the steps run on a worker, paced by sleep_duration
+        self.observer = None if headless else AsyncRenderObserver(self._create_renderer, frame_interval=sleep_duration)
+        # With continuous time, simulations that declare their own events run on the event queue instead of lockstep ticks
+        self.event_driven = config.ACTIVE_INFERENCE_CONFIG['TIME_RESOLUTION'] == 'continuous' and hasattr(self.simulation, 'register_events')
+        self.scheduler = None if self.event_driven else self._create_scheduler()
+        self.pipeline = self._create_pipeline()
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     
+    def _create_scheduler(self):
+        # Colonies held as a ColonyState are stepped through the scheduler, honouring the plan's PARALLEL_EXECUTION;
+        # the partitions own the agents' state during the run, so the scheduler also moves them by their MOVEMENT actions
+        colony_state = getattr(self.simulation, 'colony_state', None)
+        if colony_state is None:
+            return None
+        return ParallelStepScheduler(colony_state, self.simulation.possible_actions, self.plan.parallel_execution, move=True, random_streams=self.world.random_streams)
+    
+    def _create_pipeline(self):
+        pipeline = StepPipeline()
+        if not self.event_driven:
+            pipeline.register('environment_update', self._update_simulation)
+        pipeline.register('field_update', self._update_fields)
+        if self.observer is not None:
+            pipeline.register('measure', self._measure)
+        if self.checkpoints is not None:
+            pipeline.register('checkpoint', self._checkpoint)
+        return pipeline
+    
+    def _resume(self, directory):
+        checkpoint = CheckpointStore(directory).load()
+        colony_state = getattr(self.simulation, 'colony_state', None)
+        if colony_state is not None and 'colony/positions' in checkpoint:
+            self.simulation.colony_state = restore_colony(checkpoint, colony_state)
+        if hasattr(self.simulation, 'restore_arrays'):
+            self.simulation.restore_arrays(checkpoint)
+        if getattr(self.simulation, 'rng', None) is not None and 'simulation' in checkpoint.rng_states:
+            checkpoint.restore_rng('simulation', self.simulation.rng)
+        logging.info(f"Resumed from checkpoint of step {checkpoint.step} in {directory}.")
+        return checkpoint.step + 1
+    
+    def _checkpoint(self, context):
+        step = context['step']
+        if (step + 1) % self.checkpoint_every:
+            return
+        # Buffered batch updates are saved unfolded, so a resumed run folds them at the same step as this one
+        colony_state = self.scheduler.snapshot() if self.scheduler is not None else getattr(self.simulation, 'colony_state', None)
+        arrays = colony_checkpoint_arrays(colony_state) if colony_state is not None else {}
+        if hasattr(self.simulation, 'checkpoint_arrays'):
+            arrays.update(self.simulation.checkpoint_arrays())
+        rng = getattr(self.simulation, 'rng', None)
+        self.checkpoints.save(step, arrays, {'simulation': rng} if rng is not None else None)
+    
+    def _create_renderer(self):
+        from render_Simulation import SimulationRenderer
+        return SimulationRenderer(*self.simulation.get_rendering_params())
+    
     def setup_environment(self):
-        self._attempt_operation(self.renderer.setup_environment, "Environment setup initiated.")
+        logging.info(f"Environment setup initiated ({'headless' if self.observer is None else 'rendering'}).")
     
     def execute_steps(self):
-        logging.info(f"Executing simulation steps up to {self.simulation.simulation_environment.max_steps}.")
-        for step in range(self.simulation.simulation_environment.max_steps):
-            self._attempt_operation(lambda: self._simulation_step(step), f"Executing step {step}")
+        max_steps = self.simulation.simulation_environment.max_steps
+        logging.info(f"Executing simulation steps {self.start_step} to {max_steps} with '{self.pipeline.error_policy}' error policy.")
+        run_step = self.pipeline.compile()
+        context = {'agents': self.simulation.agents}
+        try:
+            if self.event_driven:
+                self._execute_events(run_step, context, max_steps)
+            else:
+                for step in range(self.start_step, max_steps):
+                    run_step(step, context)
+        finally:
+            logging.info(f"Step pipeline timings: {self.pipeline.report()}")
     
-    def _simulation_step(self, step):
-        self.simulation.update()
+    def _execute_events(self, run_step, context, max_steps):
+        # Agents, nests and fields update on their own intervals; the remaining pipeline stages tick as one more entity
+        events = EventScheduler(start_time=self.start_step)
+        self.simulation.register_events(events)
+        events.register('pipeline', lambda time, scheduler: run_step(int(time), context) and None, configured_interval('MEASURE'), start=self.start_step)
+        events.run_until(max_steps)
+        logging.info(f"Event scheduler processed {events.events_processed} entity updates.")
+    
+    def _update_simulation(self, context):
+        if self.scheduler is not None:
+            self.simulation.update(scheduler=self.scheduler)
+        else:
+            self.simulation.update()
+    
+    def _update_fields(self, context):
+        # Deposits and emissions the nestmates queued during the step are applied once; sounds are heard once, then cleared
+        if self.world.is_materialized('pheromone_field'):
+            self.world.pheromone_field.step()
+        if self.world.is_materialized('sound_field'):
+            context['sounds'] = self.world.sound_field.listen(self._agent_locations(context))
+    
+    def _agent_locations(self, context):
+        # Grid cells, not beliefs: the scheduler's merged locations, else the colony's, else each agent's own
+        if self.scheduler is not None:
+            return self.scheduler.locations
+        colony_state = getattr(self.simulation, 'colony_state', None)
+        if colony_state is not None:
+            return colony_state.locations
+        return np.array([agent.location for agent in context['agents']]).reshape(-1, 2)
+    
+    def _measure(self, context):
+        step = context['step']
         if step % self.visualization_frequency == 0:
             self.optional_visualization(step)
-        self.renderer.update_visualization(step)
-        time.sleep(self.sleep_duration)
+        self.observer.submit(step, self._capture_frame())
+    
+    def _capture_frame(self):
+        # The observer renders asynchronously, so it gets a copy of the agent positions rather than live state
+        if self.scheduler is not None:
+            return self.scheduler.positions.copy()
+        # Event-driven runs step the colony in place instead of through a scheduler
+        colony_state = getattr(self.simulation, 'colony_state', None)
+        return None if colony_state is None else np.array(colony_state.positions)
     
     def optional_visualization(self, step):
         logging.info(f"Optional visualization at step {step}")
         for agent in self.simulation.agents:
-            visualize_agent_internals(agent)
+            visualize_agent_internals(agent, self.world, self)
     
     def post_simulation(self):
-        self._attempt_operation(lambda: self.renderer.render_post_simulation(self.simulation.collect_results()), "Finalizing simulation.")
+        if self.scheduler is not None:
+            self.simulation.colony_state = self.scheduler.gather()
+            self.scheduler.close()
+        if self.observer is not None:
+            self._attempt_operation(lambda: self.observer.finish(self.simulation.collect_results()), "Finalizing simulation.")
     
     def run(self):
         logging.info("Simulation execution sequence initiated.")
+        if self.observer is None:
+            self._run_operations()
+        else:
+            # Interactive matplotlib backends need the main thread, so it renders while the steps run on a worker
+            self.observer.run(self._run_operations)
+    
+    def _run_operations(self):
         operations = [("Environment setup", self.setup_environment), 
                       ("Simulation execution", self.execute_steps), 
                       ("Simulation finalization", self.post_simulation)]
@@ -55,4 +176,14 @@ class SimulationExecutor:
             logging.error(f"Failed during {description}: {e}", exc_info=True)
 
 if __name__ == "__main__":
-    SimulationExecutor().run()
+    parser = argparse.ArgumentParser(description="Execute the MetaInformAnt simulation.")
+    parser.add_argument('--render', action='store_true', help="Render frames with matplotlib on the main thread while the steps run on a worker thread (headless by default).")
+    parser.add_argument('--visualization-frequency', type=int, default=100, help="Steps between agent-internals reports when rendering.")
+    parser.add_argument('--sleep-duration', type=float, default=0.1, help="Seconds the renderer waits between frames when rendering.")
+    parser.add_argument('--checkpoint-every', type=int, default=0, metavar='N', help="Write a checkpoint every N steps (disabled by default).")
+    parser.add_argument('--checkpoint-dir', default=None, help="Directory for checkpoints; defaults to the --resume directory, else 'checkpoints'.")
+    parser.add_argument('--resume', default=None, metavar='DIR', help="Resume from the latest checkpoint in DIR.")
+    args = parser.parse_args()
+    checkpoint_dir = args.checkpoint_dir or (None if args.resume else 'checkpoints')
+    SimulationExecutor(args.visualization_frequency, args.sleep_duration, headless=not args.render,
+                       checkpoint_every=args.checkpoint_every, checkpoint_dir=checkpoint_dir, resume=args.resume).run()
@@ -0,0 +1,122 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+class AsyncRenderObserver:
+    """
+    Receives simulation frames without blocking the step loop and renders them on the main thread.
+
+    GUI toolkits behind interactive matplotlib backends only work on the main thread, so ``run`` keeps the calling
+    thread for rendering and runs the simulation itself on a worker thread. The renderer is created lazily by
+    ``renderer_factory`` on the rendering thread, so matplotlib is only imported when rendering is actually
+    requested. Frames are put into a bounded queue; when the renderer falls behind, the oldest pending frame is
+    dropped instead of slowing the simulation down.
+    """
+    def __init__(self, renderer_factory: Callable[[], Any], max_pending_frames: int = 2, frame_interval: float = 0.0):
+        """
+        :param renderer_factory: Builds the renderer; called once on the rendering thread.
+        :param max_pending_frames: Frames queued before older ones are dropped.
+        :param frame_interval: Seconds to wait after rendering each frame, to pace interactive displays.
+        """
+        self.renderer_factory = renderer_factory
+        self.frame_interval = frame_interval
+        self.frames: queue.Queue = queue.Queue(maxsize=max_pending_frames)
+        self.dropped_frames = 0
+        self._running = False
+
+    def run(self, simulate: Callable[[], Any]) -> Any:
+        """
+        Runs ``simulate`` on a worker thread while rendering the frames it submits on the calling thread, which
+        should be the main thread. Returns once the simulation has finished and every queued frame is drawn.
+
+        :param simulate: The simulation loop; it calls ``submit`` and ``finish`` as it goes.
+        :return: What ``simulate`` returned. An exception it raised is re-raised here.
+        """
+        outcome = {}
+
+        def work():
+            try:
+                outcome['result'] = simulate()
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                self.frames.put(('stop', None, None))
+
+        self._running = True
+        worker = threading.Thread(target=work, name='simulation')
+        worker.start()
+        try:
+            self._render_loop()
+        finally:
+            worker.join()
+            self._running = False
+        if self.dropped_frames:
+            logging.info(f"Render observer dropped {self.dropped_frames} frame(s) to keep up with the simulation.")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    def submit(self, step: int, frame: Any = None):
+        """
+        Queues a frame for rendering and returns immediately.
+
+        :param step: Simulation step the frame belongs to.
+        :param frame: Snapshot of the simulation state to draw; must not be mutated afterwards.
+        """
+        if self._running:
+            self._put(('frame', step, frame))
+
+    def finish(self, results: Any = None):
+        """
+        Queues the post-simulation view; it is never dropped.
+
+        :param results: Simulation results passed to ``render_post_simulation``.
+        """
+        if self._running:
+            self.frames.put(('finish', None, results))
+
+    def _put(self, item):
+        while True:
+            try:
+                self.frames.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped_frames += 1
+                except queue.Empty:
+                    pass
+
+    def _pause(self, renderer: Any):
+        """
+        Waits ``frame_interval`` between frames, through the renderer's own event loop when it has one.
+        """
+        if not self.frame_interval:
+            return
+        if hasattr(renderer, 'pause'):
+            renderer.pause(self.frame_interval)
+        else:
+            time.sleep(self.frame_interval)
+
+    def _render_loop(self):
+        try:
+            renderer: Optional[Any] = self.renderer_factory()
+        except Exception as e:
+            logging.error(f"Render observer could not create its renderer: {e}", exc_info=True)
+            renderer = None
+        while True:
+            kind, step, payload = self.frames.get()
+            if kind == 'stop':
+                return
+            if renderer is None:
+                continue
+            try:
+                if kind == 'finish':
+                    renderer.render_post_simulation(payload)
+                    continue
+                renderer.update_visualization(step, payload)
+                self._pause(renderer)
+            except Exception as e:
+                logging.error(f"Render observer failed at step {step}: {e}", exc_info=True)
@@ -0,0 +1,184 @@
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+import config
+
+class StageError(RuntimeError):
+    """
+    Raised when a pipeline stage fails under the 'fail_fast' policy, or keeps failing under 'retry'.
+    """
+    def __init__(self, stage: str, step: int, agent: Optional[int] = None):
+        self.stage = stage
+        self.step = step
+        self.agent = agent
+        where = f"stage '{stage}' at step {step}" + ("" if agent is None else f" for agent {agent}")
+        super().__init__(f"Simulation step pipeline failed in {where}.")
+
+class PipelineStage:
+    """
+    A registered stage: a callable taking the step context (and the agent index for per-agent stages).
+    """
+    def __init__(self, name: str, function: Callable, per_agent: bool = False):
+        self.name = name
+        self.function = function
+        self.per_agent = per_agent
+
+class StepPipeline:
+    """
+    An ordered list of step stages compiled once into a tight loop, with per-stage timing and an error policy.
+
+    The conventional stages are 'perceive', 'decide', 'act', 'environment_update' and 'measure', run in
+    registration order. Batched stages receive the step context, a dict shared by all stages of a step that holds
+    at least 'step' and 'agents'. Per-agent stages receive the context and the index of each agent of
+    ``context['agents']``.
+
+    Error policies:
+        'fail_fast': the first exception stops the run, raised as a StageError chained to the original error.
+        'retry': a failing call is repeated up to ``max_retries`` times before failing fast.
+    """
+    ERROR_POLICIES = ('fail_fast', 'retry')
+
+    def __init__(self, error_policy: Optional[str] = None, max_retries: Optional[int] = None):
+        """
+        :param error_policy: One of ERROR_POLICIES, defaulting to ``SIMULATION_SETTINGS['STEP_PIPELINE']``.
+        :param max_retries: Extra attempts per failing call under 'retry', defaulting to the configuration.
+        """
+        settings = config.SIMULATION_SETTINGS['STEP_PIPELINE']
+        self.error_policy = error_policy or settings['ERROR_POLICY']
+        if self.error_policy not in self.ERROR_POLICIES:
+            raise ValueError(f"Unknown error policy '{self.error_policy}'. Expected one of {self.ERROR_POLICIES}.")
+        self.max_retries = settings['MAX_RETRIES'] if max_retries is None else max_retries
+        self.stages: List[PipelineStage] = []
+        self.calls: List[int] = []
+        self.seconds: List[float] = []
+        self.failures: List[int] = []
+
+    def register(self, name: str, function: Callable, per_agent: bool = False) -> 'StepPipeline':
+        """
+        Appends a stage to the pipeline. Stages registered after ``compile`` only take effect on the next compile.
+
+        :param name: Name reported in timings and errors.
+        :param function: ``function(context)``, or ``function(context, agent)`` when ``per_agent`` is set.
+        :param per_agent: Whether the stage is called once per active agent.
+        :return: The pipeline, for chaining.
+        """
+        self.stages.append(PipelineStage(name, function, per_agent))
+        self.calls.append(0)
+        self.seconds.append(0.0)
+        self.failures.append(0)
+        return self
+
+    def compile(self) -> Callable[[int, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Resolves the error policy of every stage once and returns the step function.
+
+        :return: ``run_step(step, context)``, which runs every stage on ``context`` and returns it.
+        """
+        runners = tuple(self._compile_stage(index, stage) for index, stage in enumerate(self.stages))
+        calls, seconds = self.calls, self.seconds
+        clock = time.perf_counter
+
+        def run_step(step: int, context: Dict[str, Any]) -> Dict[str, Any]:
+            context['step'] = step
+            for index, runner in enumerate(runners):
+                start = clock()
+                runner(context)
+                seconds[index] += clock() - start
+                calls[index] += 1
+            return context
+        return run_step
+
+    def _compile_stage(self, index: int, stage: PipelineStage) -> Callable[[Dict[str, Any]], None]:
+        """
+        Builds the runner of one stage for the configured error policy.
+        """
+        function = stage.function
+        if not stage.per_agent:
+            if self.error_policy == 'retry':
+                return lambda context: self._call_with_retries(index, function, context['step'], None, context)
+            def run_batched(context):
+                try:
+                    function(context)
+                except Exception as e:
+                    self.failures[index] += 1
+                    raise StageError(stage.name, context['step']) from e
+            return run_batched
+        if self.error_policy == 'retry':
+            def run_per_agent_with_retries(context):
+                for agent in range(len(context['agents'])):
+                    self._call_with_retries(index, function, context['step'], agent, context, agent)
+            return run_per_agent_with_retries
+        def run_per_agent(context):
+            for agent in range(len(context['agents'])):
+                try:
+                    function(context, agent)
+                except Exception as e:
+                    self.failures[index] += 1
+                    raise StageError(stage.name, context['step'], agent) from e
+        return run_per_agent
+
+    def _call_with_retries(self, index: int, function: Callable, step: int, agent: Optional[int], *args):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return function(*args)
+            except Exception as e:
+                self.failures[index] += 1
+                if attempt == self.max_retries:
+                    raise StageError(self.stages[index].name, step, agent) from e
+                logging.warning(f"Retrying stage '{self.stages[index].name}' at step {step} ({attempt + 1}/{self.max_retries}): {e!r}")
+
+    def timings(self) -> List[Dict[str, Any]]:
+        """
+        Per-stage counters accumulated since the pipeline was created.
+
+        :return: One row per stage with calls, total seconds, mean milliseconds per call and failures.
+        """
+        return [{
+            'stage': stage.name,
+            'calls': calls,
+            'total_seconds': seconds,
+            'mean_ms': 1000.0 * seconds / calls if calls else 0.0,
+            'failures': failures,
+        } for stage, calls, seconds, failures in zip(self.stages, self.calls, self.seconds, self.failures)]
+
+    def report(self) -> str:
+        """
+        Human-readable summary of the stage timings.
+        """
+        return "; ".join(f"{row['stage']}: {row['calls']} calls, {row['total_seconds']:.3f} s ({row['mean_ms']:.3f} ms/call), {row['failures']} failures" for row in self.timings())
+
+def register_colony_stages(pipeline: StepPipeline, colony: Any, possible_actions: Any, observe: Callable[[Dict[str, Any]], Any], act: Optional[Callable[[Any], None]] = None,
+                           horizon_controller: Optional[Any] = None) -> StepPipeline:
+    """
+    Registers the batched perceive, decide and (optionally) act stages of a ColonyState on a pipeline.
+
+    :param pipeline: Pipeline to extend.
+    :param colony: ColonyState whose agents are stepped.
+    :param possible_actions: Candidate actions of shape [n_actions, ...].
+    :param observe: Returns the observations of all agents for the current context.
+    :param act: Applies the chosen actions, e.g. to the environment.
+    :param horizon_controller: Optional PlanningHorizon.HorizonController. Its horizons are chosen before each
+        decision, and it is fed the wall time between consecutive decisions (one whole step) and the decision time.
+    :return: The pipeline, for chaining.
+    """
+    timing = {'step_start': None, 'planning': 0.0}
+
+    def perceive(context):
+        context['observations'] = observe(context)
+        colony.perceive(context['observations'])
+
+    def decide(context):
+        if horizon_controller is None:
+            context['actions'] = colony.decide_next_actions(possible_actions)
+            return
+        start = time.perf_counter()
+        if timing['step_start'] is not None:
+            horizon_controller.record(start - timing['step_start'], timing['planning'])
+        context['horizons'] = horizon_controller.horizons(colony.positions)
+        context['actions'] = colony.decide_next_actions(possible_actions, horizons=context['horizons'])
+        timing['step_start'], timing['planning'] = start, time.perf_counter() - start
+
+    pipeline.register('perceive', perceive).register('decide', decide)
+    if act is not None:
+        pipeline.register('act', lambda context: act(context['actions']))
+    return pipeline
@@ -1,102 +1,256 @@
-import numpy as np
+import copy
+import json
+import hashlib
 import logging
+import threading
 import config
 import metaconfig
-from typing import Dict, Any
-from MetaInformAnt_Simulation import MetaInformAntSimulation
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
+from MetaInformAnt_Simulation import MetaInformAntSimulation, Environment
 from computational_resources import estimate_computational_resources
-from initialize_Nestmate_Colony import initialize_colony
+from initialize_Nestmate_Colony import ColonyInitializer
+from ColonyState import ColonyState
+from RandomStreams import RandomStreams
+from PheromoneField import PheromoneField
+from EnvironmentRasters import EnvironmentRasters, compile_rasters
+from SoundField import SoundField
+from schedule_Simulation import ParallelStepScheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class SimulationSetup:
-    def __init__(self):
-        self.simulation_environment = self.initialize_environment()
-        self.agent_params = metaconfig.META_CONFIG['ANT_AND_COLONY']['AGENT_PARAMS']
-        self.niche_params = metaconfig.META_CONFIG['ANT_AND_COLONY']['NICHE_PARAMS']
-        self.parallel_execution = config.SIMULATION_SETTINGS['PARALLEL_EXECUTION']
-        self.validate_parallel_execution_settings()
-        self.colony = self.initialize_colony()
-
-    def initialize_environment(self) -> Any:
-        # Placeholder for environment initialization logic
-        return Environment()  # Assuming Environment class is implemented elsewhere
-
-    def validate_parallel_execution_settings(self) -> None:
-        if not isinstance(self.parallel_execution['ENABLED'], bool):
+def _config_digest(*configs: Any) -> str:
+    """
+    Content hash of configuration dictionaries, stable across processes.
+    """
+    encoded = json.dumps(configs, sort_keys=True, default=repr).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def _freeze(value: Any) -> Any:
+    """
+    Read-only copy of a configuration value: mappings become MappingProxyType and lists become tuples, recursively.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@dataclass(frozen=True)
+class SimulationPlan:
+    """
+    An immutable, hashable description of a simulation run; building it has no side effects.
+
+    Equality and hashing cover the scalar settings and a digest of the full configuration, so two plans made from
+    the same configuration are interchangeable keys of the world cache. The configuration itself is kept as a
+    deep-frozen copy (read-only mappings and tuples), so neither later edits of the config module nor consumers of
+    the plan can change what it materializes.
+    """
+    agent_count: int
+    nest_count: int
+    food_source_count: int
+    max_steps: int
+    parallel_enabled: bool
+    worker_count: int
+    strategy: str
+    config_digest: str
+    seed: Optional[int] = None
+    configs: Mapping[str, Any] = field(default=None, compare=False, hash=False, repr=False)
+
+    @classmethod
+    def from_config(cls, seed: Optional[int] = None) -> 'SimulationPlan':
+        """
+        Snapshots the current config and metaconfig modules into a plan.
+
+        :param seed: Root seed of the run, defaulting to ``SIMULATION_SETTINGS['SEED']``.
+        :return: A SimulationPlan.
+        """
+        configs = copy.deepcopy({
+            'SIMULATION_SETTINGS': config.SIMULATION_SETTINGS,
+            'ENVIRONMENT_CONFIG': config.ENVIRONMENT_CONFIG,
+            'ANT_AND_COLONY_CONFIG': config.ANT_AND_COLONY_CONFIG,
+            'ACTIVE_INFERENCE_CONFIG': config.ACTIVE_INFERENCE_CONFIG,
+            'META_CONFIG': metaconfig.META_CONFIG,
+        })
+        settings = configs['SIMULATION_SETTINGS']
+        parallel_execution = settings['PARALLEL_EXECUTION']
+        return cls(
+            agent_count=settings['AGENT_COUNT'],
+            nest_count=settings['NEST_COUNT'],
+            food_source_count=settings.get('FOOD_SOURCE_COUNT', 0),
+            max_steps=settings['MAX_STEPS'],
+            parallel_enabled=parallel_execution['ENABLED'],
+            worker_count=parallel_execution['WORKER_COUNT'],
+            strategy=parallel_execution.get('STRATEGY', 'distributed'),
+            config_digest=_config_digest(configs),
+            seed=settings.get('SEED') if seed is None else seed,
+            configs=_freeze(configs),
+        )
+
+    @property
+    def agent_count_per_nest(self) -> int:
+        return self.agent_count // self.nest_count
+
+    @property
+    def parallel_execution(self) -> Dict[str, Any]:
+        return {'ENABLED': self.parallel_enabled, 'WORKER_COUNT': self.worker_count, 'STRATEGY': self.strategy}
+
+    def validate(self) -> None:
+        """
+        Checks the parallel execution settings without building anything.
+        """
+        if not isinstance(self.parallel_enabled, bool):
             raise ValueError("Parallel execution 'ENABLED' setting must be a boolean.")
-        if not isinstance(self.parallel_execution['WORKER_COUNT'], int) or self.parallel_execution['WORKER_COUNT'] <= 0:
+        if not isinstance(self.worker_count, int) or self.worker_count <= 0:
             raise ValueError("Parallel execution 'WORKER_COUNT' must be a positive integer.")
+        if self.strategy not in ParallelStepScheduler.STRATEGIES:
+            raise ValueError(f"Parallel execution 'STRATEGY' must be one of {ParallelStepScheduler.STRATEGIES}.")
+
+class SimulationWorld:
+    """
+    The lazily materialized objects of a plan: environment, colony and simulation, each built at most once.
+    """
+    def __init__(self, plan: SimulationPlan):
+        self.plan = plan
+        self._lock = threading.RLock()
+        self._built: Dict[str, Any] = {}
+
+    def _once(self, name: str, build) -> Any:
+        built = self._built.get(name)
+        if built is None:
+            with self._lock:
+                built = self._built.get(name)
+                if built is None:
+                    logging.info(f"Materializing {name} for plan {self.plan.config_digest[:8]}.")
+                    built = build()
+                    self._built[name] = built
+        return built
+
+    @property
+    def random_streams(self) -> RandomStreams:
+        return self._once('random_streams', lambda: RandomStreams(self.plan.seed))
+
+    def is_materialized(self, name: str) -> bool:
+        return name in self._built
+
+    @property
+    def environment(self) -> Any:
+        return self._once('environment', Environment)
+
+    @property
+    def rasters(self) -> EnvironmentRasters:
+        return self._once('rasters', lambda: compile_rasters(self.plan.configs['ENVIRONMENT_CONFIG']))
+
+    @property
+    def pheromone_field(self) -> PheromoneField:
+        configs = self.plan.configs
+        return self._once('pheromone_field', lambda: PheromoneField.from_config(configs['ENVIRONMENT_CONFIG'], configs['ANT_AND_COLONY_CONFIG']['NESTMATE']))
+
+    @property
+    def sound_field(self) -> SoundField:
+        configs = self.plan.configs
+        return self._once('sound_field', lambda: SoundField.from_config(self.rasters.blocked, configs['ENVIRONMENT_CONFIG'], configs['ANT_AND_COLONY_CONFIG']['NESTMATE']))
 
-    def initialize_colony(self) -> Any:
-        try:
-            return initialize_colony(
-                nest_count=config.SIMULATION_SETTINGS['NEST_COUNT'],
-                agent_count_per_nest=config.SIMULATION_SETTINGS['AGENT_COUNT'] // config.SIMULATION_SETTINGS['NEST_COUNT'],
-                env_config=config.ENVIRONMENT_CONFIG,
-                ant_config=config.ANT_AND_COLONY_CONFIG['NESTMATE'],
-                meta_config=metaconfig.META_CONFIG
+    @property
+    def colony_state(self) -> ColonyState:
+        def build():
+            configs = self.plan.configs
+            # Nestmates queue their deposits and emissions on the world's fields
+            environment_fields = {'pheromone_field': self.pheromone_field, 'sound_field': self.sound_field}
+            initializer = ColonyInitializer(configs['ENVIRONMENT_CONFIG'], configs['ANT_AND_COLONY_CONFIG']['NESTMATE'], configs['META_CONFIG'], self.random_streams, environment_fields)
+            return initializer.initialize_colony_state(self.plan.nest_count, self.plan.agent_count_per_nest)
+        return self._once('colony_state', build)
+
+    @property
+    def colony(self) -> List[List[Any]]:
+        """
+        Agents grouped by nest, as row views of ``colony_state`` rather than a second initialization.
+        """
+        state = self.colony_state
+        return self._once('colony', lambda: [[state.view(row) for row in state.nest_rows(nest_id)] for nest_id in range(self.plan.nest_count)])
+
+    @property
+    def simulation(self) -> MetaInformAntSimulation:
+        def build():
+            meta_colony = self.plan.configs['META_CONFIG']['ANT_AND_COLONY']
+            return MetaInformAntSimulation(
+                num_agents=self.plan.agent_count,
+                simulation_environment=self.environment,
+                num_food_sources=self.plan.food_source_count,
+                num_nests=self.plan.nest_count,
+                agent_params=meta_colony.get('AGENT_PARAMS', {}),
+                niche_params=meta_colony.get('NICHE_PARAMS', {})
             )
-        except Exception as e:
-            logging.error(f"Failed to initialize colony: {e}", exc_info=True)
-            raise
+        return self._once('simulation', build)
 
     def estimate_computational_load(self) -> Dict[str, Any]:
-        try:
-            return estimate_computational_resources(
-                num_agents=config.SIMULATION_SETTINGS['AGENT_COUNT'],
-                num_food_sources=config.SIMULATION_SETTINGS['FOOD_SOURCE_COUNT'],
-                num_nests=config.SIMULATION_SETTINGS['NEST_COUNT'],
-                max_steps=config.SIMULATION_SETTINGS['MAX_STEPS'],
-                parallel_execution=self.parallel_execution
-            )
-        except Exception as e:
-            logging.error(f"Failed to estimate computational load: {e}", exc_info=True)
-            raise
+        return self._once('computational_load', lambda: estimate_computational_resources(
+            num_agents=self.plan.agent_count,
+            num_food_sources=self.plan.food_source_count,
+            num_nests=self.plan.nest_count,
+            max_steps=self.plan.max_steps,
+            parallel_execution=self.plan.parallel_execution
+        ))
 
-    def prepare_simulation(self) -> MetaInformAntSimulation:
-        logging.info("Preparing simulation with current configuration.")
-        simulation = self.create_simulation_instance()
-        self.log_computational_load()
-        return simulation
-
-    def create_simulation_instance(self) -> MetaInformAntSimulation:
-        return MetaInformAntSimulation(
-            num_agents=config.SIMULATION_SETTINGS['AGENT_COUNT'],
-            simulation_environment=self.simulation_environment,
-    def initialize_colony(self):
-        return initialize_colony(
-            nest_count=config.SIMULATION_SETTINGS['NEST_COUNT'],
-            agent_count_per_nest=config.SIMULATION_SETTINGS['AGENT_COUNT'] // config.SIMULATION_SETTINGS['NEST_COUNT'],
-            env_config=config.ENVIRONMENT_CONFIG,
-            ant_config=config.ANT_AND_COLONY_CONFIG['NESTMATE'],
-            meta_config=metaconfig.META_CONFIG
-        )
+_WORLD_CACHE: Dict[SimulationPlan, SimulationWorld] = {}
+_WORLD_CACHE_LOCK = threading.Lock()
 
-    def estimate_computational_load(self):
-        return estimate_computational_resources(
-            num_agents=config.SIMULATION_SETTINGS['AGENT_COUNT'],
-            num_food_sources=config.SIMULATION_SETTINGS['FOOD_SOURCE_COUNT'],
-            num_nests=config.SIMULATION_SETTINGS['NEST_COUNT'],
-            max_steps=config.SIMULATION_SETTINGS['MAX_STEPS'],
-            parallel_execution=self.parallel_execution
-        )
+def materialize(plan: SimulationPlan) -> SimulationWorld:
+    """
+    Returns the world of a plan, shared by every caller with an equal plan. Nothing is built until it is accessed.
+    """
+    with _WORLD_CACHE_LOCK:
+        world = _WORLD_CACHE.get(plan)
+        if world is None:
+            plan.validate()
+            world = _WORLD_CACHE[plan] = SimulationWorld(plan)
+    return world
+
+def clear_world_cache() -> None:
+    """
+    Drops every cached world.
+    """
+    with _WORLD_CACHE_LOCK:
+        _WORLD_CACHE.clear()
+
+def plan_simulation(plan: Optional[SimulationPlan] = None) -> MetaInformAntSimulation:
+    """
+    Returns the simulation of ``plan`` (by default, a plan of the current configuration), building it on first use.
+    """
+    world = materialize(plan or SimulationPlan.from_config())
+    simulation = world.simulation
+    logging.info(f"Estimated computational load: {world.estimate_computational_load()}")
+    return simulation
 
-    def prepare_simulation(self):
+class SimulationSetup:
+    """
+    Configuration-level view of a planned simulation. Construction only snapshots and validates the plan; the
+    environment and colony come from the shared world cache when first accessed.
+    """
+    def __init__(self, plan: Optional[SimulationPlan] = None):
+        self.plan = plan or SimulationPlan.from_config()
+        self.world = materialize(self.plan)
+        meta_colony = self.plan.configs['META_CONFIG']['ANT_AND_COLONY']
+        self.agent_params = meta_colony.get('AGENT_PARAMS', {})
+        self.niche_params = meta_colony.get('NICHE_PARAMS', {})
+        self.parallel_execution = self.plan.parallel_execution
+
+    @property
+    def simulation_environment(self) -> Any:
+        return self.world.environment
+
+    @property
+    def colony(self) -> List[List[Any]]:
+        return self.world.colony
+
+    def estimate_computational_load(self) -> Dict[str, Any]:
+        return self.world.estimate_computational_load()
+
+    def prepare_simulation(self) -> MetaInformAntSimulation:
         logging.info("Preparing simulation with current configuration.")
-        simulation = MetaInformAntSimulation(
-            num_agents=config.SIMULATION_SETTINGS['AGENT_COUNT'],
-            simulation_environment=self.simulation_environment,
-            num_food_sources=config.SIMULATION_SETTINGS['FOOD_SOURCE_COUNT'],
-            num_nests=config.SIMULATION_SETTINGS['NEST_COUNT'],
-            agent_params=self.agent_params,
-            niche_params=self.niche_params
-        )
-        
-        computational_load = self.estimate_computational_load()
-        logging.info(f"Estimated computational load: {computational_load}")
-        return simulation
+        return plan_simulation(self.plan)
 
 if __name__ == "__main__":
     setup = SimulationSetup()
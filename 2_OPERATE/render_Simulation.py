@@ -30,6 +30,17 @@ class SimulationRenderer:
         self.plot_entities(self.nests, 'r', 'Nests')
         self.plot_entities(self.agents, 'b', 'Agents')
     
+    def update_visualization(self, step, positions=None):
+        """Redraw the environment for one step, optionally overlaying a snapshot of agent positions."""
+        self.refresh_environment(step)
+        if positions is not None and positions.ndim == 2 and positions.shape[1] >= 2:
+            self.ax.scatter(positions[:, 0], positions[:, 1], c='b', s=4)
+        self.fig.canvas.draw_idle()
+    
+    def pause(self, seconds):
+        """Wait between frames while the figure's event loop keeps the window responsive."""
+        plt.pause(seconds)
+    
     def animate_simulation(self, steps):
         """Animate the simulation over a given number of steps."""
         animation.FuncAnimation(self.fig, self.refresh_environment, frames=steps, interval=100)
@@ -0,0 +1,231 @@
+import logging
+import multiprocessing
+import traceback
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from ColonyState import ColonyState
+from RandomStreams import RandomStreams
+import config
+
+def partition_bounds(n_agents: int, n_partitions: int) -> List[Tuple[int, int]]:
+    """
+    Splits ``n_agents`` rows into at most ``n_partitions`` contiguous blocks whose sizes differ by at most one.
+
+    :param n_agents: Number of agents to split.
+    :param n_partitions: Requested number of blocks.
+    :return: ``(start, stop)`` row bounds of each non-empty block, in row order.
+    """
+    n_partitions = max(1, min(n_partitions, n_agents))
+    sizes = np.full(n_partitions, n_agents // n_partitions)
+    sizes[:n_agents % n_partitions] += 1
+    stops = np.cumsum(sizes)
+    return [(int(stop - size), int(stop)) for size, stop in zip(sizes, stops)]
+
+def colony_step(colony: ColonyState, observations: np.ndarray, possible_actions: np.ndarray, learn: bool = False, horizons: Optional[np.ndarray] = None, move: bool = False) -> np.ndarray:
+    """
+    Runs one perception-action cycle for every agent of a colony (or partition).
+
+    Every kernel involved is row-independent, so the result of an agent does not depend on which other agents
+    share its partition.
+
+    :param colony: Colony or partition to step.
+    :param observations: Observations of its agents, shape [n_agents, ...].
+    :param possible_actions: Candidate actions of shape [n_actions, ...].
+    :param learn: Whether to credit each chosen action's B slice with the step's belief transition (and update A).
+    :param horizons: Optional planning horizon of each agent, shape [n_agents].
+    :param move: Whether to move each agent on the grid by its chosen action, a MOVEMENT displacement.
+    :return: Chosen actions of shape [n_agents, ...].
+    """
+    previous_positions = np.array(colony.positions) if learn else None
+    colony.perceive(observations)
+    action_indices = colony.decide_action_indices(horizons=horizons)
+    if learn:
+        colony.update_internal_states(action_indices, observations, previous_positions)
+    actions = np.asarray(possible_actions)[action_indices]
+    if move:
+        colony.move(actions)
+    return actions
+
+def _partition_worker(connection, partition: ColonyState, possible_actions: np.ndarray, learn: bool, move: bool, rng: np.random.Generator):
+    """
+    Worker process loop: keeps one partition in memory and serves 'step', 'gather' and 'close' commands.
+
+    Only observations come in and only actions, updated positions and locations go out on each step; the generative models
+    never leave the worker until 'gather'. The worker's global NumPy random state is reseeded from ``rng``, its own
+    stream, as forked workers would otherwise all inherit the parent's state and draw the same numbers.
+    """
+    np.random.seed(rng.integers(2 ** 32, size=4, dtype=np.uint32))
+    while True:
+        command, payload = connection.recv()
+        try:
+            if command == 'step':
+                observations, horizons = payload
+                result = (colony_step(partition, observations, possible_actions, learn, horizons, move), partition.positions, partition.locations)
+            elif command == 'gather':
+                partition.flush_model_updates()
+                result = partition
+            elif command == 'snapshot':
+                result = partition
+            elif command == 'close':
+                connection.close()
+                return
+            else:
+                raise ValueError(f"Unknown worker command '{command}'.")
+            connection.send(('ok', result))
+        except Exception:
+            connection.send(('error', traceback.format_exc()))
+
+class ParallelStepScheduler:
+    """
+    Steps a ColonyState across several workers according to ``SIMULATION_SETTINGS['PARALLEL_EXECUTION']``.
+
+    Agents are split into contiguous row blocks, one per worker, and each block lives in its worker for the whole
+    run. Per step, each worker receives the observations of its agents and returns their actions, positions and
+    grid locations; the scheduler assembles them in row order, so results are identical for any worker count and
+    strategy. Positions and locations are written back into the stepped colony, so its row views (the simulation's
+    agents) see where every agent is; their generative models are only current after ``gather``.
+
+    Strategies:
+        'distributed': one persistent process per partition, connected by a pipe.
+        'multithreading': partitions stay in this process and are stepped on a thread pool, which pays off for
+            the NumPy kernels that release the GIL.
+    With ``ENABLED`` set to False, the colony is stepped in the calling thread as a single partition.
+    """
+    STRATEGIES = ('distributed', 'multithreading')
+
+    def __init__(self, colony_state: ColonyState, possible_actions: np.ndarray, parallel_execution: Optional[Dict[str, Any]] = None, learn: bool = False, move: bool = False,
+                 random_streams: Optional[RandomStreams] = None):
+        """
+        :param colony_state: Colony to step. Its rows are copied into the partitions and its positions and locations
+            are updated after every step; call ``gather`` to get the updated generative models back.
+        :param possible_actions: Candidate actions of shape [n_actions, ...].
+        :param parallel_execution: Settings with 'ENABLED', 'WORKER_COUNT' and 'STRATEGY', defaulting to the
+            global configuration.
+        :param learn: Whether each step applies the A/B count updates.
+        :param move: Whether each step moves the agents on the grid by their chosen MOVEMENT displacements.
+        :param random_streams: Stream hierarchy of the run; worker process ``i`` is seeded from ``worker(i)``.
+        """
+        settings = parallel_execution or config.SIMULATION_SETTINGS['PARALLEL_EXECUTION']
+        self.strategy = settings.get('STRATEGY', 'distributed') if settings.get('ENABLED', False) else 'serial'
+        if self.strategy not in self.STRATEGIES + ('serial',):
+            raise ValueError(f"Unknown parallel execution strategy '{self.strategy}'. Expected one of {self.STRATEGIES}.")
+        worker_count = settings.get('WORKER_COUNT', 1) if self.strategy != 'serial' else 1
+        self.possible_actions = np.asarray(possible_actions)
+        self.learn = learn
+        self.move = move
+        self.random_streams = random_streams or RandomStreams.from_config()
+        self.bounds = partition_bounds(colony_state.n_agents, worker_count)
+        self.positions = colony_state.positions
+        self.locations = colony_state.locations
+        partitions = [colony_state.partition(start, stop) for start, stop in self.bounds]
+        self._partitions: List[ColonyState] = []
+        self._connections = []
+        self._processes = []
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        if self.strategy == 'distributed':
+            self._start_processes(partitions)
+        else:
+            self._partitions = partitions
+            if self.strategy == 'multithreading':
+                self._thread_pool = ThreadPoolExecutor(max_workers=len(partitions))
+        logging.info(f"Parallel step scheduler: strategy '{self.strategy}', {len(self.bounds)} partition(s) over {colony_state.n_agents} agents.")
+
+    def _start_processes(self, partitions: List[ColonyState]):
+        """
+        Starts one worker process per partition and hands it its block of agents.
+        """
+        context = multiprocessing.get_context()
+        for worker_id, partition in enumerate(partitions):
+            parent_connection, child_connection = context.Pipe()
+            worker_args = (child_connection, partition, self.possible_actions, self.learn, self.move, self.random_streams.worker(worker_id))
+            process = context.Process(target=_partition_worker, args=worker_args, daemon=True)
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+    @staticmethod
+    def _receive(connection) -> Any:
+        status, result = connection.recv()
+        if status == 'error':
+            raise RuntimeError(f"Parallel step worker failed:\n{result}")
+        return result
+
+    def _broadcast(self, command: str, payloads: List[Any]) -> List[Any]:
+        """
+        Sends one command per worker process and collects the replies in partition order.
+        """
+        for connection, payload in zip(self._connections, payloads):
+            connection.send((command, payload))
+        return [self._receive(connection) for connection in self._connections]
+
+    def step(self, observations: np.ndarray, horizons: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Runs one perception-action cycle for every agent.
+
+        :param observations: Observations of all agents, shape [n_agents, ...].
+        :param horizons: Optional planning horizon of each agent, e.g. from a HorizonController given ``positions``.
+        :return: Chosen actions of all agents in row order, shape [n_agents, ...].
+        """
+        observations = np.asarray(observations)
+        blocks = [(observations[start:stop], None if horizons is None else horizons[start:stop]) for start, stop in self.bounds]
+        if self.strategy == 'distributed':
+            results = self._broadcast('step', blocks)
+        elif self.strategy == 'multithreading':
+            futures = [self._thread_pool.submit(self._step_partition, partition, *block) for partition, block in zip(self._partitions, blocks)]
+            results = [future.result() for future in futures]
+        else:
+            results = [self._step_partition(partition, *block) for partition, block in zip(self._partitions, blocks)]
+        for (start, stop), (_, positions, locations) in zip(self.bounds, results):
+            self.positions[start:stop] = positions
+            self.locations[start:stop] = locations
+        return np.concatenate([actions for actions, _, _ in results])
+
+    def _step_partition(self, partition: ColonyState, observations: np.ndarray, horizons: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return colony_step(partition, observations, self.possible_actions, self.learn, horizons, self.move), partition.positions, partition.locations
+
+    def gather(self) -> ColonyState:
+        """
+        Flushes buffered model updates in every partition and reassembles the full colony.
+
+        :return: A new ColonyState with the current state of every agent.
+        """
+        if self.strategy == 'distributed':
+            partitions = self._broadcast('gather', [None] * len(self._connections))
+        else:
+            for partition in self._partitions:
+                partition.flush_model_updates()
+            partitions = self._partitions
+        return ColonyState.concatenate(partitions)
+
+    def snapshot(self) -> ColonyState:
+        """
+        Reassembles the full colony without folding buffered model updates, e.g. for a checkpoint; stepping then
+        continues exactly as if no snapshot had been taken.
+
+        :return: A new ColonyState whose buffered updates are those of the partitions.
+        """
+        if self.strategy == 'distributed':
+            return ColonyState.concatenate(self._broadcast('snapshot', [None] * len(self._connections)))
+        return ColonyState.concatenate(self._partitions)
+
+    def close(self):
+        """
+        Stops the worker processes or thread pool.
+        """
+        for connection in self._connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown()
+            self._thread_pool = None
+
+    def __enter__(self) -> 'ParallelStepScheduler':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,9 +1,11 @@
 import logging
 
-def visualize_agent_internals(agent):
+def visualize_agent_internals(agent, simulation_context=None, execution_context=None):
     """
     Enhance the situational awareness by visualizing not only the internal state of an ActiveInferenceAgent or its subclasses
-    but also integrating simulation, execution, and rendering contexts for a comprehensive overview.
+    but also integrating simulation and execution contexts for a comprehensive overview.
+
+    The contexts are the caller's SimulationWorld and SimulationExecutor; they are only read, never rebuilt.
     """
     logging.info("Enhanced Situational Awareness: Visualizing Agent Internals and Context")
 
@@ -39,19 +41,9 @@ def visualize_agent_internals(agent):
         info_title, info_extractor = agent_specific_info[agent_type_name]
         logging.info(f"{agent_type_name} Specific Information: {info_title}: {info_extractor(agent)}")
 
-    # Integrate broader situational awareness from simulation, execution, and rendering contexts
-    try:
-        from plan_Simulation import SimulationSetup
-        from execute_Simulation import SimulationExecutor
-        from render_Simulation import SimulationRenderer
-
-        simulation_context = SimulationSetup()
-        execution_context = SimulationExecutor()
-        rendering_context = SimulationRenderer(simulation_context.simulation_environment, [], [])
-
-        logging.info(f"Simulation Environment: {simulation_context.simulation_environment}")
-        logging.info(f"Execution Parameters: Visualization Frequency - {execution_context.visualization_frequency}, Sleep Duration - {execution_context.sleep_duration}")
-        logging.info(f"Rendering Context: {rendering_context.fig.canvas.get_default_filename()}")
-    except ImportError as e:
-        logging.warning("Could not integrate broader situational awareness due to missing modules: " + str(e))
-
+    # Integrate broader situational awareness from the simulation and execution contexts the caller already holds
+    if simulation_context is not None:
+        logging.info(f"Simulation Environment: {simulation_context.environment if simulation_context.is_materialized('environment') else 'not materialized'}")
+        logging.info(f"Simulation Plan: {simulation_context.plan}")
+    if execution_context is not None:
+        logging.info(f"Execution Parameters: Visualization Frequency - {execution_context.visualization_frequency}, Sleep Duration - {execution_context.sleep_duration}, Headless - {execution_context.headless}")
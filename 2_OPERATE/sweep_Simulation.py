@@ -0,0 +1,357 @@
+import os
+import json
+import time
+import glob
+import logging
+import argparse
+import hashlib
+import itertools
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import config
+import metaconfig
+
+# META_CONFIG sections and the config dictionaries their parameters override
+SECTION_TARGETS = {
+    'SIMULATION': 'SIMULATION_SETTINGS',
+    'ACTIVE_INFERENCE': 'ACTIVE_INFERENCE_CONFIG',
+    'ANT_AND_COLONY': 'ANT_AND_COLONY_CONFIG',
+}
+
+# META_CONFIG parameters whose name differs from the config key they set
+KEY_ALIASES = {
+    'ACTIVE_INFERENCE.PLANNING_HORIZON.FIXED': ('PLANNING_HORIZON', 'BASE_VALUE'),
+    'ACTIVE_INFERENCE.PLANNING_HORIZON.TYPE': ('PLANNING_HORIZON', 'TYPE'),
+    'ACTIVE_INFERENCE.PLANNING_HORIZON.ADAPTIVE_STRATEGY': ('PLANNING_HORIZON', 'ADAPTATION_STRATEGY'),
+}
+
+DEFAULT_SWEEP = (
+    'SIMULATION.AGENT_COUNT_RANGE',
+    'ACTIVE_INFERENCE.LEARNING_RATE_RANGE',
+    'ACTIVE_INFERENCE.PLANNING_HORIZON.FIXED_RANGE',
+    'ANT_AND_COLONY.DECISION_STRATEGY_OPTIONS',
+)
+
+class SweepDimension:
+    """
+    One swept parameter: an integer or float ``*_RANGE`` or a list of options from META_CONFIG.
+
+    Values are drawn by mapping a unit-interval coordinate ``u`` onto the range or option list, so every sampler
+    only has to produce points in the unit hypercube.
+    """
+    def __init__(self, name: str, values: Any):
+        """
+        :param name: Dotted META_CONFIG path without the ``_RANGE``/``_OPTIONS`` suffix, e.g. 'SIMULATION.AGENT_COUNT'.
+        :param values: A ``(low, high)`` tuple or a list of options.
+        """
+        self.name = name
+        if isinstance(values, tuple) and len(values) == 2:
+            self.low, self.high = values
+            self.kind = 'int' if all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in values) else 'float'
+            self.options = None
+        else:
+            self.kind = 'choice'
+            self.options = list(values)
+
+    def value(self, u: float) -> Any:
+        """
+        Maps ``u`` in [0, 1) onto the dimension: integer ranges are inclusive, options are equally likely.
+        """
+        if self.kind == 'int':
+            return int(self.low + min(int(u * (self.high - self.low + 1)), self.high - self.low))
+        if self.kind == 'float':
+            return float(self.low + u * (self.high - self.low))
+        return self.options[min(int(u * len(self.options)), len(self.options) - 1)]
+
+    def grid(self, points: int) -> List[Any]:
+        """
+        Evenly spaced values of a range (deduplicated for integers), or every option.
+        """
+        if self.kind == 'choice':
+            return list(self.options)
+        values = np.linspace(self.low, self.high, points)
+        if self.kind == 'int':
+            return sorted({int(round(value)) for value in values})
+        return [float(value) for value in values]
+
+class ParameterSpace:
+    """
+    The cartesian product of a set of META_CONFIG dimensions, with grid, random and Latin hypercube samplers.
+
+    Every sampler returns configurations as ``{dimension name: value}`` dicts.
+    """
+    def __init__(self, dimensions: Sequence[SweepDimension]):
+        self.dimensions = list(dimensions)
+
+    @classmethod
+    def from_meta_config(cls, paths: Sequence[str] = DEFAULT_SWEEP, meta_config: Optional[Dict[str, Any]] = None) -> 'ParameterSpace':
+        """
+        Builds the space from dotted META_CONFIG paths such as 'SIMULATION.AGENT_COUNT_RANGE'.
+        """
+        meta_config = meta_config or metaconfig.META_CONFIG
+        dimensions = []
+        for path in paths:
+            node = meta_config
+            for key in path.split('.'):
+                node = node[key]
+            name = path
+            for suffix in ('_RANGE', '_OPTIONS'):
+                if name.endswith(suffix):
+                    name = name[:-len(suffix)]
+            dimensions.append(SweepDimension(name, node))
+        return cls(dimensions)
+
+    def _configurations(self, unit_points: np.ndarray) -> List[Dict[str, Any]]:
+        return [{dimension.name: dimension.value(u) for dimension, u in zip(self.dimensions, point)} for point in unit_points]
+
+    def grid(self, points_per_range: int = 3) -> List[Dict[str, Any]]:
+        """
+        Every combination of ``points_per_range`` values per range and all options of each option list.
+        """
+        axes = [dimension.grid(points_per_range) for dimension in self.dimensions]
+        return [dict(zip((dimension.name for dimension in self.dimensions), values)) for values in itertools.product(*axes)]
+
+    def random(self, n_runs: int, seed: int = 0) -> List[Dict[str, Any]]:
+        """
+        ``n_runs`` independent uniform draws.
+        """
+        return self._configurations(np.random.default_rng(seed).random((n_runs, len(self.dimensions))))
+
+    def latin_hypercube(self, n_runs: int, seed: int = 0) -> List[Dict[str, Any]]:
+        """
+        ``n_runs`` draws such that each dimension has exactly one draw in each of ``n_runs`` equal strata.
+        """
+        rng = np.random.default_rng(seed)
+        strata = np.stack([rng.permutation(n_runs) for _ in self.dimensions], axis=1)
+        return self._configurations((strata + rng.random((n_runs, len(self.dimensions)))) / n_runs)
+
+    def sample(self, sampler: str, n_runs: int = 16, seed: int = 0, points_per_range: int = 3) -> List[Dict[str, Any]]:
+        """
+        Dispatches to 'grid', 'random' or 'lhs' (Latin hypercube).
+        """
+        if sampler == 'grid':
+            return self.grid(points_per_range)
+        if sampler == 'random':
+            return self.random(n_runs, seed)
+        if sampler == 'lhs':
+            return self.latin_hypercube(n_runs, seed)
+        raise ValueError(f"Unknown sampler '{sampler}'. Expected 'grid', 'random' or 'lhs'.")
+
+def run_id(configuration: Dict[str, Any]) -> str:
+    """
+    A stable identifier of a configuration, used to skip runs that are already in the results.
+    """
+    encoded = json.dumps(configuration, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+def resolve_config_target(name: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Finds the config dictionary and key that a swept META_CONFIG parameter overrides.
+
+    Path segments that exist in the config are followed; the final key is then searched breadth-first, so the
+    shallowest matching key wins (e.g. ACTIVE_INFERENCE.LEARNING_RATE sets ACTIVE_INFERENCE_CONFIG['LEARNING_RATE']).
+
+    :param name: Dimension name such as 'SIMULATION.AGENT_COUNT'.
+    :return: The dictionary holding the key and the key itself.
+    """
+    section, *keys = name.split('.')
+    node = getattr(config, SECTION_TARGETS[section])
+    keys = list(KEY_ALIASES.get(name, keys))
+    for key in keys[:-1]:
+        if isinstance(node.get(key), dict):
+            node = node[key]
+    frontier = deque([node])
+    while frontier:
+        candidate = frontier.popleft()
+        if keys[-1] in candidate:
+            return candidate, keys[-1]
+        frontier.extend(value for value in candidate.values() if isinstance(value, dict))
+    raise KeyError(f"No config key matches swept parameter '{name}'.")
+
+@contextmanager
+def config_overrides(configuration: Dict[str, Any]) -> Iterator[None]:
+    """
+    Temporarily writes a sampled configuration into the config module, restoring the previous values on exit.
+
+    Only values read after entry see the override; values captured at import time keep their defaults.
+    """
+    previous = []
+    try:
+        for name, value in configuration.items():
+            target, key = resolve_config_target(name)
+            previous.append((target, key, target[key]))
+            target[key] = value
+        yield
+    finally:
+        for target, key, value in reversed(previous):
+            target[key] = value
+
+def run_headless_simulation(configuration: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs one headless simulation with ``configuration`` applied and returns its scalar summary.
+    """
+    from execute_Simulation import SimulationExecutor
+
+    with config_overrides(configuration):
+        start = time.perf_counter()
+        executor = SimulationExecutor(headless=True)
+        executor.run()
+        results = executor.simulation.collect_results()
+    summary = {'wall_seconds': time.perf_counter() - start}
+    if isinstance(results, dict):
+        summary.update({key: value for key, value in results.items() if np.isscalar(value)})
+    summary.update({f"stage_seconds.{row['stage']}": row['total_seconds'] for row in executor.pipeline.timings()})
+    return summary
+
+def _column_array(values: List[Any]) -> np.ndarray:
+    """
+    Packs one column into the narrowest of bool, int64, float64 (None becomes NaN, True/False 1/0) or unicode arrays.
+    """
+    present = [value for value in values if value is not None]
+    if present and len(present) == len(values) and all(isinstance(value, (bool, np.bool_)) for value in present):
+        return np.array(values, dtype=bool)
+    if present and len(present) == len(values) and all(isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)) for value in present):
+        return np.array(values, dtype=np.int64)
+    # Numeric and boolean columns with missing values, e.g. of failed runs, stay numeric instead of turning into text
+    if all(isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating)) for value in present):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(['' if value is None else str(value) for value in values])
+
+class ColumnarResultsWriter:
+    """
+    Streams summary rows into a directory of columnar row groups (``part-00000.npz``, ``part-00001.npz``, ...).
+
+    Rows are buffered and written ``row_group_size`` at a time, one array per column, so memory stays bounded
+    and finished row groups are never rewritten. ``read_results`` concatenates the row groups column by column.
+    """
+    def __init__(self, directory: str, row_group_size: int = 64):
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.rows: List[Dict[str, Any]] = []
+        os.makedirs(directory, exist_ok=True)
+        self.next_part = len(glob.glob(os.path.join(directory, 'part-*.npz')))
+
+    def append(self, row: Dict[str, Any]):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows as one new row group.
+        """
+        if not self.rows:
+            return
+        columns = list(dict.fromkeys(key for row in self.rows for key in row))
+        path = os.path.join(self.directory, f'part-{self.next_part:05d}.npz')
+        with open(path + '.tmp', 'wb') as part:
+            np.savez(part, **{column: _column_array([row.get(column) for row in self.rows]) for column in columns})
+        os.replace(path + '.tmp', path)
+        self.next_part += 1
+        self.rows = []
+
+def read_results(directory: str, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Reads every row group of a results directory into one array per column.
+
+    Columns missing from a row group are filled with NaN (numeric columns) or '' (text columns).
+
+    :param directory: Results directory written by ColumnarResultsWriter.
+    :param columns: Columns to read, defaulting to all of them.
+    :return: Column name to array.
+    """
+    parts = []
+    for path in sorted(glob.glob(os.path.join(directory, 'part-*.npz'))):
+        with np.load(path, allow_pickle=False) as part:
+            names = part.files if columns is None else [name for name in columns if name in part.files]
+            parts.append({name: part[name] for name in names})
+    lengths = [len(next(iter(part.values()), ())) for part in parts]
+    names = list(dict.fromkeys(name for part in parts for name in part))
+    results = {}
+    for name in names:
+        blocks = [part.get(name) for part in parts]
+        kind = next(block for block in blocks if block is not None).dtype.kind
+        filler = '' if kind == 'U' else np.nan
+        results[name] = np.concatenate([block if block is not None else np.full(length, filler) for block, length in zip(blocks, lengths)])
+    return results
+
+def completed_run_ids(directory: str) -> Set[str]:
+    """
+    Identifiers of the runs that finished successfully in a results directory.
+    """
+    results = read_results(directory, ('run_id', 'status'))
+    if 'run_id' not in results:
+        return set()
+    return set(results['run_id'][results['status'] == 'ok'].tolist())
+
+def _execute_run(run_function: Callable[[Dict[str, Any]], Dict[str, Any]], identifier: str, configuration: Dict[str, Any]) -> Dict[str, Any]:
+    row = {'run_id': identifier, **configuration}
+    try:
+        row.update(run_function(configuration))
+        row['status'] = 'ok'
+    except Exception as e:
+        row.update(status='failed', error=repr(e))
+    return row
+
+def run_sweep(configurations: Iterable[Dict[str, Any]], results_dir: str, run_function: Callable[[Dict[str, Any]], Dict[str, Any]] = run_headless_simulation,
+              max_workers: Optional[int] = None, max_pending: Optional[int] = None, max_runs_per_worker: Optional[int] = 8, row_group_size: int = 64) -> int:
+    """
+    Runs every configuration not already completed in ``results_dir`` on a process pool and streams the summaries.
+
+    At most ``max_pending`` runs are in flight at once, and each worker process is replaced after
+    ``max_runs_per_worker`` runs, so memory stays bounded however long the sweep is. Failed runs are recorded
+    with their error and are retried on the next invocation. Completed runs are written as soon as they finish,
+    and whatever is buffered is written even if the sweep is interrupted, so a restart only repeats runs that
+    were still in flight.
+
+    :param configurations: Configurations, e.g. from ParameterSpace.sample.
+    :param results_dir: Columnar results directory, shared across restarts.
+    :param run_function: Module-level function mapping a configuration to a dict of scalar results.
+    :param max_workers: Worker processes, defaulting to ``PARALLEL_EXECUTION['WORKER_COUNT']``.
+    :param max_pending: Runs submitted ahead of completion, defaulting to twice the worker count.
+    :param max_runs_per_worker: Runs before a worker process is recycled; None keeps workers for the whole sweep.
+    :param row_group_size: Maximum rows per written row group.
+    :return: Number of runs executed.
+    """
+    max_workers = max_workers or config.SIMULATION_SETTINGS['PARALLEL_EXECUTION']['WORKER_COUNT']
+    max_pending = max_pending or 2 * max_workers
+    done = completed_run_ids(results_dir)
+    pending_runs = [(run_id(configuration), configuration) for configuration in configurations]
+    pending_runs = [(identifier, configuration) for identifier, configuration in pending_runs if identifier not in done]
+    logging.info(f"Sweep: {len(pending_runs)} run(s) to execute, {len(done)} already completed in {results_dir}.")
+    writer = ColumnarResultsWriter(results_dir, row_group_size)
+    executed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=max_runs_per_worker) as pool:
+            in_flight = set()
+            runs = iter(pending_runs)
+            while True:
+                for identifier, configuration in itertools.islice(runs, max_pending - len(in_flight)):
+                    in_flight.add(pool.submit(_execute_run, run_function, identifier, configuration))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    writer.append(future.result())
+                    executed += 1
+                writer.flush()
+    finally:
+        writer.flush()
+    return executed
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Run an ensemble of headless simulations over META_CONFIG ranges.")
+    parser.add_argument('--sampler', choices=['grid', 'random', 'lhs'], default='lhs')
+    parser.add_argument('--runs', type=int, default=16, help="Number of runs for the random and lhs samplers.")
+    parser.add_argument('--points-per-range', type=int, default=3, help="Values per range for the grid sampler.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parameter', action='append', dest='parameters', help="Dotted META_CONFIG path to sweep; repeatable.")
+    parser.add_argument('--results', default='sweep_results', help="Columnar results directory.")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    space = ParameterSpace.from_meta_config(args.parameters or DEFAULT_SWEEP)
+    run_sweep(space.sample(args.sampler, args.runs, args.seed, args.points_per_range), args.results, max_workers=args.workers)
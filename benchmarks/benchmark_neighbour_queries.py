@@ -0,0 +1,72 @@
+"""
+Brute-force radius queries against the SpatialHash for uniformly scattered colonies.
+
+Run from the repository root: ``python benchmarks/benchmark_neighbour_queries.py``.
+"""
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+import repo_paths  # noqa: F401  (puts the flat source directories on sys.path)
+from SpatialIndex import SpatialHash
+
+def brute_force_within(positions: np.ndarray, radius: float, query_positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reference radius query that compares every query point with every agent, one query at a time.
+
+    :return: CSR arrays ``(indptr, indices)``, each row sorted by agent index.
+    """
+    indptr, indices = [0], []
+    for query in query_positions:
+        found = np.flatnonzero(np.hypot(*(positions - query).T) <= radius)
+        indices.append(found)
+        indptr.append(indptr[-1] + len(found))
+    return np.array(indptr, dtype=np.intp), np.concatenate(indices) if indices else np.empty(0, dtype=np.intp)
+
+def benchmark_neighbour_queries(n_agents: int = 1000, radius: float = 2.0, density: float = 0.1, brute_force_queries: int = 1000, seed: Optional[int] = 0) -> Dict[str, float]:
+    """
+    Compares brute-force radius queries with the spatial hash for every agent of a uniformly scattered colony.
+
+    Brute force is timed on at most ``brute_force_queries`` agents and scaled linearly to all of them, which is
+    exact for its O(n_agents) cost per query and keeps the 100k-agent comparison to seconds.
+
+    :param n_agents: Number of agents.
+    :param radius: Query radius, also used as the cell size.
+    :param density: Agents per unit area.
+    :param brute_force_queries: Largest number of queries brute force is actually run for.
+    :param seed: Seed of the positions.
+    :return: Timings in seconds, the speedup, and whether both agree on the sampled queries.
+    """
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(n_agents / density)
+    positions = rng.random((n_agents, 2)) * side
+    sample = rng.choice(n_agents, size=min(n_agents, brute_force_queries), replace=False)
+
+    start = time.perf_counter()
+    brute_indptr, brute_indices = brute_force_within(positions, radius, positions[sample])
+    brute_force_seconds = (time.perf_counter() - start) * n_agents / len(sample)
+
+    start = time.perf_counter()
+    index = SpatialHash.build(positions, radius)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    indptr, indices, _ = index.neighbours_within(radius, include_self=True)
+    query_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.update(positions + rng.normal(scale=0.05 * radius, size=positions.shape))
+    update_seconds = time.perf_counter() - start
+
+    matches = all(np.array_equal(np.sort(indices[indptr[row]:indptr[row + 1]]), brute_indices[brute_indptr[i]:brute_indptr[i + 1]]) for i, row in enumerate(sample))
+    return {
+        'brute_force_seconds': brute_force_seconds,
+        'build_seconds': build_seconds,
+        'update_seconds': update_seconds,
+        'query_seconds': query_seconds,
+        'speedup': brute_force_seconds / (build_seconds + query_seconds),
+        'mean_neighbours': len(indices) / n_agents,
+        'results_match': bool(matches),
+    }
+
+if __name__ == "__main__":
+    for agent_count in (1000, 10000, 100000):
+        print(f"{agent_count} agents: {benchmark_neighbour_queries(n_agents=agent_count)}")
@@ -0,0 +1,62 @@
+"""
+Memory footprint and step throughput of ColonyState under the float64, float32 and float16/float32 policies.
+
+Run from the repository root: ``python benchmarks/benchmark_precision.py``.
+"""
+import time
+import numpy as np
+from typing import Any, Dict, List, Sequence
+import repo_paths  # noqa: F401  (puts the flat source directories on sys.path)
+from ColonyState import ColonyState
+from Precision import PrecisionPolicy
+
+def benchmark_precision(agent_counts: Sequence[int] = (1000, 10000, 100000), state_dim: int = 8, n_actions: int = 9, steps: int = 10, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Compares memory footprint and step throughput of float64, float32 and float16/float32 colonies.
+
+    Each step runs batched perception followed by batched EFE action selection on a ColonyState with private
+    per-agent A matrices and a shared B tensor.
+
+    :param agent_counts: Colony sizes to measure.
+    :param state_dim: Size of each agent's state space.
+    :param n_actions: Number of candidate actions.
+    :param steps: Steps timed per configuration.
+    :param seed: Seed of the random models and observations.
+    :return: One row per (policy, colony size) with bytes used and steps per second.
+    """
+    policies = {
+        'float64': PrecisionPolicy(np.float64),
+        'float32': PrecisionPolicy(np.float32),
+        'float16/float32': PrecisionPolicy(np.float16, np.float32),
+    }
+    rng = np.random.default_rng(seed)
+    possible_actions = np.arange(n_actions)
+    rows = []
+    for agent_count in agent_counts:
+        positions = rng.dirichlet(np.ones(state_dim), size=agent_count)
+        A_matrix = rng.dirichlet(np.ones(state_dim), size=(agent_count, state_dim))
+        B_matrix = rng.dirichlet(np.ones(state_dim), size=(n_actions, state_dim)).transpose(0, 2, 1)
+        observations = rng.dirichlet(np.ones(state_dim), size=agent_count)
+        for name, policy in policies.items():
+            colony = ColonyState(
+                positions, np.full(agent_count, 0.1), policy.store(A_matrix),
+                np.broadcast_to(policy.store(B_matrix), (agent_count,) + B_matrix.shape),
+                np.zeros((agent_count, state_dim), dtype=policy.storage_dtype), np.zeros((agent_count, state_dim), dtype=policy.storage_dtype),
+                precision_policy=policy, preferences=np.full(state_dim, 1.0 / state_dim),
+            )
+            start = time.perf_counter()
+            for _ in range(steps):
+                colony.perceive(observations)
+                colony.decide_next_actions(possible_actions)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                'policy': name,
+                'agents': agent_count,
+                'bytes': sum(array.nbytes for array in (colony.positions, colony.influence_factors, colony.A_matrix, colony.B_matrix[0], colony.C_matrix, colony.D_matrix)),
+                'steps_per_second': steps / elapsed,
+            })
+    return rows
+
+if __name__ == "__main__":
+    for row in benchmark_precision():
+        print(row)
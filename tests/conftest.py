@@ -0,0 +1,8 @@
+import os
+import sys
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('1_PREPARE/Things', '1_PREPARE/General', '1_PREPARE/configs', '2_OPERATE'):
+    path = os.path.join(REPOSITORY_ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from checkpoint_Simulation import CheckpointStore, colony_checkpoint_arrays, restore_colony
+from schedule_Simulation import ParallelStepScheduler, colony_step
+from ColonyState import ColonyState
+
+N_AGENTS, STATE_DIM = 10, 4
+MOVEMENT = np.array([(0, -1), (-1, 0), (1, 0), (0, 1)])
+
+def colony_to_checkpoint(**agent_params) -> ColonyState:
+    """
+    A colony with state in every checkpointed array: beliefs, grid locations, two nests, private A matrices and a
+    shared B tensor that a restore must keep shared.
+    """
+    rng = np.random.default_rng(1)
+    B_matrix = rng.dirichlet(np.ones(STATE_DIM), size=(len(MOVEMENT), STATE_DIM)).transpose(0, 2, 1).astype(np.float32)
+    B_matrix.setflags(write=False)
+    return ColonyState(
+        rng.dirichlet(np.ones(STATE_DIM), size=N_AGENTS), np.full(N_AGENTS, 0.1),
+        rng.dirichlet(np.ones(STATE_DIM), size=(N_AGENTS, STATE_DIM)).astype(np.float32),
+        np.broadcast_to(B_matrix, (N_AGENTS,) + B_matrix.shape), np.zeros((N_AGENTS, STATE_DIM)), np.zeros((N_AGENTS, STATE_DIM)),
+        nest_ids=np.repeat([0, 1], N_AGENTS // 2), locations=rng.integers(0, 20, size=(N_AGENTS, 2)),
+        preferences=rng.dirichlet(np.ones(STATE_DIM)), **agent_params
+    )
+
+def observation_steps(steps: int) -> np.ndarray:
+    return np.random.default_rng(2).dirichlet(np.ones(STATE_DIM), size=(steps, N_AGENTS)).astype(np.float32)
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path):
+    observations = observation_steps(8)
+    store = CheckpointStore(str(tmp_path))
+    colony, rng = colony_to_checkpoint(), np.random.default_rng(5)
+    for step, step_observations in enumerate(observations):
+        colony_step(colony, step_observations, MOVEMENT, move=True)
+        rng.random()
+        if step == 3:
+            store.save(step, colony_checkpoint_arrays(colony), {'simulation': rng})
+
+    checkpoint = store.load()
+    assert checkpoint.step == 3
+    resumed = restore_colony(checkpoint, colony_to_checkpoint())
+    resumed_rng = checkpoint.restore_rng('simulation', np.random.default_rng(0))
+    assert resumed.B_matrix.strides[0] == 0
+    for step_observations in observations[4:]:
+        colony_step(resumed, step_observations, MOVEMENT, move=True)
+        resumed_rng.random()
+    for key in ('positions', 'locations', 'nest_ids') + ColonyState.MODEL_KEYS:
+        np.testing.assert_array_equal(getattr(resumed, key), getattr(colony, key))
+    assert resumed_rng.random() == rng.random()
+
+def test_truncated_manifest_line_is_ignored(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save(1, colony_checkpoint_arrays(colony_to_checkpoint()))
+    with open(store.manifest_path, 'a') as manifest:
+        manifest.write('{"step": 2, "arr')
+    assert store.steps() == [1]
+    assert store.load().step == 1
+
+@pytest.mark.parametrize('settings', [{'ENABLED': False}, {'ENABLED': True, 'STRATEGY': 'distributed', 'WORKER_COUNT': 3}], ids=['serial', 'distributed'])
+def test_checkpoint_keeps_buffered_updates_unfolded(tmp_path, settings):
+    observations = observation_steps(8)
+    possible_actions = np.arange(len(MOVEMENT))
+    batch = dict(model_updating='batch', model_update_interval=3)
+    store = CheckpointStore(str(tmp_path))
+    with ParallelStepScheduler(colony_to_checkpoint(**batch), possible_actions, settings, learn=True) as scheduler:
+        expected_actions = []
+        for step, step_observations in enumerate(observations):
+            expected_actions.append(scheduler.step(step_observations))
+            if step == 4:
+                snapshot = scheduler.snapshot()
+                assert snapshot.action_model_updates.pending == 2
+                store.save(step, colony_checkpoint_arrays(snapshot))
+        expected = scheduler.gather()
+
+    resumed = restore_colony(store.load(), colony_to_checkpoint(**batch))
+    assert resumed.action_model_updates.pending == 2
+    with ParallelStepScheduler(resumed, possible_actions, settings, learn=True) as scheduler:
+        for step_observations, step_expected in zip(observations[5:], expected_actions[5:]):
+            np.testing.assert_array_equal(scheduler.step(step_observations), step_expected)
+        gathered = scheduler.gather()
+    for key in ('positions',) + ColonyState.MODEL_KEYS:
+        np.testing.assert_array_equal(getattr(gathered, key), getattr(expected, key))
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from InferAnts import ActiveColony, ActiveNestmate
+from ColonyState import ColonyState
+
+STATE_DIM, N_ACTIONS = 6, 6
+
+def mixed_colony(n_agents: int, seed: int = 1) -> ColonyState:
+    """
+    A colony with one private tensor (A) and one shared, read-only broadcast tensor (B), the two storage layouts
+    every ColonyState operation has to handle.
+    """
+    rng = np.random.default_rng(seed)
+    B_matrix = rng.dirichlet(np.ones(STATE_DIM), size=(N_ACTIONS, STATE_DIM)).transpose(0, 2, 1).astype(np.float32)
+    B_matrix.setflags(write=False)
+    return ColonyState(
+        rng.dirichlet(np.ones(STATE_DIM), size=n_agents), np.full(n_agents, 0.1),
+        rng.dirichlet(np.ones(STATE_DIM), size=(n_agents, STATE_DIM)).astype(np.float32),
+        np.broadcast_to(B_matrix, (n_agents,) + B_matrix.shape), np.zeros((n_agents, STATE_DIM)), np.zeros((n_agents, STATE_DIM)),
+        nest_ids=np.arange(n_agents) % 3, locations=rng.integers(0, 50, size=(n_agents, 2)), preferences=np.full(STATE_DIM, 1.0 / STATE_DIM)
+    )
+
+def test_view_is_a_row_of_the_colony():
+    colony = mixed_colony(5)
+    view = colony.view(2)
+    assert view is colony.view(2)
+    assert np.shares_memory(view.position, colony.positions)
+    view.position[...] = 0.25
+    assert np.all(colony.positions[2] == 0.25)
+    assert np.array_equal(view.A_matrix, colony.A_matrix[2])
+    view.move(np.array([1, -1]))
+    np.testing.assert_array_equal(colony.locations[2], view.location)
+
+def test_from_agents_round_trip_matches_per_agent_stepping():
+    rng = np.random.default_rng(0)
+    state_dim = 4
+    params = dict(SENSORY_MODALITIES=(state_dim,), OBSERVATION_DIM=state_dim, ACTION_MODALITIES=(state_dim,), STATE_DIM=state_dim,
+                  MOVEMENT=[(0, -1), (-1, 0), (1, 0), (0, 1)])
+    agents = [ActiveNestmate(rng.random(state_dim), 0.1, **params, A_matrix_config=rng.random((state_dim, state_dim))) for _ in range(5)]
+    references = [ActiveNestmate(agent.position.copy(), agent.influence_factor, **params, A_matrix_config=agent.A_matrix.copy()) for agent in agents]
+    colony = ColonyState.from_agents(agents)
+    observations = rng.random((5, state_dim))
+    colony.perceive(observations)
+    for reference, observation in zip(references, observations):
+        reference.perceive(observation)
+    np.testing.assert_allclose(colony.positions, np.stack([reference.position for reference in references]), rtol=1e-5)
+    for row_index, agent in enumerate(agents):
+        assert np.shares_memory(agent.position, colony.positions)
+        np.testing.assert_array_equal(agent.position, colony.positions[row_index])
+    assert isinstance(colony.view(1, ActiveColony), ActiveColony)
+
+def test_partition_and_concatenate_round_trip():
+    colony = mixed_colony(53)
+    rebuilt = ColonyState.concatenate([colony.partition(0, 20), colony.partition(20, colony.n_agents)])
+    for key in ('positions', 'influence_factors', 'nest_ids', 'locations') + ColonyState.MODEL_KEYS:
+        np.testing.assert_array_equal(getattr(rebuilt, key), getattr(colony, key))
+    assert rebuilt.B_matrix.strides[0] == 0
+
+def test_materialize_copies_shared_tensor_on_write():
+    colony = mixed_colony(4)
+    shared = colony.B_matrix
+    view = colony.view(1)
+    assert shared.strides[0] == 0 and not shared.flags.writeable
+    colony.materialize('B_matrix')
+    assert colony.B_matrix.flags.writeable and not np.shares_memory(colony.B_matrix, shared)
+    assert np.shares_memory(view.B_matrix, colony.B_matrix)
+    colony.B_matrix[1] += 1.0
+    np.testing.assert_array_equal(colony.B_matrix[0], shared[0])
+    np.testing.assert_array_equal(colony.B_matrix[1], shared[1] + 1.0)
+
+def test_action_modalities_must_match_the_movement_count():
+    params = dict(SENSORY_MODALITIES=(4,), OBSERVATION_DIM=4, ACTION_MODALITIES=(4,), STATE_DIM=4, MOVEMENT=[(0, 0)] * 9)
+    with pytest.raises(ValueError, match='MOVEMENT'):
+        ActiveNestmate(np.full(4, 0.25), 0.1, **params)
+    with pytest.raises(ValueError, match='MOVEMENT'):
+        ColonyState.allocate(np.full((3, 4), 0.25), np.full(3, 0.1), **params)
+
+def test_views_do_not_initialize_matrices_of_their_own(monkeypatch):
+    import InferAnts
+    colony = mixed_colony(4)
+    monkeypatch.setattr(InferAnts.MatrixInitializer, 'initialize', staticmethod(lambda *args, **kwargs: pytest.fail('a view initialized a matrix')))
+    view = colony.view(3, ActiveColony)
+    assert isinstance(view, ActiveColony) and view.colony_config is not None
+    for key in ColonyState.MODEL_KEYS:
+        assert np.shares_memory(getattr(view, key), getattr(colony, key))
+    assert view.decide_action_index() == colony.decide_action_indices()[3]
+
+def test_view_preferences_write_through_to_the_colony():
+    colony, reference = mixed_colony(6), mixed_colony(6)
+    colony.decide_action_indices()
+    preferences = np.linspace(1.0, 0.1, colony.positions.shape[1])
+    preferences /= preferences.sum()
+    colony.view(2).set_preferences(preferences)
+    reference.set_preferences(preferences)
+    np.testing.assert_array_equal(colony.agent_params['preferences'][2], preferences)
+    np.testing.assert_array_equal(colony.agent_params['preferences'][0], mixed_colony(6).agent_params['preferences'])
+    assert colony.decide_action_indices()[2] == reference.decide_action_indices()[2]
+    assert colony.decide_action_indices(rows=np.array([2]))[0] == reference.decide_action_indices()[2]
+    halves = [colony.partition(0, 3), colony.partition(3, 6)]
+    np.testing.assert_array_equal(halves[0].agent_params['preferences'][2], preferences)
+    np.testing.assert_array_equal(ColonyState.concatenate(halves).agent_params['preferences'], colony.agent_params['preferences'])
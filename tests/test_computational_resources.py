@@ -0,0 +1,67 @@
+import json
+import pytest
+import computational_resources
+from computational_resources import STEP_LATENCY_SECONDS, _fit_linear, calibrate, estimate_computational_resources, load_calibration, predict_step_seconds
+
+def linear_calibration(agent_step=1e-5, exchange=1e-6, environment_update=1e-8):
+    """
+    Cost model with known per-item costs and a fixed cost of 1 ms per agent-work call.
+    """
+    return {
+        'agent_step': {'fixed': 1e-3, 'per_item': agent_step},
+        'efe_scoring': {'fixed': 0.0, 'per_item': agent_step / 2},
+        'exchange': {'fixed': 0.0, 'per_item': exchange},
+        'environment_update': {'fixed': 0.0, 'per_item': environment_update},
+        'bytes_per_agent': 400.0,
+        'shared_model_bytes': 3000,
+    }
+
+def test_linear_fit_recovers_the_coefficients_and_clips_them_at_zero():
+    fit = _fit_linear([10, 100, 1000], [0.5 + 0.01 * size for size in (10, 100, 1000)])
+    assert fit['fixed'] == pytest.approx(0.5) and fit['per_item'] == pytest.approx(0.01)
+    assert _fit_linear([10, 100, 1000], [1.0, 0.5, 0.1])['per_item'] == 0.0
+
+def test_step_prediction_splits_agents_over_workers_and_cores():
+    calibration = linear_calibration()
+    serial = predict_step_seconds(calibration, 1000, 400, 2, 1, cores=4)
+    assert serial == pytest.approx(1e-3 + 1e-5 * 1000 + 2 * 1e-8 * 400)
+    parallel = predict_step_seconds(calibration, 1000, 400, 2, 4, cores=4)
+    assert parallel == pytest.approx(1e-3 + 1e-5 * 250 + 2 * 1e-8 * 400 + 1e-6 * 250 + 4 * STEP_LATENCY_SECONDS)
+    # Workers beyond the cores share them, so their partitions are no smaller
+    oversubscribed = predict_step_seconds(calibration, 1000, 400, 2, 8, cores=4)
+    assert oversubscribed == pytest.approx(parallel + 4 * STEP_LATENCY_SECONDS)
+
+def test_estimate_recommends_the_fewest_workers_near_the_fastest_layout(monkeypatch):
+    monkeypatch.setattr(computational_resources.os, 'cpu_count', lambda: 8)
+    estimate = estimate_computational_resources(10000, 3, 2, 100, {'ENABLED': True, 'WORKER_COUNT': 2}, calibration=linear_calibration())
+    assert estimate['requested_worker_count'] == 2
+    assert estimate['predicted_wall_seconds'] == pytest.approx(100 * estimate['predicted_step_seconds'])
+    assert estimate['recommended_worker_count'] == 8
+    assert estimate['recommended_wall_seconds'] < estimate['predicted_wall_seconds']
+    assert estimate['agent_chunk_size'] == 1250
+    assert estimate['recommended_peak_memory_bytes'] > estimate['predicted_peak_memory_bytes']
+    # Exchange dominating the agent work makes extra workers a loss
+    serial = estimate_computational_resources(10000, 3, 2, 100, {'ENABLED': False, 'WORKER_COUNT': 4}, calibration=linear_calibration(exchange=1e-3))
+    assert serial['requested_worker_count'] == 1 and serial['recommended_worker_count'] == 1
+
+def test_calibration_measures_every_kernel():
+    calibration = calibrate(sizes=(8, 16, 32), repeats=1)
+    for kernel in ('agent_step', 'efe_scoring', 'exchange', 'environment_update'):
+        assert calibration[kernel]['fixed'] >= 0.0 and calibration[kernel]['per_item'] >= 0.0
+    assert calibration['bytes_per_agent'] > 0 and calibration['shared_model_bytes'] > 0
+
+def test_calibration_is_kept_in_memory_and_only_written_to_a_configured_file(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(computational_resources, 'calibrate', lambda: calls.append(1) or linear_calibration())
+    monkeypatch.setattr(computational_resources, '_CALIBRATIONS', {})
+    monkeypatch.setitem(computational_resources.config.SIMULATION_SETTINGS['COMPUTATION_SETTINGS'], 'CALIBRATION_FILE', None)
+    monkeypatch.setenv('HOME', str(tmp_path))
+    assert load_calibration() == load_calibration() == linear_calibration()
+    assert len(calls) == 1 and not list(tmp_path.iterdir())
+    path = tmp_path / 'calibration.json'
+    load_calibration(str(path), recalibrate=True)
+    assert len(calls) == 2 and json.loads(path.read_text())['calibration'] == linear_calibration()
+    # A fresh process reads the file instead of measuring again
+    monkeypatch.setattr(computational_resources, '_CALIBRATIONS', {})
+    monkeypatch.setitem(computational_resources.config.SIMULATION_SETTINGS['COMPUTATION_SETTINGS'], 'CALIBRATION_FILE', str(path))
+    assert load_calibration() == linear_calibration() and len(calls) == 2
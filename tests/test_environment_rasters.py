@@ -0,0 +1,51 @@
+import copy
+import numpy as np
+import pytest
+from types import MappingProxyType
+from EnvironmentRasters import EnvironmentRasters, clear_raster_cache, compile_rasters, environment_digest
+
+def small_environment():
+    return {
+        'GRID': {'DIMENSIONS': [8, 6]},
+        'OBSTACLES': [{'POSITION': {'LEFT': 2, 'TOP': 1}, 'SIZE': {'WIDTH': 2, 'HEIGHT': 3}}],
+        'RESOURCE_ZONES': [
+            {'TYPE': 'food', 'POSITION': {'X': 5, 'Y': 0}, 'SIZE': {'WIDTH': 3, 'HEIGHT': 2}},
+            {'TYPE': 'water', 'POSITION': {'X': 6, 'Y': 1}, 'SIZE': {'WIDTH': 4, 'HEIGHT': 4}},
+        ],
+        'PHEROMONE_CONFIG': {'DECAY_RATE': 0.01},
+    }
+
+def test_obstacles_and_zones_are_compiled_into_read_only_rasters():
+    rasters = EnvironmentRasters.from_config(small_environment())
+    assert rasters.blocked.shape == (6, 8) and rasters.blocked.sum() == 6
+    assert rasters.blocked[1:4, 2:4].all()
+    # The second zone wins the overlap and is clipped to the grid
+    assert rasters.resource_labels[0, 5] == 1 and rasters.resource_labels[1, 6] == 2 and rasters.resource_labels[4, 7] == 2
+    assert rasters.resource_types == [None, 'food', 'water']
+    assert rasters.signed_distance[2, 1] == pytest.approx(1.0) and rasters.signed_distance[2, 2] < 0
+    for raster in (rasters.blocked, rasters.obstacle_labels, rasters.resource_labels, rasters.signed_distance):
+        with pytest.raises(ValueError):
+            raster[0, 0] = 0
+
+def test_queries_gather_from_the_rasters():
+    rasters = EnvironmentRasters.from_config(small_environment())
+    locations = np.array([[1.5, 2.5], [5.0, 0.0], [-1.0, 0.0]])
+    movements = np.array([[1, 0], [0, -1], [-1, 0]])
+    np.testing.assert_array_equal(rasters.valid_moves(locations, movements), [[False, True, True], [True, False, True], [True, False, False]])
+    np.testing.assert_array_equal(rasters.resource_at(locations), [0, 1, 0])
+    np.testing.assert_allclose(rasters.clearance(locations), [1.0, np.sqrt(5.0), -1.0])
+
+def test_rasters_are_compiled_once_per_digest():
+    clear_raster_cache()
+    environment = small_environment()
+    rasters = compile_rasters(environment)
+    # Settings the rasters do not depend on, and read-only copies of the same settings, share the compiled rasters
+    changed_pheromones = copy.deepcopy(environment)
+    changed_pheromones['PHEROMONE_CONFIG']['DECAY_RATE'] = 0.5
+    assert compile_rasters(changed_pheromones) is rasters
+    assert environment_digest(MappingProxyType({**environment, 'GRID': MappingProxyType(environment['GRID'])})) == environment_digest(environment)
+    moved = copy.deepcopy(environment)
+    moved['OBSTACLES'][0]['POSITION']['LEFT'] = 4
+    assert compile_rasters(moved) is not rasters
+    clear_raster_cache()
+    assert compile_rasters(environment) is not rasters
@@ -0,0 +1,52 @@
+import numpy as np
+from event_Simulation import EventScheduler, colony_cohort_handler, SLEEP
+from schedule_Simulation import colony_step
+from ColonyState import ColonyState
+
+N_AGENTS, STATE_DIM, N_ACTIONS = 12, 4, 3
+
+def cohort_colony() -> ColonyState:
+    """
+    A small colony with distinct beliefs and influence factors, so a cohort stepped with the wrong rows diverges.
+    """
+    rng = np.random.default_rng(1)
+    return ColonyState(
+        rng.dirichlet(np.ones(STATE_DIM), size=N_AGENTS), rng.uniform(0.05, 0.3, size=N_AGENTS),
+        np.broadcast_to(np.eye(STATE_DIM), (N_AGENTS, STATE_DIM, STATE_DIM)),
+        rng.dirichlet(np.ones(STATE_DIM), size=(N_AGENTS, N_ACTIONS, STATE_DIM)).transpose(0, 1, 3, 2),
+        np.zeros((N_AGENTS, STATE_DIM)), np.zeros((N_AGENTS, STATE_DIM)), preferences=rng.dirichlet(np.ones(STATE_DIM))
+    )
+
+def test_unit_intervals_reproduce_lockstep_stepping():
+    observations = np.random.default_rng(2).dirichlet(np.ones(STATE_DIM), size=(6, N_AGENTS))
+    possible_actions = np.arange(N_ACTIONS)
+    reference = cohort_colony()
+    expected_actions = [colony_step(reference, step_observations, possible_actions) for step_observations in observations]
+
+    colony, events, taken = cohort_colony(), EventScheduler(), []
+    handler = colony_cohort_handler(colony, possible_actions, lambda rows: observations[int(events.time) - 1][rows],
+                                    lambda rows, actions: taken.append((rows.copy(), actions)))
+    events.register_agents('nestmates', handler, np.ones(colony.n_agents))
+    events.run_until(len(observations) + 0.5)
+
+    assert len(taken) == len(observations)
+    for (rows, actions), step_expected in zip(taken, expected_actions):
+        np.testing.assert_array_equal(rows, np.arange(colony.n_agents))
+        np.testing.assert_array_equal(actions, step_expected)
+    np.testing.assert_array_equal(colony.positions, reference.positions)
+
+def test_agents_run_at_their_own_rates_and_sleep_until_woken():
+    intervals = np.array([1.0, 2.0, 0.5, 1.0])
+    events, calls = EventScheduler(), []
+    def handler(time, rows, scheduler):
+        calls.append((time, tuple(rows)))
+        return np.where(rows == 3, SLEEP, intervals[rows])
+    events.register_agents('nestmates', handler, intervals)
+    events.run_until(2.1)
+    due = {time: rows for time, rows in calls}
+    assert due[0.5] == (2,)
+    assert due[1.0] == (0, 2, 3)
+    assert due[2.0] == (0, 1, 2)
+    events.wake_agents('nestmates', [3], 2.25)
+    events.run_until(2.5)
+    assert calls[-1] == (2.25, (3,))
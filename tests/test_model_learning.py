@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from InferAnts import ActiveNestmate
+from ColonyState import ColonyState
+from ModelLearning import TransitionCountAccumulator
+from schedule_Simulation import colony_step
+
+STATE_DIM = 4
+MOVEMENT = [(0, -1), (-1, 0), (0, 0), (1, 0), (0, 1)]
+
+def learning_params(rng, **params):
+    return dict(SENSORY_MODALITIES=(STATE_DIM,), OBSERVATION_DIM=STATE_DIM, ACTION_MODALITIES=(len(MOVEMENT),), STATE_DIM=STATE_DIM, MOVEMENT=MOVEMENT,
+                A_matrix_config=rng.dirichlet(np.ones(STATE_DIM), size=STATE_DIM),
+                B_matrix_config=rng.dirichlet(np.ones(STATE_DIM), size=(len(MOVEMENT), STATE_DIM)).transpose(0, 2, 1),
+                preferences=rng.dirichlet(np.ones(STATE_DIM)), **params)
+
+@pytest.mark.parametrize('updating', [dict(model_updating='online'), dict(model_updating='batch', model_update_interval=1), dict(model_updating='batch', model_update_interval=3)],
+                         ids=['online', 'batch-1', 'batch-3'])
+def test_single_agent_learns_like_the_colony(updating):
+    rng = np.random.default_rng(3)
+    params = learning_params(rng, **updating)
+    positions = rng.dirichlet(np.ones(STATE_DIM), size=3)
+    observations = rng.dirichlet(np.ones(STATE_DIM), size=(7, 3))
+    agents = [ActiveNestmate(position, 0.1, **params) for position in positions]
+    colony = ColonyState.allocate(positions, np.full(3, 0.1), **params)
+    for step_observations in observations:
+        for agent, observation in zip(agents, step_observations):
+            previous_position = np.array(agent.position)
+            agent.perceive(observation)
+            agent.update_internal_states(agent.decide_action_index(), observation, previous_position)
+        colony_step(colony, step_observations, np.arange(len(MOVEMENT)), learn=True)
+    for agent in agents:
+        agent.flush_model_updates()
+    colony.flush_model_updates()
+    assert agents[0].B_matrix.shape == (len(MOVEMENT), STATE_DIM, STATE_DIM)
+    np.testing.assert_allclose(np.stack([agent.B_matrix for agent in agents]), colony.B_matrix, rtol=1e-5)
+    np.testing.assert_allclose(np.stack([agent.A_matrix for agent in agents]), colony.A_matrix, rtol=1e-5)
+
+def test_transition_counts_buffer_only_the_chosen_action():
+    accumulator = TransitionCountAccumulator(fold_interval=2)
+    q_next, q_prev = np.array([[0.5, 0.5], [1.0, 0.0]]), np.array([[0.25, 0.75], [0.0, 1.0]])
+    accumulator.accumulate(np.array([2, 0]), q_next, q_prev)
+    accumulator.accumulate(np.array([2, 1]), q_next, q_prev)
+    assert accumulator.pending_factors()['left'].shape == (2, 2, 2)
+    model = np.zeros((2, 3, 2, 2))
+    accumulator.fold_into(model)
+    np.testing.assert_allclose(model[0, 2], 2 * np.outer(q_next[0], q_prev[0]))
+    np.testing.assert_allclose(model[1, 0], np.outer(q_next[1], q_prev[1]))
+    np.testing.assert_allclose(model[1, 1], np.outer(q_next[1], q_prev[1]))
+    assert model[0, :2].sum() == 0 and model[1, 2].sum() == 0 and accumulator.pending == 0
@@ -0,0 +1,27 @@
+import gc
+import weakref
+import numpy as np
+from ModelRegistry import ModelRegistry
+
+def test_share_returns_one_read_only_tensor_per_content():
+    registry = ModelRegistry()
+    first, second = registry.share(np.ones((3, 3))), registry.share(np.ones((3, 3)))
+    assert first is second and not first.flags.writeable
+    assert registry.share(first) is first
+    assert registry.share(np.zeros((3, 3))) is not first
+
+def test_source_arrays_are_not_retained():
+    registry = ModelRegistry()
+    source = np.ones((4, 4))
+    source_reference = weakref.ref(source)
+    registry.share(source)
+    del source
+    gc.collect()
+    assert source_reference() is None
+
+def test_zeros_are_shared_and_bytes_saved_excludes_the_registry():
+    registry = ModelRegistry()
+    tensors = [registry.zeros((2, 5), np.float32) for _ in range(10)]
+    assert all(tensor is tensors[0] for tensor in tensors)
+    assert registry.bytes_stored() == tensors[0].nbytes
+    assert registry.bytes_saved() == 9 * tensors[0].nbytes
@@ -0,0 +1,48 @@
+import threading
+import pytest
+from observe_Simulation import AsyncRenderObserver
+
+class RecordingRenderer:
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.calls = []
+
+    def update_visualization(self, step, frame):
+        self.calls.append(('frame', step, frame, threading.current_thread()))
+
+    def render_post_simulation(self, results):
+        self.calls.append(('finish', None, results, threading.current_thread()))
+
+def test_renders_on_the_calling_thread_while_simulating_on_a_worker():
+    renderers, simulation_threads = [], []
+    observer = AsyncRenderObserver(lambda: renderers.append(RecordingRenderer()) or renderers[-1], max_pending_frames=100)
+
+    def simulate():
+        simulation_threads.append(threading.current_thread())
+        for step in range(5):
+            observer.submit(step, step * 10)
+        observer.finish('results')
+        return 'done'
+
+    assert observer.run(simulate) == 'done'
+    renderer = renderers[0]
+    assert renderer.thread is threading.current_thread()
+    assert simulation_threads[0] is not threading.current_thread()
+    assert [call[:3] for call in renderer.calls] == [('frame', step, step * 10) for step in range(5)] + [('finish', None, 'results')]
+    assert all(call[3] is threading.current_thread() for call in renderer.calls)
+
+def test_simulation_errors_are_raised_after_rendering_stops():
+    observer = AsyncRenderObserver(RecordingRenderer)
+
+    def simulate():
+        observer.submit(0)
+        raise RuntimeError('step failed')
+
+    with pytest.raises(RuntimeError, match='step failed'):
+        observer.run(simulate)
+
+def test_frames_submitted_outside_run_are_ignored():
+    observer = AsyncRenderObserver(RecordingRenderer)
+    observer.submit(0, 'frame')
+    observer.finish('results')
+    assert observer.frames.empty()
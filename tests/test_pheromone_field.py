@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from PheromoneField import PheromoneField
+from ColonyState import ColonyState
+from schedule_Simulation import ParallelStepScheduler
+
+MOVEMENT = np.array([(0, -1), (-1, 0), (1, 0), (0, 1)])
+
+def deposit_colony(locations, pheromone_field) -> ColonyState:
+    """
+    A colony of agents at ``locations`` with uniform beliefs and one shared transition per MOVEMENT action.
+    """
+    n_agents, state_dim = len(locations), 3
+    B_matrix = np.broadcast_to(np.eye(state_dim), (n_agents, len(MOVEMENT), state_dim, state_dim))
+    return ColonyState(
+        np.full((n_agents, state_dim), 1.0 / state_dim), np.full(n_agents, 0.1), np.broadcast_to(np.eye(state_dim), (n_agents, state_dim, state_dim)),
+        B_matrix, np.zeros((n_agents, state_dim)), np.zeros((n_agents, state_dim)), locations=locations,
+        preferences=np.full(state_dim, 1.0 / state_dim), pheromone_field=pheromone_field
+    )
+
+def test_diffusion_conserves_mass_without_decay():
+    field = PheromoneField(20, 16, ['trail', 'alarm'], decay_rate=0.0, diffusion_rate=[0.1, 0.25])
+    field.deposit(np.array([[10, 8], [10, 8], [3, 4]]), ['trail', 'trail', 'alarm'], np.array([1.0, 2.0, 4.0]))
+    np.testing.assert_allclose(field.layers.sum(axis=(1, 2)), [3.0, 4.0])
+    for _ in range(3):
+        field.step()
+    np.testing.assert_allclose(field.layers.sum(axis=(1, 2)), [3.0, 4.0], rtol=1e-6)
+
+def test_decay_removes_its_fraction_of_the_mass():
+    field = PheromoneField(20, 20, ['trail'], decay_rate=0.1, diffusion_rate=0.2)
+    field.deposit(np.array([[10, 10]]), ['trail'], np.array([5.0]))
+    field.step()
+    np.testing.assert_allclose(field.layers.sum(), 4.5, rtol=1e-6)
+
+def test_deposits_are_clipped_and_out_of_grid_deposits_dropped():
+    field = PheromoneField(5, 5, ['trail'], max_rates=[1.0])
+    field.deposit(np.array([[1, 1], [7, 1], [2, -1]]), ['trail'] * 3, np.array([3.0, 1.0, 1.0]))
+    assert field.layers.sum() == pytest.approx(1.0)
+    assert field.layers[0, 1, 1] == pytest.approx(1.0)
+
+def test_windows_are_clipped_to_the_grid_and_match_the_layers():
+    field = PheromoneField(8, 6, ['trail', 'alarm'], window=(3, 3))
+    field.layers[...] = np.arange(field.layers.size, dtype=np.float32).reshape(field.layers.shape)
+    locations = np.array([[4, 3], [0, 0], [20, -5]])
+    windows = field.gather_windows(locations)
+    assert windows.shape == (3, 2, 3, 3)
+    np.testing.assert_array_equal(windows[0], field.layers[:, 2:5, 3:6])
+    np.testing.assert_array_equal(windows[2], field.gather_windows(np.array([[7, 0]]))[0])
+    for location, window in zip(locations, windows):
+        view = field.window_view(location)
+        assert not view.flags.writeable and np.shares_memory(view, field.layers)
+        np.testing.assert_array_equal(view, window)
+
+def test_agents_deposit_at_their_grid_cell_not_their_beliefs():
+    field = PheromoneField(10, 8, ['trail'])
+    colony = deposit_colony(np.array([[2, 3], [7, 5]]), field)
+    for agent in colony.views():
+        agent.release_pheromone('trail', 1.0)
+    field.flush()
+    assert field.layers[0, 3, 2] == pytest.approx(1.0)
+    assert field.layers[0, 5, 7] == pytest.approx(1.0)
+    assert field.layers.sum() == pytest.approx(2.0)
+
+def test_scheduled_moves_reach_the_colony_views_before_they_deposit():
+    field = PheromoneField(10, 8, ['trail'])
+    colony = deposit_colony(np.array([[2, 3], [7, 5], [4, 4]]), field)
+    settings = {'ENABLED': True, 'WORKER_COUNT': 2, 'STRATEGY': 'multithreading'}
+    with ParallelStepScheduler(colony, MOVEMENT, settings, move=True) as scheduler:
+        actions = scheduler.step(np.full((3, 3), 1.0 / 3))
+    expected = np.array([[2, 3], [7, 5], [4, 4]]) + actions
+    np.testing.assert_array_equal(scheduler.locations, expected)
+    for agent, location in zip(colony.views(), expected):
+        np.testing.assert_array_equal(agent.location, location)
+        agent.release_pheromone('trail', 1.0)
+    field.flush()
+    np.testing.assert_allclose(field.layers[0, expected[:, 1], expected[:, 0]], 1.0)
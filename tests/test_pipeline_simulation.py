@@ -0,0 +1,55 @@
+import pytest
+from pipeline_Simulation import StageError, StepPipeline
+
+class FlakyStage:
+    """
+    Fails on its first ``failures`` calls, then records each call.
+    """
+    def __init__(self, log, name, failures=0):
+        self.log, self.name, self.failures = log, name, failures
+
+    def __call__(self, context, agent=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ValueError(self.name)
+        self.log.append(self.name if agent is None else (self.name, agent))
+
+def test_stages_run_in_registration_order_and_are_timed():
+    log = []
+    pipeline = StepPipeline('fail_fast')
+    pipeline.register('perceive', FlakyStage(log, 'perceive')).register('decide', FlakyStage(log, 'decide'), per_agent=True).register('measure', FlakyStage(log, 'measure'))
+    run_step = pipeline.compile()
+    context = run_step(3, {'agents': ['a', 'b']})
+    assert context['step'] == 3
+    assert log == ['perceive', ('decide', 0), ('decide', 1), 'measure']
+    run_step(4, context)
+    assert [row['stage'] for row in pipeline.timings()] == ['perceive', 'decide', 'measure']
+    assert [row['calls'] for row in pipeline.timings()] == [2, 2, 2]
+    assert all(row['total_seconds'] >= 0.0 and row['failures'] == 0 for row in pipeline.timings())
+
+@pytest.mark.parametrize('per_agent', [False, True])
+def test_fail_fast_stops_at_the_failing_stage(per_agent):
+    log = []
+    pipeline = StepPipeline('fail_fast')
+    pipeline.register('decide', FlakyStage(log, 'decide', failures=1), per_agent=per_agent).register('measure', FlakyStage(log, 'measure'))
+    with pytest.raises(StageError) as error:
+        pipeline.compile()(7, {'agents': ['a', 'b']})
+    assert (error.value.stage, error.value.step, error.value.agent) == ('decide', 7, 0 if per_agent else None)
+    assert isinstance(error.value.__cause__, ValueError)
+    assert log == [] and pipeline.timings()[0]['failures'] == 1
+
+@pytest.mark.parametrize('per_agent', [False, True])
+def test_retry_repeats_a_failing_call_up_to_max_retries(per_agent):
+    log = []
+    pipeline = StepPipeline('retry', max_retries=2)
+    pipeline.register('decide', FlakyStage(log, 'decide', failures=2), per_agent=per_agent).register('measure', FlakyStage(log, 'measure', failures=3))
+    run_step = pipeline.compile()
+    with pytest.raises(StageError) as error:
+        run_step(0, {'agents': ['a']})
+    assert error.value.stage == 'measure'
+    assert log == [('decide', 0) if per_agent else 'decide']
+    assert [row['failures'] for row in pipeline.timings()] == [2, 3]
+
+def test_unknown_error_policies_are_rejected():
+    with pytest.raises(ValueError):
+        StepPipeline('skip_agent')
@@ -0,0 +1,44 @@
+import dataclasses
+import pytest
+import config
+
+pytest.importorskip('MetaInformAnt_Simulation')
+from plan_Simulation import SimulationPlan, clear_world_cache, materialize
+
+@pytest.fixture(autouse=True)
+def empty_world_cache():
+    clear_world_cache()
+    yield
+    clear_world_cache()
+
+def test_plans_are_deep_frozen_snapshots_of_the_configuration(monkeypatch):
+    plan = SimulationPlan.from_config(seed=3)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.agent_count = 1
+    with pytest.raises(TypeError):
+        plan.configs['SIMULATION_SETTINGS']['AGENT_COUNT'] = 1
+    with pytest.raises(TypeError):
+        plan.configs['SIMULATION_SETTINGS']['PARALLEL_EXECUTION']['WORKER_COUNT'] = 1
+    assert isinstance(plan.configs['SIMULATION_SETTINGS']['EVENT_INTERVALS'], type(plan.configs))
+    assert isinstance(plan.configs['ENVIRONMENT_CONFIG']['GRID']['DIMENSIONS'], tuple)
+    agent_count = plan.configs['SIMULATION_SETTINGS']['AGENT_COUNT']
+    monkeypatch.setitem(config.SIMULATION_SETTINGS, 'AGENT_COUNT', agent_count + 1)
+    assert plan.configs['SIMULATION_SETTINGS']['AGENT_COUNT'] == agent_count
+    changed = SimulationPlan.from_config(seed=3)
+    assert changed.agent_count == agent_count + 1 and changed.config_digest != plan.config_digest
+
+def test_equal_plans_share_one_lazily_built_world(monkeypatch):
+    plan, again = SimulationPlan.from_config(seed=3), SimulationPlan.from_config(seed=3)
+    assert plan == again and hash(plan) == hash(again) and plan is not again
+    world = materialize(plan)
+    assert materialize(again) is world
+    assert not world.is_materialized('rasters')
+    assert world.rasters is world.rasters and world.is_materialized('rasters')
+    assert materialize(SimulationPlan.from_config(seed=4)) is not world
+    monkeypatch.setitem(config.ENVIRONMENT_CONFIG['PHEROMONE_CONFIG'], 'DECAY_RATE', 0.5)
+    assert materialize(SimulationPlan.from_config(seed=3)) is not world
+
+def test_invalid_parallel_settings_are_rejected_before_anything_is_built(monkeypatch):
+    monkeypatch.setitem(config.SIMULATION_SETTINGS, 'PARALLEL_EXECUTION', {'ENABLED': True, 'WORKER_COUNT': 0})
+    with pytest.raises(ValueError):
+        materialize(SimulationPlan.from_config(seed=3))
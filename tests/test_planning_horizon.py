@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from PlanningHorizon import HorizonController
+
+N_ACTIONS, STATE_DIM = 9, 8
+TWO_STEP_WORK = 2.0 * STATE_DIM ** 2 * (N_ACTIONS + N_ACTIONS ** 2)
+
+def test_fixed_horizon_is_clamped_to_the_budget():
+    controller = HorizonController(N_ACTIONS, STATE_DIM, max_horizon=4, adaptive=False, budget_flops=100 * TWO_STEP_WORK)
+    np.testing.assert_array_equal(controller.horizons(np.ones((100, STATE_DIM))), 2)
+    np.testing.assert_array_equal(controller.horizons(np.ones((1, STATE_DIM))), 4)
+    assert controller.last_work == controller.work_per_agent[4]
+
+def test_fixed_horizon_without_budget_is_max_horizon():
+    controller = HorizonController(N_ACTIONS, STATE_DIM, max_horizon=3, adaptive=False)
+    np.testing.assert_array_equal(controller.horizons(np.ones((5, STATE_DIM))), 3)
+
+def test_adaptive_horizons_stay_within_the_budget():
+    controller = HorizonController(N_ACTIONS, STATE_DIM, max_horizon=4, budget_flops=50 * TWO_STEP_WORK)
+    beliefs = np.ones((100, STATE_DIM))
+    for _ in range(5):
+        horizons = controller.horizons(beliefs)
+        assert controller.work(horizons) <= controller.budget_flops
+
+def test_budget_is_validated_at_construction():
+    with pytest.raises(ValueError):
+        HorizonController(N_ACTIONS, STATE_DIM, max_horizon=4, budget_flops=10.0, n_agents=5)
+    controller = HorizonController(N_ACTIONS, STATE_DIM, max_horizon=4, budget_flops=100 * TWO_STEP_WORK, n_agents=100)
+    assert controller.affordable_horizon(100, controller.budget_flops) == 2
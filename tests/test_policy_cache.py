@@ -0,0 +1,21 @@
+import itertools
+import numpy as np
+import pytest
+from PolicyCache import cached_policies, clear_policy_cache, iter_policy_chunks, policies_for_controls
+
+def test_policies_follow_the_itertools_product_order():
+    num_controls, policy_length = (3, 1, 2), 2
+    steps = list(itertools.product(*[range(n) for n in num_controls]))
+    expected = np.array([list(policy) for policy in itertools.product(steps, repeat=policy_length)])
+    np.testing.assert_array_equal(policies_for_controls(num_controls, policy_length), expected)
+    np.testing.assert_array_equal(np.concatenate(list(iter_policy_chunks(num_controls, policy_length, chunk_size=5))), expected)
+
+def test_cached_policies_are_shared_and_read_only():
+    clear_policy_cache()
+    policies = cached_policies([4, 3], 2, 2, controllable_factors=[0])
+    assert policies is cached_policies([4, 5], 2, 2, controllable_factors=[0])
+    assert policies.shape == (16, 2, 2) and not policies[..., 1].any()
+    with pytest.raises(ValueError):
+        policies[0, 0, 0] = 1
+    with pytest.raises(ValueError):
+        cached_policies([4, 3], 3, 2)
@@ -0,0 +1,46 @@
+import numpy as np
+from PolicyCache import policies_for_controls
+from PolicyRollout import RolloutTrie
+
+N_CONTROLS = (3, 2)
+
+def factored_model(rng, n_states=(4, 3), n_observations=(5, 2)):
+    transitions = [rng.dirichlet(np.ones(n), size=(n, controls)).transpose(2, 0, 1) for n, controls in zip(n_states, N_CONTROLS)]
+    observations = [rng.dirichlet(np.ones(n), size=n_states).transpose(2, 0, 1) for n in n_observations]
+    preferences = [rng.normal(size=n) for n in n_observations]
+    posterior = [rng.dirichlet(np.ones(n)) for n in n_states]
+    return transitions, observations, preferences, posterior
+
+def naive_rollout(transitions, observations, preferences, posterior, policy):
+    """
+    Propagates one policy step by step without sharing prefixes.
+    """
+    log_preferences = [C - C.max() - np.log(np.exp(C - C.max()).sum()) for C in preferences]
+    qs, G, future_states, future_observations = posterior, 0.0, [], []
+    for step in policy:
+        qs = [B[:, :, action] @ q for B, action, q in zip(transitions, step, qs)]
+        joint = np.einsum('i,j->ij', *qs)
+        qo = [np.einsum('oij,ij->o', A, joint) for A in observations]
+        for A, q, log_C in zip(observations, qo, log_preferences):
+            G += q @ (np.log(np.maximum(q, 1e-16)) - log_C)
+            G += np.sum(joint * -np.sum(A * np.log(np.maximum(A, 1e-16)), axis=0))
+        future_states.append(qs)
+        future_observations.append(qo)
+    return G, future_states, future_observations
+
+def test_trie_rollouts_match_naive_per_policy_rollouts():
+    rng = np.random.default_rng(0)
+    transitions, observations, preferences, posterior = factored_model(rng)
+    trie = RolloutTrie(transitions, observations, preferences)
+    trie.reset(posterior)
+    policies = policies_for_controls(N_CONTROLS, 3)
+    efe = trie.evaluate(policies)
+    # 6 actions per step: 1 root + 6 + 36 + 216 nodes instead of 3 * 216 steps
+    assert len(trie) == 1 + 6 + 36 + 216
+    for index in rng.choice(len(policies), size=12, replace=False):
+        G, future_states, future_observations = naive_rollout(transitions, observations, preferences, posterior, policies[index])
+        np.testing.assert_allclose(efe[index], G, rtol=1e-9)
+        states, outcomes = trie.rollout(policies[index])
+        for step in range(3):
+            for actual, expected in zip(states[step] + outcomes[step], future_states[step] + future_observations[step]):
+                np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
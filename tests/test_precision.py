@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from ColonyState import ColonyState
+from Precision import PrecisionPolicy
+
+STATE_DIM, N_ACTIONS = 5, 3
+
+def colony_in(precision_policy: PrecisionPolicy, n_agents: int = 6, seed: int = 0) -> ColonyState:
+    """
+    A float64-built colony handed to ``precision_policy``, with B shared as a read-only broadcast tensor.
+    """
+    rng = np.random.default_rng(seed)
+    B_matrix = rng.dirichlet(np.ones(STATE_DIM), size=(N_ACTIONS, STATE_DIM)).transpose(0, 2, 1)
+    B_matrix.setflags(write=False)
+    return ColonyState(
+        rng.dirichlet(np.ones(STATE_DIM), size=n_agents), np.full(n_agents, 0.1),
+        rng.dirichlet(np.ones(STATE_DIM), size=(n_agents, STATE_DIM)), np.broadcast_to(B_matrix, (n_agents,) + B_matrix.shape),
+        np.zeros((n_agents, STATE_DIM)), np.zeros((n_agents, STATE_DIM)),
+        preferences=np.full(STATE_DIM, 1.0 / STATE_DIM), precision_policy=precision_policy,
+    )
+
+@pytest.mark.parametrize('storage, accumulation, expected', [
+    ('float32', None, np.float32),
+    ('float64', None, np.float64),
+    ('float16', None, np.float32),
+    ('float16', 'float16', np.float32),
+    ('float32', 'float64', np.float64),
+])
+def test_accumulation_is_never_narrower_than_float32(storage, accumulation, expected):
+    policy = PrecisionPolicy(storage, accumulation)
+    assert policy.storage_dtype == np.dtype(storage) and policy.accumulation_dtype == expected
+    assert policy.scalar(0.1).dtype == expected
+    assert PrecisionPolicy.from_config({'DTYPE': storage, 'ACCUMULATION_DTYPE': accumulation}).accumulation_dtype == expected
+
+def test_conversions_only_copy_when_the_dtype_changes():
+    policy = PrecisionPolicy('float16')
+    stored = np.zeros(4, dtype=np.float16)
+    assert policy.store(stored) is stored and policy.store(np.zeros(4)).dtype == np.float16
+    computed = np.zeros(4, dtype=np.float32)
+    assert policy.compute(computed) is computed and policy.compute(stored).dtype == np.float32
+    assert PrecisionPolicy.from_params({'precision_policy': policy}) is policy
+
+def test_colony_stores_in_float16_and_accumulates_in_float32():
+    colony = colony_in(PrecisionPolicy('float16'))
+    for name in ('positions', 'influence_factors', 'A_matrix', 'B_matrix', 'C_matrix', 'D_matrix'):
+        assert getattr(colony, name).dtype == np.float16, name
+    # The shared transition model is cast once and stays a broadcast view
+    assert colony.B_matrix.strides[0] == 0 and not colony.B_matrix.flags.writeable
+    assert colony._predict_sensory_outcomes().dtype == np.float32
+    colony.perceive(np.full((6, STATE_DIM), 0.2))
+    assert colony.positions.dtype == np.float16
+
+def test_float16_storage_decides_like_float32_storage():
+    half, single = colony_in(PrecisionPolicy('float16')), colony_in(PrecisionPolicy('float32'))
+    observations = np.random.default_rng(1).dirichlet(np.ones(STATE_DIM), size=6)
+    half.perceive(observations)
+    single.perceive(observations)
+    np.testing.assert_allclose(half.positions, single.positions, atol=2e-3)
+    np.testing.assert_array_equal(half.decide_action_indices(), single.decide_action_indices())
@@ -0,0 +1,39 @@
+import importlib.util
+import os
+import numpy as np
+import pytest
+from RandomStreams import RandomStreams
+
+def test_a_stream_depends_only_on_the_seed_and_its_path():
+    first, second = RandomStreams(7), RandomStreams(7)
+    agent_first = first.agent(1, 2).random(5)
+    first.nest(0).random(100)
+    second.nest(0).random(3)
+    np.testing.assert_array_equal(second.agent(1, 2).random(5), agent_first)
+    np.testing.assert_array_equal(first.agent(1, 2).random(5), agent_first)
+    np.testing.assert_array_equal(first.child('agent', 1, 2).generator('x').random(3), second.child('agent', 1, 2).generator('x').random(3))
+    assert not np.array_equal(RandomStreams(8).agent(1, 2).random(5), agent_first)
+
+def test_streams_of_different_paths_are_independent():
+    streams = RandomStreams(7)
+    draws = np.stack([
+        streams.nest(0).random(2000), streams.nest(1).random(2000), streams.agent(0, 0).random(2000),
+        streams.agent(0, 1).random(2000), streams.agent(1, 0).random(2000), streams.worker(0).random(2000),
+        streams.generator('cognitive_security', 0).random(2000), streams.child('agent', 0).generator('x').random(2000),
+    ])
+    assert len({row.tobytes() for row in draws}) == len(draws)
+    correlations = np.corrcoef(draws)[np.triu_indices(len(draws), k=1)]
+    assert np.abs(correlations).max() < 0.1
+
+@pytest.mark.parametrize('module_name', ['pseudo-pymdp_Ant_1', 'pseudo-pymdp_Ant_2'])
+def test_pseudo_pymdp_nestmates_draw_from_their_own_agent_stream(module_name):
+    pytest.importorskip('tabulate')
+    pytest.importorskip('termcolor')
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '1_PREPARE', 'Things', module_name + '.py')
+    spec = importlib.util.spec_from_file_location(module_name.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    streams = RandomStreams(3)
+    first, again, other = (module.NestmateAgent([3], [3], [2], nest_id=0, agent_id=agent_id, random_streams=streams) for agent_id in (0, 0, 1))
+    np.testing.assert_array_equal(first.observation_model[0], again.observation_model[0])
+    assert not np.array_equal(first.observation_model[0], other.observation_model[0])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from ColonyState import ColonyState
+from schedule_Simulation import ParallelStepScheduler, colony_step, partition_bounds
+
+N_AGENTS, STATE_DIM, N_ACTIONS = 23, 5, 4
+
+SETTINGS = [
+    {'ENABLED': False},
+    {'ENABLED': True, 'STRATEGY': 'multithreading', 'WORKER_COUNT': 3},
+    {'ENABLED': True, 'STRATEGY': 'distributed', 'WORKER_COUNT': 1},
+    {'ENABLED': True, 'STRATEGY': 'distributed', 'WORKER_COUNT': 4},
+]
+
+def varied_colony(seed: int = 1, **agent_params) -> ColonyState:
+    """
+    A colony whose rows all differ (beliefs, influence factors, private A matrices, preferences), over a prime number
+    of agents so that partitions are uneven; a row stepped against another row's data changes the result.
+    """
+    rng = np.random.default_rng(seed)
+    B_matrix = rng.dirichlet(np.ones(STATE_DIM), size=(N_ACTIONS, STATE_DIM)).transpose(0, 2, 1).astype(np.float32)
+    B_matrix.setflags(write=False)
+    return ColonyState(
+        rng.dirichlet(np.ones(STATE_DIM), size=N_AGENTS), rng.uniform(0.05, 0.3, size=N_AGENTS),
+        rng.dirichlet(np.ones(STATE_DIM), size=(N_AGENTS, STATE_DIM)).astype(np.float32),
+        np.broadcast_to(B_matrix, (N_AGENTS,) + B_matrix.shape), np.zeros((N_AGENTS, STATE_DIM)), np.zeros((N_AGENTS, STATE_DIM)),
+        preferences=rng.dirichlet(np.ones(STATE_DIM), size=N_AGENTS), **agent_params
+    )
+
+def observation_steps(steps: int, seed: int = 2) -> np.ndarray:
+    return np.random.default_rng(seed).dirichlet(np.ones(STATE_DIM), size=(steps, N_AGENTS)).astype(np.float32)
+
+def test_partition_bounds_cover_every_row_once():
+    bounds = partition_bounds(10, 4)
+    assert bounds == [(0, 3), (3, 6), (6, 8), (8, 10)]
+    assert partition_bounds(2, 5) == [(0, 1), (1, 2)]
+
+@pytest.mark.parametrize('settings', SETTINGS, ids=lambda settings: f"{settings.get('STRATEGY', 'serial')}-{settings.get('WORKER_COUNT', 1)}")
+def test_scheduler_matches_serial_stepping(settings):
+    observations = observation_steps(5)
+    possible_actions = np.arange(N_ACTIONS)
+    reference = varied_colony()
+    expected_actions = [colony_step(reference, step_observations, possible_actions) for step_observations in observations]
+    with ParallelStepScheduler(varied_colony(), possible_actions, settings) as scheduler:
+        actions = [scheduler.step(step_observations) for step_observations in observations]
+        gathered = scheduler.gather()
+    for step_actions, step_expected in zip(actions, expected_actions):
+        np.testing.assert_array_equal(step_actions, step_expected)
+    np.testing.assert_array_equal(scheduler.positions, reference.positions)
+    np.testing.assert_array_equal(gathered.positions, reference.positions)
+    assert gathered.B_matrix.strides[0] == 0
+
+@pytest.mark.parametrize('settings', SETTINGS, ids=lambda settings: f"{settings.get('STRATEGY', 'serial')}-{settings.get('WORKER_COUNT', 1)}")
+def test_learning_credits_the_chosen_action_slice(settings):
+    observations = observation_steps(7)
+    possible_actions = np.arange(N_ACTIONS)
+    reference = varied_colony()
+    reference.materialize('B_matrix')
+    rows = np.arange(reference.n_agents)
+    expected_actions = []
+    for step_observations in observations:
+        previous_positions = np.array(reference.positions)
+        reference.perceive(step_observations)
+        action_indices = reference.decide_action_indices()
+        reference.B_matrix[rows, action_indices] += reference.positions[:, :, np.newaxis] * previous_positions[:, np.newaxis, :]
+        reference.A_matrix += step_observations[:, :, np.newaxis] * step_observations[:, np.newaxis, :]
+        expected_actions.append(possible_actions[action_indices])
+
+    initial = varied_colony()
+    with ParallelStepScheduler(varied_colony(model_updating='online'), possible_actions, settings, learn=True) as scheduler:
+        actions = [scheduler.step(step_observations) for step_observations in observations]
+        gathered = scheduler.gather()
+    for step_actions, step_expected in zip(actions, expected_actions):
+        np.testing.assert_array_equal(step_actions, step_expected)
+    np.testing.assert_allclose(gathered.B_matrix, reference.B_matrix, rtol=1e-5)
+    untouched = np.ones(initial.B_matrix.shape[:2], dtype=bool)
+    for step_actions in actions:
+        untouched[rows, step_actions] = False
+    np.testing.assert_array_equal(gathered.B_matrix[untouched], initial.B_matrix[untouched])
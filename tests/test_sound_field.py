@@ -0,0 +1,26 @@
+import numpy as np
+from SoundField import SoundField
+
+def test_pairwise_and_grid_paths_agree_without_obstacles():
+    rng = np.random.default_rng(0)
+    field = SoundField(np.zeros((30, 40), dtype=bool), ['alarm', 'recruit'], cutoff_gain=1e-2)
+    field.emit(rng.integers(0, 30, size=(20, 2)), rng.integers(0, 2, size=20), rng.uniform(0, 5, size=20))
+    listeners = rng.integers(0, 30, size=(15, 2))
+    np.testing.assert_allclose(field.received(listeners, 'pairwise'), field.received(listeners, 'grid'), atol=1e-5)
+
+def test_listen_hears_each_emission_once():
+    field = SoundField(np.zeros((10, 10), dtype=bool), ['alarm'])
+    field.queue((5, 5), 'alarm', 2.0)
+    heard = field.listen(np.array([[5, 5], [6, 5]]))
+    np.testing.assert_allclose(heard[:, 0], [2.0, 1.0], rtol=1e-6)
+    np.testing.assert_array_equal(field.listen(np.array([[5, 5]])), [[0.0]])
+
+def test_obstacles_attenuate_pairwise_sound():
+    blocked = np.zeros((10, 10), dtype=bool)
+    blocked[:, 5] = True
+    field = SoundField(blocked, ['alarm'], occlusion_transmission=0.5)
+    field.emit(np.array([[2, 5]]), [0], [4.0])
+    free = SoundField(np.zeros_like(blocked), ['alarm'])
+    free.emit(np.array([[2, 5]]), [0], [4.0])
+    listener = np.array([[8, 5]])
+    np.testing.assert_allclose(field.received(listener, 'pairwise'), free.received(listener, 'pairwise') * 0.5, rtol=1e-5)
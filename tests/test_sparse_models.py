@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from SparseModels import IndexTransition, SparseLikelihood, joint_posterior, sparse_expected_free_energy
+
+def test_joint_posterior_matches_between_dense_and_sparse_likelihoods():
+    rng = np.random.default_rng(0)
+    dense = [np.where(rng.random((12, 20)) < 0.3, rng.random((12, 20)), 0.0) for _ in range(3)]
+    prior = rng.dirichlet(np.ones(20))
+    observations = [2, 7, 11]
+    expected = joint_posterior(dense, observations, prior)
+    np.testing.assert_allclose(joint_posterior([SparseLikelihood(matrix) for matrix in dense], observations, prior), expected)
+    assert expected.shape == (20,)
+    np.testing.assert_allclose(expected.sum(), 1.0)
+
+def test_index_transition_predicts_like_its_dense_tensor():
+    next_state = np.random.default_rng(1).integers(0, 8, size=(3, 8))
+    transitions = IndexTransition(next_state)
+    qs = np.random.default_rng(2).dirichlet(np.ones(8))
+    for action in range(3):
+        np.testing.assert_allclose(transitions.predict(qs, action), transitions.to_dense()[:, :, action] @ qs)
+
+def test_culinary_mdp_sparse_and_dense_modes_agree():
+    pytest.importorskip('pymdp')
+    from SaltFatAcidHeat import CulinaryMDP
+    dense, sparse = CulinaryMDP(n_ingredients=3, n_techniques=2), CulinaryMDP(n_ingredients=3, n_techniques=2, sparse=True)
+    np.testing.assert_array_equal(dense.B, sparse.B.to_dense())
+    observation = np.array([5, 5, 5, 5])
+    np.testing.assert_allclose(sparse.infer_states(observation), dense.infer_states(observation))
+
+def test_sparse_expected_free_energy_matches_the_dense_formula():
+    rng = np.random.default_rng(3)
+    dense = np.where(rng.random((6, 9)) < 0.4, rng.random((6, 9)), 0.0)
+    dense /= np.maximum(dense.sum(axis=0), 1e-12)
+    log_preferences = np.log(rng.dirichlet(np.ones(6)))
+    qs = rng.dirichlet(np.ones(9), size=4)
+    expected_observations = qs @ dense.T
+    ambiguity = -np.sum(np.where(dense > 0, dense * np.log(np.where(dense > 0, dense, 1.0)), 0.0), axis=0)
+    expected = np.sum(expected_observations * (np.log(np.maximum(expected_observations, 1e-16)) - log_preferences), axis=1) + qs @ ambiguity
+    np.testing.assert_allclose(sparse_expected_free_energy(SparseLikelihood(dense), log_preferences, qs), expected, rtol=1e-10)
+
+def test_sparse_culinary_mdp_scores_and_perturbs_without_densifying():
+    pytest.importorskip('pymdp')
+    from SaltFatAcidHeat import CulinaryMDP
+    mdp = CulinaryMDP(n_ingredients=3, n_techniques=2, sparse=True, rng=np.random.default_rng(0))
+    mdp.infer_states(np.array([5, 5, 5, 5]))
+    q_pi = mdp.infer_policies()
+    assert q_pi.shape == (2,)
+    np.testing.assert_allclose(q_pi.sum(), 1.0)
+    assert mdp.sample_action(q_pi)[0] == np.argmax(q_pi)
+    mdp._simulate_noisy_observations()
+    assert all(isinstance(likelihood, SparseLikelihood) and likelihood.matrix.nnz == mdp.n_states for likelihood in mdp.A)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from SpatialIndex import SpatialHash
+
+def brute_force_rows(positions, radius, query_positions):
+    distances = np.hypot(*(query_positions[:, np.newaxis, :] - positions[np.newaxis, :, :]).transpose(2, 0, 1))
+    return [np.flatnonzero(row <= radius) for row in distances]
+
+@pytest.mark.parametrize('cell_size', [0.5, 2.0, 7.0])
+def test_neighbours_within_matches_brute_force(cell_size):
+    rng = np.random.default_rng(0)
+    positions = rng.random((400, 2)) * 40 - 20
+    queries = rng.random((50, 2)) * 50 - 25
+    index = SpatialHash.build(positions, cell_size)
+    indptr, indices, distances = index.neighbours_within(3.0, queries)
+    for row, expected in enumerate(brute_force_rows(positions, 3.0, queries)):
+        found = indices[indptr[row]:indptr[row + 1]]
+        np.testing.assert_array_equal(np.sort(found), expected)
+        assert np.all(np.diff(distances[indptr[row]:indptr[row + 1]]) >= 0)
+
+def test_update_and_self_queries_match_a_fresh_build():
+    rng = np.random.default_rng(1)
+    positions = rng.random((300, 2)) * 30
+    index = SpatialHash.build(positions, 2.0)
+    moved = positions + rng.normal(scale=0.5, size=positions.shape)
+    index.update(moved)
+    indptr, indices, _ = index.neighbours_within(2.0)
+    fresh_indptr, fresh_indices, _ = SpatialHash.build(moved, 2.0).neighbours_within(2.0)
+    np.testing.assert_array_equal(indptr, fresh_indptr)
+    np.testing.assert_array_equal(indices, fresh_indices)
+    for row, expected in enumerate(brute_force_rows(moved, 2.0, moved)):
+        np.testing.assert_array_equal(np.sort(indices[indptr[row]:indptr[row + 1]]), expected[expected != row])
+
+def test_k_nearest_matches_brute_force():
+    rng = np.random.default_rng(2)
+    positions = rng.random((250, 2)) * 25
+    indptr, indices, distances = SpatialHash.build(positions, 1.0).k_nearest(5)
+    all_distances = np.hypot(*(positions[:, np.newaxis, :] - positions[np.newaxis, :, :]).transpose(2, 0, 1))
+    np.fill_diagonal(all_distances, np.inf)
+    np.testing.assert_array_equal(np.diff(indptr), 5)
+    np.testing.assert_allclose(distances.reshape(-1, 5), np.sort(all_distances, axis=1)[:, :5])
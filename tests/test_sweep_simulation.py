@@ -0,0 +1,51 @@
+import glob
+import os
+import numpy as np
+import pytest
+import config
+from sweep_Simulation import _column_array, completed_run_ids, config_overrides, read_results, resolve_config_target, run_id, run_sweep
+
+def scaled_run(configuration):
+    if configuration['X'] < 0:
+        raise ValueError("negative X")
+    return {'score': 2.0 * configuration['X'], 'steps': 10, 'converged': configuration['X'] > 1}
+
+def test_swept_names_resolve_to_the_shallowest_matching_key():
+    assert resolve_config_target('SIMULATION.AGENT_COUNT') == (config.SIMULATION_SETTINGS, 'AGENT_COUNT')
+    target, key = resolve_config_target('ACTIVE_INFERENCE.LEARNING_RATE')
+    assert target is config.ACTIVE_INFERENCE_CONFIG and key == 'LEARNING_RATE'
+    target, key = resolve_config_target('ACTIVE_INFERENCE.PLANNING_HORIZON.FIXED')
+    assert target is config.ACTIVE_INFERENCE_CONFIG['PLANNING_HORIZON'] and key == 'BASE_VALUE'
+    with pytest.raises(KeyError):
+        resolve_config_target('SIMULATION.NOT_A_SETTING')
+
+def test_config_overrides_are_restored_on_error():
+    before = config.SIMULATION_SETTINGS['AGENT_COUNT']
+    with pytest.raises(RuntimeError):
+        with config_overrides({'SIMULATION.AGENT_COUNT': before + 7}):
+            assert config.SIMULATION_SETTINGS['AGENT_COUNT'] == before + 7
+            raise RuntimeError
+    assert config.SIMULATION_SETTINGS['AGENT_COUNT'] == before
+
+def test_columns_with_missing_values_stay_numeric():
+    np.testing.assert_array_equal(_column_array([True, None, False]), [1.0, np.nan, 0.0])
+    np.testing.assert_array_equal(_column_array([3, None]), [3.0, np.nan])
+    assert _column_array([True, False]).dtype == bool and _column_array([1, 2]).dtype == np.int64
+    np.testing.assert_array_equal(_column_array(['a', None]), ['a', ''])
+
+def test_results_are_written_as_npz_columns_and_completed_runs_are_skipped(tmp_path):
+    results_dir = str(tmp_path / 'results')
+    configurations = [{'X': value} for value in (0.5, 1.5, 2.5, -1.0)]
+    assert run_sweep(configurations, results_dir, scaled_run, max_workers=2) == 4
+    assert glob.glob(os.path.join(results_dir, 'part-*.npz'))
+    results = read_results(results_dir)
+    order = np.argsort(results['X'])
+    np.testing.assert_array_equal(results['status'][order], ['failed', 'ok', 'ok', 'ok'])
+    np.testing.assert_allclose(results['score'][order][1:], [1.0, 3.0, 5.0])
+    assert np.isnan(results['score'][order][0])
+    # Columns a failed run lacks are padded with NaN
+    np.testing.assert_array_equal(results['converged'][order][1:], [0.0, 1.0, 1.0])
+    assert completed_run_ids(results_dir) == {run_id(configuration) for configuration in configurations[:3]}
+    # Only the failed run is retried
+    assert run_sweep(configurations, results_dir, scaled_run, max_workers=2) == 1
+    assert len(read_results(results_dir, ['run_id'])['run_id']) == 5
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from ThingBatch import ThingBatch
+
+N_STATES, N_OBSERVATIONS, N_ACTIONS = 4, 3, 2
+
+def object_array(*factors):
+    array = np.empty(len(factors), dtype=object)
+    array[:] = list(factors)
+    return array
+
+def make_thing(rng, policy_length=2, n_modalities=1):
+    policies = np.stack(np.meshgrid(*[np.arange(N_ACTIONS)] * policy_length, indexing='ij'), axis=-1).reshape(-1, policy_length, 1)
+    observation_models = [rng.dirichlet(np.ones(N_OBSERVATIONS + modality), size=N_STATES).T for modality in range(n_modalities)]
+    preferences = [rng.normal(size=N_OBSERVATIONS + modality) for modality in range(n_modalities)]
+    return SimpleNamespace(
+        observation_model=observation_models[0] if n_modalities == 1 else object_array(*observation_models),
+        transition_model=rng.dirichlet(np.ones(N_STATES), size=(N_STATES, N_ACTIONS)).transpose(2, 0, 1),
+        preference_model=preferences[0] if n_modalities == 1 else object_array(*preferences),
+        posterior_states=rng.dirichlet(np.ones(N_STATES)),
+        possible_policies=policies,
+        policy_prior=None,
+    )
+
+def test_posterior_is_the_single_factor_bayes_update():
+    rng = np.random.default_rng(0)
+    things = [make_thing(rng) for _ in range(5)]
+    priors = [thing.posterior_states.copy() for thing in things]
+    observations = rng.integers(N_OBSERVATIONS, size=(5, 1))
+    posteriors = ThingBatch(things).update_posterior_states(observations)
+    for thing, prior, observation, posterior in zip(things, priors, observations, posteriors):
+        expected = thing.observation_model[observation[0]] * prior
+        np.testing.assert_allclose(posterior, expected / expected.sum(), rtol=1e-6)
+
+def test_batch_rows_match_single_agent_batches():
+    rng = np.random.default_rng(1)
+    things = [make_thing(rng) for _ in range(6)]
+    observations = rng.integers(N_OBSERVATIONS, size=(6, 1))
+    batch = ThingBatch(things)
+    batch.update_posterior_states(observations)
+    policies = batch.update_posterior_policies()
+    for thing, observation, row in zip(things, observations, policies):
+        single = ThingBatch([thing])
+        single.update_posterior_states(observation[np.newaxis])
+        np.testing.assert_allclose(single.update_posterior_policies()[0], row, rtol=1e-6)
+
+def test_policy_posterior_matches_a_per_policy_rollout():
+    rng = np.random.default_rng(4)
+    things = [make_thing(rng, policy_length=3, n_modalities=2) for _ in range(3)]
+    batch = ThingBatch(things)
+    for row, thing in enumerate(things):
+        A = list(thing.observation_model)
+        joint = np.einsum('as,bs->abs', *A).reshape(-1, N_STATES)
+        log_C = [np.log(np.exp(C) / np.exp(C).sum() + 1e-16) for C in thing.preference_model]
+        G = np.zeros(len(thing.possible_policies))
+        for index, policy in enumerate(thing.possible_policies):
+            qs = thing.posterior_states
+            for action in policy[:, 0]:
+                qs = thing.transition_model[:, :, action] @ qs
+                G[index] += sum((model @ qs) @ log_preferences for model, log_preferences in zip(A, log_C))
+                qo = joint @ qs
+                G[index] += qs @ np.sum(joint * np.log(joint + np.exp(-16)), axis=0) - qo @ np.log(qo + 1e-16)
+        expected = np.exp(16.0 * G - (16.0 * G).max())
+        np.testing.assert_allclose(batch.update_posterior_policies()[row], expected / expected.sum(), rtol=1e-6, atol=1e-12)
+
+def test_deterministic_selection_is_the_default_and_picks_the_most_probable_first_action():
+    rng = np.random.default_rng(5)
+    things = [make_thing(rng) for _ in range(4)]
+    batch = ThingBatch(things)
+    actions = batch.step(np.zeros((4, 1), dtype=int))
+    first_actions = batch.possible_policies[:, 0, 0]
+    marginals = np.stack([np.bincount(first_actions, weights=policies) for policies in batch.updated_policies])
+    np.testing.assert_array_equal(actions, marginals.argmax(axis=1))
+
+def test_stochastic_actions_are_reproducible_for_the_same_seed():
+    things = [make_thing(np.random.default_rng(2)) for _ in range(4)]
+    observations = np.zeros((4, 1), dtype=int)
+    first = ThingBatch(things).step(observations, np.random.default_rng(7), action_selection='stochastic')
+    second = ThingBatch([make_thing(np.random.default_rng(2)) for _ in range(4)]).step(observations, np.random.default_rng(7), action_selection='stochastic')
+    np.testing.assert_array_equal(first, second)
+    with pytest.raises(ValueError):
+        ThingBatch(things).step(observations, action_selection='stochastic')
+
+@pytest.mark.parametrize('n_modalities', [1, 2])
+def test_matches_pymdp_inference_and_control(n_modalities):
+    pytest.importorskip('pymdp')
+    from pymdp import control, inference
+    rng = np.random.default_rng(6)
+    things = [make_thing(rng, n_modalities=n_modalities) for _ in range(4)]
+    observations = rng.integers(N_OBSERVATIONS, size=(4, n_modalities))
+    references = []
+    for thing, observation in zip(things, observations):
+        A = object_array(*thing.observation_model) if n_modalities > 1 else object_array(thing.observation_model)
+        C = object_array(*thing.preference_model) if n_modalities > 1 else object_array(thing.preference_model)
+        qs = inference.update_posterior_states(A, [int(o) for o in observation], prior=object_array(thing.posterior_states))
+        q_pi, _ = control.update_posterior_policies(qs, A, object_array(thing.transition_model), C, list(thing.possible_policies), gamma=16.0)
+        action = control.sample_action(q_pi, list(thing.possible_policies), [N_ACTIONS], action_selection='deterministic')
+        references.append((qs[0], q_pi, action))
+    batch = ThingBatch(things)
+    actions = batch.step(observations)
+    for (qs, q_pi, action), posterior, policies, chosen in zip(references, batch.posterior_states, batch.updated_policies, actions):
+        np.testing.assert_allclose(posterior, qs, rtol=1e-6)
+        np.testing.assert_allclose(policies, q_pi, rtol=1e-5, atol=1e-10)
+        assert chosen == int(action[0])
+
+def test_multi_factor_models_are_rejected():
+    rng = np.random.default_rng(3)
+    thing = make_thing(rng)
+    two_factors = np.empty(2, dtype=object)
+    two_factors[0], two_factors[1] = thing.transition_model, thing.transition_model
+    thing.transition_model = two_factors
+    with pytest.raises(ValueError):
+        ThingBatch([thing])
+    assert not ThingBatch.supports([make_thing(rng), thing])
+    thing = make_thing(rng)
+    thing.possible_policies = np.repeat(thing.possible_policies, 2, axis=-1)
+    with pytest.raises(ValueError):
+        ThingBatch([thing])
@@ -0,0 +1,34 @@
+import numpy as np
+from TiledWorld import TiledField
+
+def test_deposit_on_a_new_tile_survives_a_full_resident_budget():
+    field = TiledField(1, tile_size=8, max_resident_tiles=4, active_margin=1)
+    try:
+        field.activate([[12, 12]])
+        field.add([[100, 100]], [0], [5.0])
+        np.testing.assert_array_equal(field.values([[100, 100]]), [[5.0]])
+    finally:
+        field.close()
+
+def test_evicted_tiles_are_spilled_and_reloaded(tmp_path):
+    field = TiledField(2, tile_size=4, max_resident_tiles=2, active_margin=0, spill_directory=str(tmp_path))
+    locations = np.array([[1, 1], [9, 1], [17, 1], [1, 9]])
+    field.add(locations, [0, 1, 0, 1], [1.0, 2.0, 3.0, 4.0])
+    assert len(field.tiles) <= 2 and field.spilled
+    np.testing.assert_array_equal(field.values(locations), [[1, 0], [0, 2], [3, 0], [0, 4]])
+    np.testing.assert_array_equal(field.tile((0, 0))[0, 1, 1], 1.0)
+
+def test_active_tiles_step_like_a_dense_grid():
+    field = TiledField(1, tile_size=8, max_resident_tiles=64, active_margin=1)
+    try:
+        field.activate([[12, 12]])
+        field.add([[12, 12]], [0], [1.0])
+        dense = np.zeros((24, 24), dtype=np.float32)
+        dense[12, 12] = 1.0
+        for _ in range(3):
+            field.step(0.0, 0.2)
+            padded = np.pad(dense, 1)
+            dense = dense * (1 - 4 * 0.2) + 0.2 * (padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:])
+        np.testing.assert_allclose(field.region(0, 0, 24, 24)[0], dense, atol=1e-7)
+    finally:
+        field.close()